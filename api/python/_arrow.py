@@ -0,0 +1,139 @@
+"""
+Apache Arrow IPC 응답
+Accept 헤더에 Arrow 형식이 있으면 결과의 시계열 부분(가격/지표 시계열, 백테스트 수익률 곡선)을
+날짜(date32)/실수(float64)/신호등(사전 인코딩 문자열) 컬럼의 Arrow 테이블로 보내고,
+나머지 필드는 스키마 메타데이터 'result'에 JSON으로 담음
+
+    application/vnd.apache.arrow.stream  Arrow IPC 스트림
+    application/vnd.apache.arrow.file    Arrow IPC 파일 (Feather v2, application/feather도 허용)
+
+pyarrow는 선택 의존성 - 설치되어 있지 않거나 결과에 시계열이 없으면 기존 JSON 응답 사용
+requirements.txt(Vercel 번들)에는 넣지 않음 (번들 크기 제한) - Vercel 배포에서는 Accept 헤더와 관계없이 JSON이고,
+Arrow 응답은 pyarrow를 따로 설치한 자체 호스팅 워커에서만 사용 가능 (pip install pyarrow)
+"""
+import numpy as np
+
+import _response
+import _serializer
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # pyarrow는 선택 의존성
+    pa = None
+
+CONTENT_TYPES = {
+    'stream': 'application/vnd.apache.arrow.stream',
+    'file': 'application/vnd.apache.arrow.file',
+}
+MEDIA_FORMATS = {
+    'application/vnd.apache.arrow.stream': 'stream',
+    'application/vnd.apache.arrow.file': 'file',
+    'application/feather': 'file',
+}
+
+# 레코드 목록([{'date': ..., 값...}]) 형태의 시계열 키 (backtest dailyReturns, 신호등 백테스트 cumulative)
+RECORD_KEYS = ('dailyReturns', 'cumulative')
+
+
+def requested_format(accept):
+    """Accept 헤더에서 Arrow 형식 선택 ('stream'/'file') - JSON을 더 선호하거나 pyarrow가 없으면 None"""
+    if pa is None or not accept:
+        return None
+    accepted = _response.parse_quality(accept)
+    json_quality = accepted.get('application/json', accepted.get('*/*', 0.0))
+    best, best_quality = None, 0.0
+    for media_type, fmt in MEDIA_FORMATS.items():
+        quality = accepted.get(media_type, 0.0)
+        if quality > best_quality:
+            best, best_quality = fmt, quality
+    if best is None or best_quality < json_quality:
+        return None
+    return best
+
+
+def _date_column(values):
+    return pa.array(np.asarray(values, dtype='datetime64[D]'), type=pa.date32())
+
+
+def _value_column(values):
+    """숫자(None 포함)는 float64, 그 외는 사전 인코딩 문자열"""
+    if all(value is None or isinstance(value, (int, float)) for value in values):
+        return pa.array(values, type=pa.float64())
+    return pa.array([None if value is None else str(value) for value in values], type=pa.string()).dictionary_encode()
+
+
+def _record_columns(records):
+    keys = list(records[0]) if records else ['date']
+    columns = {}
+    for key in keys:
+        values = [record.get(key) for record in records]
+        columns[key] = _date_column(values) if key == 'date' else _value_column(values)
+    return columns
+
+
+def _history_columns(result):
+    """과거 신호등 시계열 (dates + series{지표: {값 이름: 목록}}) -> 'date', '지표.값 이름' 컬럼"""
+    columns = {'date': _date_column(result['dates'])}
+    for name, values in result['series'].items():
+        for key, items in values.items():
+            columns[f"{name}.{key}"] = _value_column(items)
+    return columns
+
+
+def _split(result):
+    """(컬럼 dict, 시계열을 뺀 나머지 결과) - 시계열이 없으면 None"""
+    if not isinstance(result, dict):
+        return None
+    if isinstance(result.get('series'), dict) and isinstance(result.get('dates'), list):
+        rest = {key: value for key, value in result.items() if key not in ('dates', 'series')}
+        return _history_columns(result), rest
+    for key in RECORD_KEYS:
+        if isinstance(result.get(key), list):
+            return _record_columns(result[key]), {k: v for k, v in result.items() if k != key}
+    # backtest 응답은 {'success': ..., 'data': 결과} 형태
+    if isinstance(result.get('data'), dict):
+        found = _split(result['data'])
+        if found is not None:
+            columns, rest = found
+            return columns, {**result, 'data': rest}
+    return None
+
+
+def to_table(result):
+    """결과 dict -> Arrow 테이블 (시계열이 없거나 pyarrow가 없으면 None)"""
+    if pa is None:
+        return None
+    found = _split(result)
+    if found is None:
+        return None
+    columns, rest = found
+    table = pa.table(columns)
+    return table.replace_schema_metadata({'result': _serializer.dumps(rest)})
+
+
+def debug_fields(timer=None, profile=None):
+    """JSON 응답 끝에 붙이는 _timings/_profile 필드 (Arrow 응답에서는 메타데이터로 전달)"""
+    fields = {}
+    if timer is not None:
+        fields['_timings'] = timer.summary_ms()
+    if profile is not None:
+        fields['_profile'] = profile.summary()
+    return fields
+
+
+def write(table, fmt, extras=None):
+    """
+    테이블을 IPC 스트림/파일 bytes로 기록
+    extras: 메타데이터에 추가할 필드 (_timings, _profile 등 - 각각 JSON)
+    """
+    if extras:
+        metadata = dict(table.schema.metadata or {})
+        metadata.update({key.encode('utf-8'): _serializer.dumps(value) for key, value in extras.items()})
+        table = table.replace_schema_metadata(metadata)
+
+    sink = pa.BufferOutputStream()
+    writer_factory = pa_ipc.new_stream if fmt == 'stream' else pa_ipc.new_file
+    with writer_factory(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
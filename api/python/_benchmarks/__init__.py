@@ -0,0 +1,4 @@
+"""
+분석 계산기/백테스트 성능 벤치마크와 부하 테스트 도구 (네트워크 없이 합성 데이터 사용)
+(디렉토리명이 _로 시작하므로 Vercel 서버리스 함수로 배포되지 않음)
+"""
@@ -0,0 +1,104 @@
+"""
+합성 OHLCV 데이터와 데이터 제공자
+산업 공통 요인 + 시장 요인 + 개별 잡음으로 종가를 만들어 CAPM/산업 베타가 의미 있는 값이 나오도록 함
+같은 (연수, 종목 수, 시드)는 항상 같은 데이터를 생성
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+# 합성 데이터 마지막 거래일 (결과 재현성을 위해 고정)
+FIXTURE_END_DATE = '2025-12-30'
+
+MARKET_SYMBOL = '^KS11'
+INDUSTRY_COUNT = 12
+
+
+def fixture_tickers(n_tickers):
+    """합성 종목 코드 (6자리 숫자, 실제 KOSPI 코드와 겹치지 않는 9로 시작)"""
+    return [f"9{i:05d}" for i in range(n_tickers)]
+
+
+class SyntheticUniverse:
+    """합성 종목 유니버스 - 종목별 OHLCV DataFrame과 산업 매핑"""
+
+    def __init__(self, years, n_tickers, seed=7, tickers=None):
+        self.years = years
+        self.tickers = list(tickers)[:n_tickers] if tickers else fixture_tickers(n_tickers)
+        self.dates = pd.bdate_range(end=FIXTURE_END_DATE, periods=int(years * 252))
+        self.mapping = {t: f"합성산업{i % INDUSTRY_COUNT:02d}" for i, t in enumerate(self.tickers)}
+        self._frames = {}
+        self._build(seed)
+
+    def _build(self, seed):
+        rng = np.random.default_rng(seed)
+        n_days = len(self.dates)
+        n = len(self.tickers)
+
+        market = rng.normal(0.0003, 0.011, n_days)
+        industry = rng.normal(0.0, 0.008, (n_days, INDUSTRY_COUNT))
+        betas = rng.uniform(0.5, 1.6, n)
+        industry_idx = np.arange(n) % INDUSTRY_COUNT
+        noise = rng.normal(0.0, 0.015, (n_days, n))
+
+        returns = market[:, None] * betas[None, :] + industry[:, industry_idx] + noise
+        closes = 10000 * np.exp(np.cumsum(returns, axis=0))
+        spreads = rng.uniform(0.002, 0.025, (n_days, n))
+        volumes = rng.integers(50_000, 5_000_000, (n_days, n)).astype(float)
+
+        for j, ticker in enumerate(self.tickers):
+            self._frames[ticker] = self._ohlcv(closes[:, j], spreads[:, j], volumes[:, j])
+
+        market_close = 2500 * np.exp(np.cumsum(market))
+        self._frames[MARKET_SYMBOL] = self._ohlcv(market_close, np.full(n_days, 0.008),
+                                                  np.full(n_days, 4e8))
+
+    def _ohlcv(self, close, spread, volume):
+        return pd.DataFrame({
+            'Open': close * (1 - spread / 4),
+            'High': close * (1 + spread / 2),
+            'Low': close * (1 - spread / 2),
+            'Close': close,
+            'Volume': volume,
+        }, index=self.dates)
+
+    def frame(self, symbol):
+        """심볼(티커, .KS 접미사 허용, ^KS11)의 OHLCV 사본 - 없으면 None"""
+        frame = self._frames.get(symbol.replace('.KS', ''))
+        return None if frame is None else frame.copy()
+
+    def closes(self):
+        return pd.DataFrame({t: self._frames[t]['Close'] for t in self.tickers})
+
+
+class SyntheticProvider:
+    """_market_data.set_provider용 합성 데이터 제공자 (yfinance와 같은 인터페이스)"""
+
+    def __init__(self, universe, latency=0.0):
+        self.universe = universe
+        self.latency = latency
+
+    def _slice(self, frame, start, end):
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start).normalize()]
+        if end is not None:
+            frame = frame[frame.index <= pd.Timestamp(end)]
+        return frame
+
+    def history(self, yahoo_symbol, start, end):
+        if self.latency:
+            time.sleep(self.latency)
+        frame = self.universe.frame(yahoo_symbol)
+        if frame is None:
+            return pd.DataFrame()
+        # 합성 데이터는 고정된 기간이므로 요청 종료일 대신 보유 구간 전체에서 기간 길이만 맞춤
+        span = pd.Timestamp(end) - pd.Timestamp(start)
+        return self._slice(frame, frame.index[-1] - span, None)
+
+    def download(self, yahoo_symbols, start, end):
+        frames = {s: self.history(s, start, end) for s in yahoo_symbols}
+        frames = {s: f for s, f in frames.items() if not f.empty}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
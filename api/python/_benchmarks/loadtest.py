@@ -0,0 +1,228 @@
+"""
+Python HTTP 핸들러 로컬 부하 테스트
+unified_analysis / backtest_vercel의 handler를 로컬 스레드 서버로 띄우고 합성 데이터 제공자로 네트워크 없이
+요청 조합(speedtraffic, 개별 지표, 백테스트)을 지정한 동시성으로 보내 처리량, p50/p95/p99 지연, 오류율을 출력
+
+    python api/python/_benchmarks/loadtest.py --concurrency 8 --requests 400
+    python api/python/_benchmarks/loadtest.py --mix speedtraffic=3,rsi=1,backtest=1 --latency 0.05 --no-cache
+
+클라이언트와 서버가 같은 프로세스에서 돌기 때문에 절대 수치보다는 변경 전후 비교용으로 사용
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PYTHON_DIR = os.path.dirname(BENCH_DIR)
+if PYTHON_DIR not in sys.path:
+    sys.path.insert(0, PYTHON_DIR)
+
+import _market_data
+import _fetch_scheduler
+import unified_analysis
+import backtest_vercel
+from _benchmarks.fixtures import SyntheticUniverse, SyntheticProvider
+
+REQUEST_KINDS = ('speedtraffic', 'mfi', 'rsi', 'bollinger', 'capm', 'garch', 'industry', 'backtest')
+DEFAULT_MIX = 'speedtraffic=4,mfi=1,rsi=1,bollinger=1,capm=1,garch=1,industry=1,backtest=2'
+
+
+def parse_mix(text):
+    """'speedtraffic=4,rsi=1' 형식을 (종류, 가중치) 목록으로 변환"""
+    mix = []
+    for item in text.split(','):
+        if not item.strip():
+            continue
+        kind, _, weight = item.partition('=')
+        kind = kind.strip()
+        if kind not in REQUEST_KINDS:
+            raise ValueError(f"Unknown request kind: {kind}")
+        mix.append((kind, float(weight or 1)))
+    if not mix:
+        raise ValueError("Request mix is empty")
+    return mix
+
+
+def load_universe_tickers(limit):
+    """실제 KOSPI 매핑의 티커를 합성 데이터 이름으로 사용 (산업 분석 동종 기업 선택이 실제처럼 동작)"""
+    try:
+        mapping = unified_analysis.AnalysisEngine().load_kospi_mapping()
+    except Exception:
+        return None
+
+    # 같은 산업 종목을 묶어서 선택해야 동종 기업 데이터도 유니버스 안에 들어옴
+    by_industry = defaultdict(list)
+    for ticker, industry in mapping.items():
+        if ticker.isdigit():
+            by_industry[industry].append(ticker)
+    tickers = []
+    for group in sorted(by_industry.values(), key=len, reverse=True):
+        if len(group) < 2:
+            break
+        tickers.extend(group)
+        if len(tickers) >= limit:
+            break
+    return tickers[:limit] or None
+
+
+def start_server(handler_class):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler_class)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class LoadTest:
+    def __init__(self, universe, mix, analysis_url, backtest_url, seed=1):
+        self.universe = universe
+        self.mix = mix
+        self.analysis_url = analysis_url
+        self.backtest_url = backtest_url
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def _pick(self):
+        with self.lock:
+            kinds, weights = zip(*self.mix)
+            kind = self.random.choices(kinds, weights)[0]
+            symbols = self.random.sample(self.universe.tickers, min(3, len(self.universe.tickers)))
+        return kind, symbols
+
+    def _build_request(self, kind, symbols):
+        if kind == 'backtest':
+            dates = self.universe.dates
+            body = {
+                'tickers': [f"{s}.KS" for s in symbols],
+                'weights': [100] * len(symbols),
+                'start_date': dates[-252 if len(dates) > 252 else 0].strftime('%Y-%m-%d'),
+                'end_date': dates[-1].strftime('%Y-%m-%d'),
+                'period': '1Y',
+            }
+            return urllib.request.Request(self.backtest_url, data=json.dumps(body).encode('utf-8'),
+                                          headers={'Content-Type': 'application/json'}, method='POST')
+        query = urllib.parse.urlencode({'symbol': symbols[0], 'type': kind})
+        return urllib.request.Request(f"{self.analysis_url}?{query}")
+
+    def one(self):
+        kind, symbols = self._pick()
+        request = self._build_request(kind, symbols)
+        started = time.perf_counter()
+        ok = True
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                payload = json.loads(response.read())
+                if isinstance(payload, dict) and (payload.get('error') or payload.get('success') is False):
+                    ok = False
+        except (urllib.error.URLError, ValueError, OSError):
+            ok = False
+        elapsed = time.perf_counter() - started
+
+        with self.lock:
+            self.latencies[kind].append(elapsed)
+            if not ok:
+                self.errors[kind] += 1
+
+    def run(self, total_requests, concurrency):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(self.one) for _ in range(total_requests)]:
+                future.result()
+        return time.perf_counter() - started
+
+    def report(self, wall_seconds):
+        rows = []
+        all_latencies = []
+        all_errors = 0
+        for kind in sorted(self.latencies):
+            values = sorted(self.latencies[kind])
+            all_latencies.extend(values)
+            all_errors += self.errors[kind]
+            rows.append(self._row(kind, values, self.errors[kind], wall_seconds))
+        rows.append(self._row('ALL', sorted(all_latencies), all_errors, wall_seconds))
+        return rows
+
+    def _row(self, kind, values, errors, wall_seconds):
+        count = len(values)
+        return {
+            'kind': kind,
+            'count': count,
+            'rps': round(count / wall_seconds, 2) if wall_seconds else 0.0,
+            'p50_ms': round(percentile(values, 0.50) * 1000, 1),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 1),
+            'p99_ms': round(percentile(values, 0.99) * 1000, 1),
+            'error_rate': round(errors / count, 4) if count else 0.0,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Python 분석 핸들러 로컬 부하 테스트")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"요청 조합 (기본 {DEFAULT_MIX})")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help="총 요청 수")
+    parser.add_argument('--tickers', type=int, default=50, help="합성 유니버스 종목 수")
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.0, help="합성 제공자의 다운로드 지연 (초)")
+    parser.add_argument('--fetch-rate', type=float, default=0.0,
+                        help="다운로드 스케줄러의 초당 요청 수 (기본 0: 제한 없음)")
+    parser.add_argument('--no-cache', action='store_true', help="가격 캐시를 끄고 매 요청마다 데이터 로드")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    universe = SyntheticUniverse(args.years, args.tickers, tickers=load_universe_tickers(args.tickers))
+    previous = _market_data.set_provider(SyntheticProvider(universe, latency=args.latency))
+    previous_ttl = _market_data._cache.ttl
+    previous_scheduler = _fetch_scheduler.set_scheduler(
+        _fetch_scheduler.FetchScheduler(rate=args.fetch_rate, max_concurrency=args.concurrency))
+    if args.no_cache:
+        _market_data._cache.ttl = -1
+
+    analysis_server = start_server(unified_analysis.handler)
+    backtest_server = start_server(backtest_vercel.handler)
+    try:
+        test = LoadTest(universe, mix,
+                        f"http://127.0.0.1:{analysis_server.server_port}/",
+                        f"http://127.0.0.1:{backtest_server.server_port}/")
+        wall_seconds = test.run(args.requests, args.concurrency)
+        rows = test.report(wall_seconds)
+    finally:
+        analysis_server.shutdown()
+        backtest_server.shutdown()
+        _market_data._cache.ttl = previous_ttl
+        _market_data.set_provider(previous)
+        _fetch_scheduler.set_scheduler(previous_scheduler)
+
+    if args.json:
+        print(json.dumps({'wall_seconds': round(wall_seconds, 3), 'results': rows}, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"{args.requests}건, 동시성 {args.concurrency}, 소요 {wall_seconds:.2f}s")
+    print(f"{'kind':<14}{'count':>7}{'rps':>9}{'p50_ms':>10}{'p95_ms':>10}{'p99_ms':>10}{'err%':>8}")
+    for row in rows:
+        print(f"{row['kind']:<14}{row['count']:>7}{row['rps']:>9}{row['p50_ms']:>10}"
+              f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['error_rate'] * 100:>8.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+계산기/백테스트 벤치마크
+합성 OHLCV(1년x1종목 ~ 10년x700종목)로 각 계산기와 포트폴리오 백테스트의 소요 시간과 최대 메모리를 측정
+기준값(baselines.json)과 비교해 임계값 이상 느려지거나 메모리가 늘면 종료 코드 1로 실패
+
+    python api/python/_benchmarks/run.py                     # 전체 실행 후 기준값과 비교
+    python api/python/_benchmarks/run.py --cases 1y_1,1y_50  # 일부 케이스만
+    python api/python/_benchmarks/run.py --save              # 현재 결과를 기준값으로 저장
+    python api/python/_benchmarks/run.py --lean float32      # lean 모드 계산기 측정 (결과 키에 @lean32)
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PYTHON_DIR = os.path.dirname(BENCH_DIR)
+if PYTHON_DIR not in sys.path:
+    sys.path.insert(0, PYTHON_DIR)
+
+import _market_data
+import _indicators
+import _fetch_scheduler
+from unified_analysis import AnalysisEngine
+from backtest import calculate_portfolio_backtest
+from _benchmarks.fixtures import SyntheticUniverse, SyntheticProvider
+
+# 케이스 이름: (연수, 종목 수)
+CASES = {
+    '1y_1': (1, 1),
+    '1y_50': (1, 50),
+    '3y_200': (3, 200),
+    '10y_700': (10, 700),
+}
+
+CALCULATORS = {
+    'mfi': 'calculate_mfi',
+    'rsi': 'calculate_rsi',
+    'bollinger': 'calculate_bollinger',
+    'capm': 'calculate_capm',
+    'garch': 'calculate_garch_analysis',
+    'industry': 'calculate_industry_analysis',
+}
+TARGETS = tuple(CALCULATORS) + ('backtest',)
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baselines.json')
+
+# 이보다 작은 시간 차이는 측정 잡음으로 보고 회귀로 판단하지 않음 (초)
+NOISE_FLOOR_SECONDS = 0.005
+
+
+class BenchmarkEngine(AnalysisEngine):
+    """합성 유니버스 전체 기간을 그대로 쓰는 분석 엔진 (네트워크 없음)"""
+
+    def __init__(self, universe, lean_dtype=None):
+        super().__init__()
+        self.universe = universe
+        self.lean_dtype = lean_dtype
+
+    def load_stock_data(self, symbol):
+        frame = self.universe.frame(symbol)
+        if frame is None:
+            raise ValueError(f"No data available for {symbol}")
+        return frame
+
+    def load_kospi_mapping(self):
+        return self.universe.mapping
+
+
+def _calculator_job(universe, method_name, lean_dtype=None):
+    engine = BenchmarkEngine(universe, lean_dtype)
+    method = getattr(engine, method_name)
+
+    def run():
+        errors = 0
+        for ticker in universe.tickers:
+            result = method(ticker)
+            if 'error' in result:
+                errors += 1
+        return errors
+
+    return run
+
+
+def _backtest_job(universe):
+    tickers = [f"{t}.KS" for t in universe.tickers]
+    weights = [100] * len(tickers)
+    start = universe.dates[0].strftime('%Y-%m-%d')
+    end = (universe.dates[-1] + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+
+    def run():
+        # 매 반복마다 데이터 로드부터 측정하도록 캐시 비움
+        _market_data.clear_cache()
+        calculate_portfolio_backtest(tickers, weights, start, end, 'bench')
+        return 0
+
+    return run
+
+
+def measure(job, repeat):
+    """repeat회 실행 시간(초)과 tracemalloc 최대 메모리(KB) 측정"""
+    times = []
+    errors = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        errors = job()
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        job()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'median_s': round(statistics.median(times), 6),
+        'min_s': round(min(times), 6),
+        'peak_kb': round(peak / 1024, 1),
+        'errors': errors,
+    }
+
+
+def _lean_suffix(lean_dtype):
+    if lean_dtype is None:
+        return ''
+    return '@lean32' if lean_dtype == np.float32 else '@lean'
+
+
+def run_suite(case_names, targets, repeat, lean_dtype=None):
+    results = {}
+    # 합성 데이터는 요청 한도가 없으므로 다운로드 속도 제한 해제
+    previous_scheduler = _fetch_scheduler.set_scheduler(_fetch_scheduler.FetchScheduler(rate=0, max_concurrency=64))
+    for case_name in case_names:
+        years, n_tickers = CASES[case_name]
+        universe = SyntheticUniverse(years, n_tickers)
+        previous = _market_data.set_provider(SyntheticProvider(universe))
+        try:
+            for target in targets:
+                if target == 'backtest':
+                    job = _backtest_job(universe)
+                else:
+                    job = _calculator_job(universe, CALCULATORS[target], lean_dtype)
+                # 큰 케이스는 반복 횟수를 줄임
+                case_repeat = 1 if years * n_tickers >= 1000 else repeat
+                # lean 모드는 기존 계산과 따로 기준값을 관리 (백테스트는 lean 모드와 무관)
+                key = f"{case_name}/{target}" + ('' if target == 'backtest' else _lean_suffix(lean_dtype))
+                results[key] = measure(job, case_repeat)
+                print(f"{key:<24} median {results[key]['median_s']:>9.4f}s  "
+                      f"peak {results[key]['peak_kb']:>10.1f}KB  errors {results[key]['errors']}")
+        finally:
+            _market_data.set_provider(previous)
+    _fetch_scheduler.set_scheduler(previous_scheduler)
+    return results
+
+
+def compare(results, baseline, time_threshold, memory_threshold):
+    """기준값 대비 회귀 목록 반환"""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        time_limit = base['median_s'] * (1 + time_threshold)
+        if current['median_s'] > time_limit and current['median_s'] - base['median_s'] > NOISE_FLOOR_SECONDS:
+            regressions.append(f"{key}: time {base['median_s']:.4f}s -> {current['median_s']:.4f}s")
+        memory_limit = base['peak_kb'] * (1 + memory_threshold)
+        if current['peak_kb'] > memory_limit:
+            regressions.append(f"{key}: peak {base['peak_kb']:.1f}KB -> {current['peak_kb']:.1f}KB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="분석 계산기/백테스트 벤치마크")
+    parser.add_argument('--cases', default=','.join(CASES), help="쉼표로 구분한 케이스 (%s)" % ', '.join(CASES))
+    parser.add_argument('--targets', default=','.join(TARGETS), help="쉼표로 구분한 대상")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--lean', default=None, choices=('float64', 'float32'),
+                        help="계산기를 lean 모드로 실행 (float64/float32)")
+    parser.add_argument('--save', action='store_true', help="결과를 기준값으로 저장 (기존 항목은 갱신)")
+    parser.add_argument('--threshold', type=float, default=0.25, help="허용 시간 증가율 (기본 25%%)")
+    parser.add_argument('--memory-threshold', type=float, default=0.20, help="허용 메모리 증가율 (기본 20%%)")
+    args = parser.parse_args(argv)
+
+    case_names = [c for c in args.cases.split(',') if c]
+    targets = [t for t in args.targets.split(',') if t]
+    unknown = [c for c in case_names if c not in CASES] + [t for t in targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"알 수 없는 케이스/대상: {', '.join(unknown)}")
+
+    results = run_suite(case_names, targets, args.repeat, _indicators.lean_dtype(args.lean))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"기준값 저장: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+    if regressions:
+        print("성능 회귀 발견:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+
+    if baseline:
+        print("기준값 대비 회귀 없음")
+    else:
+        print("기준값 없음 - --save로 저장하세요")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
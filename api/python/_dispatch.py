@@ -0,0 +1,72 @@
+"""
+지표별 엔드포인트 공용 디스패처
+unified_analysis의 분석 엔진을 같은 프로세스에서 직접 호출 (/api/unified_analysis로 HTTP 재호출하지 않음)
+"""
+from http.server import BaseHTTPRequestHandler
+import os
+import sys
+import urllib.parse
+
+# 현재 디렉토리를 Python 경로에 추가
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from unified_analysis import ANALYSIS_METHODS, AnalysisEngine
+import _serializer
+import _log
+
+log = _log.get_logger('python_api')
+
+
+def run_analysis(symbol, analysis_type):
+    """심볼 하나에 대해 지정한 분석을 실행하고 결과 dict 반환"""
+    if analysis_type not in ANALYSIS_METHODS:
+        raise ValueError(f"Unknown analysis type: {analysis_type}")
+    return AnalysisEngine().run_analysis(symbol.upper(), analysis_type)
+
+
+class IndicatorHandler(BaseHTTPRequestHandler):
+    """단일 지표 엔드포인트 기본 핸들러 - 하위 클래스에서 analysis_type만 지정"""
+
+    analysis_type = None
+
+    def do_GET(self):
+        try:
+            parsed_url = urllib.parse.urlparse(self.path)
+            query_params = urllib.parse.parse_qs(parsed_url.query)
+            symbol = query_params.get("symbol", [None])[0]
+            if not symbol:
+                self.send_error_response(400, "Symbol parameter is required")
+                return
+
+            result = run_analysis(symbol, self.analysis_type)
+
+            self.send_response(200)
+            self.send_header("Content-type", "application/json")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+            self.send_header("Access-Control-Allow-Headers", "Content-Type")
+            self.end_headers()
+            _serializer.write_json(self.wfile, result)
+
+        except Exception as e:
+            self.send_error_response(500, f"Internal server error: {str(e)}")
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.end_headers()
+
+    def send_error_response(self, status_code, message):
+        self.send_response(status_code)
+        self.send_header("Content-type", "application/json")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        error_response = {"error": message}
+        _serializer.write_json(self.wfile, error_response)
+
+    def log_message(self, format, *args):
+        log.info(format, *args)
@@ -0,0 +1,181 @@
+"""
+차트용 시계열 다운샘플링 (Largest-Triangle-Three-Buckets)
+긴 가격/지표/수익률 곡선을 목표 점 개수로 줄이되 고점/저점처럼 모양을 결정하는 점을 남김
+같은 시계열을 같은 해상도로 다시 줄이면 캐시된 인덱스를 재사용 (시계열 내용 해시 기준 LRU)
+
+요청 옵션 points=N (MIN_POINTS~MAX_POINTS, 없으면 원본 그대로) - 결과는 항상 N개 이하
+    history          dates/series - 지표별 대표 값의 LTTB 인덱스 합집합으로 모든 시계열을 같은 날짜에서 추출
+    dailyReturns     backtest 누적 수익률 곡선
+    cumulative       신호등 백테스트 전략/벤치마크 곡선
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+MIN_POINTS = 3
+MAX_POINTS = 5000
+
+# 캐시하는 (시계열, 해상도) 수
+CACHE_SIZE = 256
+
+# 지표별 LTTB 기준 값 (history 응답)
+HISTORY_PRIMARY = {
+    'mfi': 'mfi',
+    'rsi': 'rsi',
+    'bollinger': 'percent_b',
+    'capm': 'beta_market',
+    'industry': 'beta_industry',
+    'garch': 'sigma_pct',
+}
+
+# 레코드 목록 형태 시계열 (날짜 외 값 컬럼 모두 기준으로 사용)
+RECORD_KEYS = ('dailyReturns', 'cumulative')
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def parse_points(value):
+    """points 옵션 해석 (없으면 None, 범위를 벗어나면 ValueError)"""
+    if value is None or value == '':
+        return None
+    try:
+        points = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for points: {value!r}")
+    if not MIN_POINTS <= points <= MAX_POINTS:
+        raise ValueError(f"points must be between {MIN_POINTS} and {MAX_POINTS} (got {value})")
+    return points
+
+
+def lttb(y, threshold):
+    """
+    y(등간격 x)에서 LTTB로 고른 threshold개 점의 인덱스 (처음과 끝 포함, 오름차순)
+    NaN은 건너뛰고 유효한 점만 사용
+    """
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.flatnonzero(np.isfinite(y))
+    n = len(valid)
+    if n <= threshold:
+        return valid
+    x = valid.astype(np.float64)
+    v = y[valid]
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = v[end:next_end].mean()
+
+        # 이전 선택 점, 다음 버킷 평균 점과 만드는 삼각형 넓이가 가장 큰 점 선택
+        area = np.abs((x[a] - avg_x) * (v[start:end] - v[a]) - (x[a] - x[start:end]) * (avg_y - v[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return valid[selected]
+
+
+def _cached_lttb(y, threshold):
+    y = np.asarray(y, dtype=np.float64)
+    key = (hashlib.sha1(y.tobytes()).hexdigest(), threshold)
+    with _lock:
+        indices = _cache.get(key)
+        if indices is not None:
+            _cache.move_to_end(key)
+            return indices
+
+    indices = lttb(y, threshold)
+    with _lock:
+        _cache[key] = indices
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return indices
+
+
+def _as_float(values):
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+def _spread(candidates, count):
+    """정렬된 후보 인덱스에서 고르게 count개 선택"""
+    if count <= 0:
+        return candidates[:0]
+    if len(candidates) <= count:
+        return candidates
+    return candidates[np.linspace(0, len(candidates) - 1, count).round().astype(np.int64)]
+
+
+def select_indices(columns, length, points):
+    """
+    여러 값 시계열이 같은 날짜를 공유할 때 남길 인덱스 (최대 points개)
+    처음/끝 날짜와 컬럼별 최고/최저점을 먼저 남기고 (LTTB는 전체 최고/최저점을 보장하지 않음),
+    남은 자리는 컬럼별 LTTB 인덱스 합집합에서 고르게 채우고, 그래도 모자라면 나머지 날짜에서 고르게 채움
+    (컬럼이 많고 points가 아주 작아 최고/최저점도 다 들어가지 않으면 그중에서도 고르게 선택)
+    """
+    if length <= points:
+        return np.arange(length)
+    columns = [column for column in columns if np.isfinite(column).any()]
+    if not columns:
+        return np.unique(np.linspace(0, length - 1, points).astype(np.int64))
+
+    ends = np.array([0, length - 1], dtype=np.int64)
+    extremes = np.array([index for column in columns for index in (np.nanargmax(column), np.nanargmin(column))],
+                        dtype=np.int64)
+    required = np.union1d(extremes, ends)
+    if len(required) > points:
+        return np.union1d(ends, _spread(np.setdiff1d(required, ends), points - 2))
+
+    budget = max((points - 2) // len(columns) - 2, MIN_POINTS)
+    candidates = np.setdiff1d(np.concatenate([_cached_lttb(column, budget) for column in columns]), required)
+    selected = np.union1d(required, _spread(candidates, points - len(required)))
+    if len(selected) < points:
+        rest = np.setdiff1d(np.arange(length), selected)
+        selected = np.union1d(selected, _spread(rest, points - len(selected)))
+    return selected.astype(np.int64)
+
+
+def _take(values, indices):
+    return [values[i] for i in indices]
+
+
+def _downsample_records(records, points):
+    if len(records) <= points:
+        return records
+    keys = [key for key in records[0] if key != 'date']
+    columns = [_as_float([record.get(key) for record in records]) for key in keys]
+    return _take(records, select_indices(columns, len(records), points))
+
+
+def _downsample_history(result, points):
+    dates = result['dates']
+    if len(dates) <= points:
+        return result
+    series = result['series']
+    columns = [_as_float(values[HISTORY_PRIMARY[name]]) for name, values in series.items()
+               if HISTORY_PRIMARY.get(name) in values]
+    indices = select_indices(columns, len(dates), points)
+    downsampled = {name: {key: _take(items, indices) for key, items in values.items()}
+                   for name, values in series.items()}
+    return {**result, 'dates': _take(dates, indices), 'series': downsampled, 'downsampled_from': len(dates)}
+
+
+def downsample_result(result, points):
+    """결과 dict의 시계열 부분을 points개 이하로 줄인 새 dict (시계열이 없거나 points가 None이면 그대로)"""
+    if not points or not isinstance(result, dict):
+        return result
+    if isinstance(result.get('series'), dict) and isinstance(result.get('dates'), list):
+        return _downsample_history(result, points)
+    for key in RECORD_KEYS:
+        if isinstance(result.get(key), list):
+            return {**result, key: _downsample_records(result[key], points)}
+    # backtest 응답은 {'success': ..., 'data': 결과} 형태
+    if isinstance(result.get('data'), dict):
+        return {**result, 'data': downsample_result(result['data'], points)}
+    return result
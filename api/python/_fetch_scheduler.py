@@ -0,0 +1,235 @@
+"""
+시세 다운로드 스케줄러
+모든 데이터 제공자 호출을 토큰 버킷(초당 요청 수)과 동시 실행 수 제한 아래에서 실행하고,
+일시적 오류(요청 한도 초과, 연결/타임아웃, 5xx)는 지터를 섞은 지수 백오프로 재시도
+일시적 오류로 실패한 시도가 연속으로 쌓이면 회로 차단기가 열려 일정 시간 동안 즉시 실패
+(재시도도 매 시도 전에 차단 여부를 확인, 차단 시간이 지나면 시험 호출 하나만 보내 성공하면 다시 닫힘)
+
+환경변수
+    FETCH_RATE_PER_SEC     초당 요청 수 (0이면 제한 없음, 기본 5)
+    FETCH_BURST            순간 허용 요청 수 (기본 10)
+    FETCH_MAX_CONCURRENCY  동시 요청 수 (기본 4)
+    FETCH_MAX_RETRIES      재시도 횟수 (기본 3)
+    FETCH_BACKOFF_BASE     첫 재시도 대기 상한 (초, 기본 0.5)
+    FETCH_BACKOFF_MAX      재시도 대기 최대값 (초, 기본 8)
+    FETCH_BREAKER_THRESHOLD  회로 차단기를 여는 연속 실패 수 (0이면 사용 안 함, 기본 5)
+    FETCH_BREAKER_COOLDOWN   차단 유지 시간 (초, 기본 30)
+"""
+import os
+import random
+import re
+import threading
+import time
+
+import _log
+
+try:
+    from yfinance.exceptions import YFRateLimitError
+except ImportError:  # 구버전 yfinance
+    YFRateLimitError = None
+
+try:
+    from yfinance.exceptions import YFPricesMissingError, YFTzMissingError
+    MISSING_DATA_ERRORS = (YFPricesMissingError, YFTzMissingError)
+except ImportError:  # 구버전 yfinance
+    MISSING_DATA_ERRORS = ()
+
+log = _log.get_logger('fetch')
+
+# 메시지에 포함되면 일시적 오류로 보는 문구와 HTTP 상태 코드 (429, 5xx)
+TRANSIENT_MARKERS = ('too many requests', 'rate limit', 'timed out', 'timeout',
+                     'connection', 'temporarily', 'currently down')
+TRANSIENT_STATUS = re.compile(r'\b(429|5\d\d)\b')
+
+
+def _env_number(name, default, cast=float):
+    try:
+        return cast(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def is_transient(exc):
+    """재시도할 만한 오류인지 판단 (데이터 없음 같은 확정적 오류는 제외)"""
+    if MISSING_DATA_ERRORS and isinstance(exc, MISSING_DATA_ERRORS):
+        return False
+    if YFRateLimitError is not None and isinstance(exc, YFRateLimitError):
+        return True
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    # requests/curl_cffi 예외는 상위 클래스 이름으로 판단 (DNSError -> ConnectionError 등)
+    for cls in type(exc).__mro__:
+        name = cls.__name__.lower()
+        if 'timeout' in name or 'connection' in name or 'ratelimit' in name:
+            return True
+    message = str(exc).lower()
+    return any(marker in message for marker in TRANSIENT_MARKERS) or bool(TRANSIENT_STATUS.search(message))
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지는 토큰 버킷 (최대 capacity개)"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기"""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitOpenError(Exception):
+    """회로 차단기가 열려 있어 데이터 제공자를 호출하지 않음"""
+
+
+class CircuitBreaker:
+    """
+    일시적 오류로 실패한 시도가 연속 threshold회면 열리고 cooldown초 뒤 시험 호출 하나를 허용 (성공하면 닫힘, 실패하면 다시 열림)
+    threshold가 0이면 항상 닫힘
+    """
+
+    def __init__(self, threshold=5, cooldown=30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return 'closed'
+            return 'half_open' if time.monotonic() - self.opened_at >= self.cooldown else 'open'
+
+    def before_call(self):
+        """호출 허용 여부 확인 - 열려 있거나 다른 시험 호출이 진행 중이면 CircuitOpenError"""
+        if not self.threshold:
+            return
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.cooldown - (time.monotonic() - self.opened_at)
+            if remaining > 0 or self._probing:
+                raise CircuitOpenError(f"Data provider circuit open ({max(remaining, 0):.1f}s remaining)")
+            self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                log.info("데이터 제공자 회로 차단 해제")
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        if not self.threshold:
+            return
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.threshold:
+                if self.opened_at is None or self._probing:
+                    log.warning("데이터 제공자 연속 실패 %d회, %.0f초 동안 차단", self.failures, self.cooldown)
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+
+class FetchScheduler:
+    """요청 속도/동시성 제한과 재시도를 적용해 다운로드 함수 실행"""
+
+    def __init__(self, rate=5.0, burst=10, max_concurrency=4, max_retries=3,
+                 backoff_base=0.5, backoff_max=8.0, breaker=None):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._slots = threading.BoundedSemaphore(max(max_concurrency, 1))
+        self.breaker = breaker or CircuitBreaker(threshold=0)
+
+    @classmethod
+    def from_env(cls):
+        return cls(rate=_env_number('FETCH_RATE_PER_SEC', 5.0),
+                   burst=_env_number('FETCH_BURST', 10, int),
+                   max_concurrency=_env_number('FETCH_MAX_CONCURRENCY', 4, int),
+                   max_retries=_env_number('FETCH_MAX_RETRIES', 3, int),
+                   backoff_base=_env_number('FETCH_BACKOFF_BASE', 0.5),
+                   backoff_max=_env_number('FETCH_BACKOFF_MAX', 8.0),
+                   breaker=CircuitBreaker(threshold=_env_number('FETCH_BREAKER_THRESHOLD', 5, int),
+                                          cooldown=_env_number('FETCH_BREAKER_COOLDOWN', 30.0)))
+
+    def backoff(self, attempt):
+        """attempt번째 재시도 전 대기 시간 (full jitter)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def call(self, fn, *args, **kwargs):
+        """
+        fn(*args, **kwargs) 실행 - 일시적 오류는 max_retries회까지 재시도
+        매 시도 전에 회로 차단기를 확인해 열려 있으면 호출 없이 CircuitOpenError (재시도 중이면 마지막 오류를 원인으로 연결)
+        """
+        attempt = 0
+        error = None
+        while True:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError as open_error:
+                if error is None:
+                    raise
+                raise open_error from error
+            self.bucket.acquire()
+            with self._slots:
+                try:
+                    result = fn(*args, **kwargs)
+                    self.breaker.record_success()
+                    return result
+                except Exception as e:
+                    if not is_transient(e):
+                        # 확정적 오류(심볼 없음 등)는 제공자가 응답한 것이므로 실패로 세지 않음
+                        self.breaker.record_success()
+                        raise
+                    self.breaker.record_failure()
+                    if attempt >= self.max_retries:
+                        raise
+                    error = e
+
+            # 대기 중에는 동시 실행 슬롯을 반납
+            delay = self.backoff(attempt)
+            attempt += 1
+            log.warning("일시적 다운로드 오류, %.2f초 후 재시도 (%d/%d): %s",
+                        delay, attempt, self.max_retries, error)
+            time.sleep(delay)
+
+
+_scheduler = FetchScheduler.from_env()
+
+
+def get_scheduler():
+    return _scheduler
+
+
+def set_scheduler(scheduler):
+    """스케줄러 교체 (벤치마크/부하 테스트에서 제한 해제 등) - 이전 스케줄러 반환"""
+    global _scheduler
+    previous = _scheduler
+    _scheduler = scheduler
+    return previous
+
+
+def call(fn, *args, **kwargs):
+    """현재 스케줄러로 fn 실행"""
+    return _scheduler.call(fn, *args, **kwargs)
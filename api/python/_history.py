@@ -0,0 +1,188 @@
+"""
+과거 신호등 시계열
+각 지표의 일별 값과 신호등(red/yellow/green/inactive)을 지표당 한 번의 벡터 연산으로 계산
+(날짜마다 계산기를 다시 호출하지 않음) - 분류 기준은 unified_analysis 계산기와 동일
+지표 윈도우/임계값은 요청 파라미터(_params.AnalysisParams, 없으면 기본값)를 계산기와 같은 방식으로 사용
+
+    mfi/rsi/bollinger  롤링 지표 (_indicators)
+    technical          세 지표 신호등의 다수결
+    capm/industry      capm_window/industry_window(기본 126)거래일 롤링 회귀 베타와 R²
+                       (최소 60일 또는 윈도우 중 작은 값, 계산기의 OLS와 같은 값)
+    garch              계산기의 GARCH(1,1) 예측 변동성 (1년치 데이터를 250거래일로 근사)
+"""
+import numpy as np
+import pandas as pd
+
+import _indicators
+import _panel
+import _params
+
+HISTORY_INDICATORS = ('mfi', 'rsi', 'bollinger', 'technical', 'capm', 'industry', 'garch')
+
+# 회귀 윈도우 기본값과 최소 관측 수 (계산기와 동일)
+REGRESSION_WINDOW = _params.PARAM_SPECS['capm_window'][0]
+REGRESSION_MIN_PERIODS = 60
+
+# GARCH 계산기 파라미터와 1년 데이터에 해당하는 거래일 수
+GARCH_ALPHA = 0.1
+GARCH_BETA = 0.8
+GARCH_OMEGA_RATIO = 0.1
+GARCH_WINDOW = 250
+GARCH_MIN_RETURNS = 99
+
+# 지표 계산에 필요한 과거 데이터 (달력일) - 요청 시작일보다 이만큼 앞서 로드
+LOOKBACK_DAYS = 400
+
+
+def lookback_days(params=_params.DEFAULT_PARAMS):
+    """가장 긴 윈도우(거래일)를 달력일로 환산해 LOOKBACK_DAYS와 비교한 로드 기간"""
+    longest = max(params.capm_window, params.industry_window, params.bollinger_period, GARCH_WINDOW)
+    return max(LOOKBACK_DAYS, longest * 7 // 5 + 30)
+
+
+def regression_min_periods(window):
+    """계산기의 최소 데이터 조건 - 60일 또는 윈도우 중 작은 값"""
+    return min(window, REGRESSION_MIN_PERIODS)
+
+
+def classify(values, red, green):
+    """값 시리즈를 같은 인덱스의 신호등 시리즈로 변환 (NaN은 inactive)"""
+    lights = np.select([values.isna().to_numpy(), np.asarray(red), np.asarray(green)],
+                       ['inactive', 'red', 'green'], default='yellow')
+    return pd.Series(lights, index=values.index)
+
+
+def align_lights(lights, dates):
+    """신호등 시리즈를 dates 기준으로 맞춤 (값이 없는 날은 inactive)"""
+    return lights.reindex(dates).fillna('inactive')
+
+
+def technical_lights(dates, *lights):
+    """MFI/볼린저/RSI 신호등 다수결 (유효한 신호가 없으면 inactive)"""
+    stacked = np.vstack([align_lights(light, dates).to_numpy() for light in lights])
+    red_count = (stacked == 'red').sum(axis=0)
+    green_count = (stacked == 'green').sum(axis=0)
+    valid_count = (stacked != 'inactive').sum(axis=0)
+    technical = np.select([valid_count == 0, red_count >= 2, green_count >= 2],
+                          ['inactive', 'red', 'green'], default='yellow')
+    return pd.Series(technical, index=dates)
+
+
+def _close_returns(frame):
+    """계산기와 같은 방식의 일간 수익률(%)"""
+    return frame.dropna()['Close'].sort_index().pct_change().dropna() * 100
+
+
+def mfi_series(frame, params=_params.DEFAULT_PARAMS):
+    (high, low, close, volume), dates = _indicators.clean_arrays(frame, ['High', 'Low', 'Close', 'Volume'])
+    values = pd.Series(_indicators.mfi(high, low, close, volume, params.mfi_period), index=dates)
+    return {'mfi': values}, classify(values, values >= params.mfi_overbought, values <= params.mfi_oversold)
+
+
+def rsi_series(frame, params=_params.DEFAULT_PARAMS):
+    (close,), dates = _indicators.clean_arrays(frame, ['Close'])
+    values = pd.Series(_indicators.rsi(close, params.rsi_period), index=dates)
+    return {'rsi': values}, classify(values, values >= params.rsi_overbought, values <= params.rsi_oversold)
+
+
+def bollinger_series(frame, params=_params.DEFAULT_PARAMS):
+    (close,), dates = _indicators.clean_arrays(frame, ['Close'])
+    middle, upper, lower, percent_b = _indicators.bollinger(close, params.bollinger_period, params.bollinger_std)
+    percent_b = pd.Series(percent_b, index=dates)
+    values = {
+        'percent_b': percent_b,
+        'middle_band': pd.Series(middle, index=dates),
+        'upper_band': pd.Series(upper, index=dates),
+        'lower_band': pd.Series(lower, index=dates),
+    }
+    return values, classify(percent_b, percent_b >= params.bollinger_upper, percent_b <= params.bollinger_lower)
+
+
+def rolling_regression(y, x, window=REGRESSION_WINDOW, min_periods=REGRESSION_MIN_PERIODS):
+    """공통 거래일 기준 롤링 단순회귀의 베타와 R² (상수항 포함 OLS와 동일)"""
+    aligned = pd.concat([y, x], axis=1, join='inner')
+    y, x = aligned.iloc[:, 0], aligned.iloc[:, 1]
+    rolling_y = y.rolling(window, min_periods=min_periods)
+    beta = rolling_y.cov(x) / x.rolling(window, min_periods=min_periods).var()
+    r_squared = rolling_y.corr(x) ** 2
+    return beta, r_squared
+
+
+def _paired_series(panel, other):
+    """패널의 'stock'과 other(종목 이름 또는 mean_returns 결과) 수익률(%)을 공통 거래일 Series로"""
+    y, x, dates = panel.paired_returns('stock', other)
+    return pd.Series(y * 100, index=dates), pd.Series(x * 100, index=dates)
+
+
+def capm_series(frame, market_frame, params=_params.DEFAULT_PARAMS):
+    panel = _panel.PricePanel.build({'stock': frame, 'market': market_frame},
+                                    calendar=_panel.trading_calendar(market_frame))
+    window = params.capm_window
+    beta, r_squared = rolling_regression(*_paired_series(panel, 'market'), window, regression_min_periods(window))
+    lights = classify(beta,
+                      (beta > 1.5) & (r_squared >= 0.3),
+                      (beta >= 0.8) & (beta <= 1.3) & (r_squared >= 0.3))
+    return {'beta_market': beta, 'r2_market': r_squared}, lights
+
+
+def industry_series(frame, peer_closes, calendar=None, params=_params.DEFAULT_PARAMS):
+    """
+    peer_closes: {동종 기업: 종가 Series} - 날짜마다 수익률이 있는 기업의 동일가중 평균 수익률과 회귀
+    calendar: KRX 거래일 인덱스 (없으면 날짜 합집합)
+    """
+    panel = _panel.PricePanel.build({'stock': frame, **peer_closes}, calendar=calendar)
+    window = params.industry_window
+    beta, r_squared = rolling_regression(*_paired_series(panel, panel.mean_returns(list(peer_closes))),
+                                         window, regression_min_periods(window))
+    lights = classify(beta,
+                      (beta > 1.2) & (r_squared >= 0.5),
+                      (beta >= 0.8) & (beta <= 1.2) & (r_squared >= 0.3))
+    return {'beta_industry': beta, 'r2_industry': r_squared}, lights
+
+
+def garch_series(frame):
+    """
+    날짜별 GARCH(1,1) 예측 변동성(연율, %)
+    계산기의 조건부 분산 재귀식을 닫힌 형태로 풀어 지수가중 합(ewm)과 롤링 분산으로 계산
+    """
+    returns = _close_returns(frame)
+    squared = returns ** 2
+    a, b = GARCH_ALPHA, GARCH_BETA
+
+    # 계산기의 초기 분산과 omega는 윈도우 내 수익률 분산 기준
+    variance = returns.rolling(GARCH_WINDOW, min_periods=GARCH_MIN_RETURNS).var(ddof=0)
+    omega = GARCH_OMEGA_RATIO * variance
+
+    # 전일까지의 r² 지수가중 합: sum b^(t-1-k) r_k²  (앞에 0을 붙여 초기값을 0으로)
+    weighted = pd.concat([pd.Series([0.0]), squared.reset_index(drop=True)]).ewm(alpha=1 - b, adjust=False).mean()
+    weighted = pd.Series(weighted.to_numpy()[1:] / (1 - b), index=returns.index).shift(1).fillna(0.0)
+
+    # 윈도우 안 재귀 횟수 (m-1)
+    steps = np.minimum(np.arange(len(returns)) + 1, GARCH_WINDOW) - 1
+    decay = b ** steps
+    last_sigma2 = decay * variance + omega * (1 - decay) / (1 - b) + a * weighted
+    forecast = omega + a * squared + b * last_sigma2
+
+    sigma_pct = np.sqrt(forecast) * np.sqrt(252)
+    sigma_pct[variance.isna()] = np.nan
+    annualized = sigma_pct / 100
+    lights = classify(sigma_pct, annualized > 0.4, annualized < 0.2)
+    return {'sigma_pct': sigma_pct}, lights
+
+
+def _to_list(values, dates, decimals=4):
+    """dates 기준으로 맞춘 값 목록 (NaN은 None)"""
+    values = values.reindex(dates).round(decimals)
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def build_history(dates, computed):
+    """
+    computed: {지표: (값 시리즈 dict, 신호등 시리즈)} - dates 기준으로 맞춰 응답 형식으로 변환
+    """
+    series = {}
+    for name, (values, lights) in computed.items():
+        entry = {key: _to_list(value, dates) for key, value in values.items()}
+        entry['lights'] = align_lights(lights, dates).tolist()
+        series[name] = entry
+    return series
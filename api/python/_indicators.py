@@ -0,0 +1,214 @@
+"""
+저메모리 지표 계산 (lean 모드)
+DataFrame에 중간 컬럼을 추가하지 않고 필요한 float 배열만 사용해 MFI/RSI/볼린저 밴드 계산
+입력은 1차원(시간) 또는 2차원(시간 x 종목) 배열, 이동합은 float64 누적합으로 계산해 float32 입력에서도 오차를 줄임
+중간 배열은 스레드별 Workspace 버퍼를 계산기 사이에서 재사용
+
+ANALYSIS_LEAN 환경변수 또는 요청의 lean 옵션으로 켬 (1/true: float64, float32: float32)
+"""
+import threading
+
+import numpy as np
+
+_local = threading.local()
+
+
+def lean_dtype(value):
+    """lean 옵션 해석 - 꺼져 있으면 None, 켜져 있으면 계산에 쓸 dtype"""
+    if value is None or isinstance(value, bool):
+        return np.float64 if value else None
+    value = str(value).strip().lower()
+    if value in ('float32', 'f32', '32'):
+        return np.float32
+    if value in ('1', 'true', 'yes', 'on', 'float64', 'f64', '64'):
+        return np.float64
+    return None
+
+
+class Workspace:
+    """이름별 재사용 버퍼 - 같은 이름을 다시 요청하면 기존 메모리를 덮어씀"""
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, name, shape, dtype):
+        shape = tuple(shape)
+        size = int(np.prod(shape))
+        key = (name, np.dtype(dtype))
+        buffer = self._buffers.get(key)
+        if buffer is None or buffer.size < size:
+            buffer = self._buffers[key] = np.empty(size, dtype=dtype)
+        return buffer[:size].reshape(shape)
+
+    def nbytes(self):
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+    def clear(self):
+        self._buffers.clear()
+
+
+def workspace():
+    """현재 스레드의 Workspace (배치 워커 스레드끼리 버퍼를 공유하지 않음)"""
+    ws = getattr(_local, 'workspace', None)
+    if ws is None:
+        ws = _local.workspace = Workspace()
+    return ws
+
+
+def clean_arrays(df, columns, dtype=np.float64):
+    """
+    df.dropna()와 같은 행(어느 컬럼이든 NaN이면 제외)에서 columns 배열 목록과 날짜 인덱스 반환
+    DataFrame을 복사하지 않고 필요한 컬럼만 배열로 꺼냄
+    """
+    valid = np.ones(len(df), dtype=bool)
+    for col in df.columns:
+        valid &= df[col].notna().to_numpy()
+    arrays = [df[col].to_numpy(dtype=dtype, copy=False) for col in columns]
+    if valid.all():
+        return arrays, df.index
+    return [values[valid] for values in arrays], df.index[valid]
+
+
+def rolling_sum(values, window, out, ws=None, name='rolling_sum'):
+    """
+    축 0 방향 window 이동합 (float64 누적합 차분) - 앞쪽 window-1개는 NaN
+    values는 1차원 또는 2차원, out은 values와 같은 shape
+    """
+    n = values.shape[0]
+    if n < window:
+        out[:] = np.nan
+        return out
+    ws = ws or workspace()
+    acc = ws.get(name, (n + 1,) + values.shape[1:], np.float64)
+    acc[0] = 0.0
+    np.cumsum(values, axis=0, dtype=np.float64, out=acc[1:])
+    out[:window - 1] = np.nan
+    np.subtract(acc[window:], acc[:n - window + 1], out=out[window - 1:], casting='unsafe')
+    return out
+
+
+def trailing_sum(values, window):
+    """
+    축 0 방향 최근 window개 합 - rolling_sum과 달리 앞쪽은 가능한 만큼의 부분 합 (min_periods 처리용)
+    NaN이 없는 값(누락은 0으로 채운 값)을 넣어야 함
+    """
+    n = values.shape[0]
+    acc = np.zeros((n + 1,) + values.shape[1:], dtype=np.float64)
+    np.cumsum(values, axis=0, dtype=np.float64, out=acc[1:])
+    lower = np.maximum(np.arange(n) - window + 1, 0)
+    return acc[1:] - acc[lower]
+
+
+def mfi(high, low, close, volume, period=14, ws=None):
+    """Money Flow Index 시리즈 (앞쪽 period개는 NaN)"""
+    ws = ws or workspace()
+    dtype = close.dtype
+    shape = close.shape
+
+    # Typical Price와 Raw Money Flow
+    tp = ws.get('tp', shape, dtype)
+    np.add(high, low, out=tp)
+    tp += close
+    tp /= 3
+    flow = ws.get('flow', shape, dtype)
+    np.multiply(tp, volume, out=flow)
+
+    # 전일 대비 TP 방향에 따라 양/음 자금 흐름 분리 (첫 행은 방향 없음)
+    positive = ws.get('positive', shape, dtype)
+    negative = ws.get('negative', shape, dtype)
+    positive[0] = 0
+    negative[0] = 0
+    np.multiply(flow[1:], tp[1:] > tp[:-1], out=positive[1:])
+    np.multiply(flow[1:], tp[1:] < tp[:-1], out=negative[1:])
+
+    # period일 합계 (TP 버퍼는 더 이상 필요 없으므로 재사용)
+    positive_sum = rolling_sum(positive, period, tp, ws)
+    negative_sum = rolling_sum(negative, period, flow, ws)
+
+    result = np.empty(shape, dtype=dtype)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(positive_sum, negative_sum, out=result)
+        result += 1
+        np.divide(100, result, out=result)
+        np.subtract(100, result, out=result)
+    result[:period] = np.nan
+    return result
+
+
+def rsi(close, period=14, ws=None):
+    """RSI 시리즈 (단순 이동평균 방식, 앞쪽 period개는 NaN)"""
+    ws = ws or workspace()
+    dtype = close.dtype
+    shape = close.shape
+
+    change = ws.get('change', shape, dtype)
+    change[0] = 0
+    np.subtract(close[1:], close[:-1], out=change[1:])
+
+    gain = ws.get('gain', shape, dtype)
+    loss = ws.get('loss', shape, dtype)
+    np.maximum(change, 0, out=gain)
+    np.minimum(change, 0, out=loss)
+    np.negative(loss, out=loss)
+
+    # 평균의 비율이므로 합계의 비율과 같음 (gain/loss 버퍼 재사용)
+    gain_sum = rolling_sum(gain, period, change, ws)
+    loss_sum = rolling_sum(loss, period, gain, ws)
+
+    result = np.empty(shape, dtype=dtype)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(gain_sum, loss_sum, out=result)
+        result += 1
+        np.divide(100, result, out=result)
+        np.subtract(100, result, out=result)
+    result[:period] = np.nan
+    return result
+
+
+def bollinger(close, period=20, num_std=2, ws=None):
+    """
+    볼린저 밴드 시리즈 (middle, upper, lower, percent_b) - 앞쪽 period-1개는 NaN
+    표준편차는 표본 표준편차(ddof=1), 누적합 오차를 줄이기 위해 첫 값 기준으로 평행 이동해 계산
+    """
+    ws = ws or workspace()
+    dtype = close.dtype
+    shape = close.shape
+    n = shape[0]
+
+    centered = ws.get('centered', shape, np.float64)
+    np.subtract(close, close[:1], out=centered)
+
+    sums = ws.get('sums', shape, np.float64)
+    squares = ws.get('squares', shape, np.float64)
+    rolling_sum(centered, period, sums, ws)
+    np.square(centered, out=centered)
+    rolling_sum(centered, period, squares, ws)
+
+    # 분산 = (제곱합 - 합^2/n) / (n-1)
+    variance = centered
+    np.square(sums, out=variance)
+    variance /= period
+    np.subtract(squares, variance, out=variance)
+    variance /= period - 1
+    np.maximum(variance, 0, out=variance)
+
+    middle = np.empty(shape, dtype=dtype)
+    np.divide(sums, period, out=middle, casting='unsafe')
+    middle += close[:1]
+
+    band = ws.get('band', shape, dtype)
+    np.sqrt(variance, out=band, casting='unsafe')
+    band *= num_std
+
+    upper = middle + band
+    lower = middle - band
+
+    percent_b = np.empty(shape, dtype=dtype)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.subtract(close, lower, out=percent_b)
+        band *= 2
+        np.divide(percent_b, band, out=percent_b)
+
+    for values in (middle, upper, lower, percent_b):
+        values[:min(period - 1, n)] = np.nan
+    return middle, upper, lower, percent_b
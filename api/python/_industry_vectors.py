@@ -0,0 +1,170 @@
+"""
+산업 벡터 검색
+.cache/kospi_vectors.json (src/lib/embeddings.ts와 같은 임베딩 캐시)의 산업/기업/페르소나 벡터를
+프로세스당 한 번 읽어 행 단위로 정규화한 연속 float32 행렬로 보관하고,
+여러 질의 벡터의 코사인 유사도 상위 k개를 행렬 곱 한 번으로 계산
+
+질의 벡터는 Node 쪽과 같은 임베딩 모델(1024차원)로 만든 값을 받음 (Python에서 임베딩 API는 호출하지 않음)
+
+환경변수
+    ANALYSIS_VECTORS_FILE  임베딩 캐시 파일 경로 (기본 .cache/kospi_vectors.json)
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_K = 5
+
+
+def _normalize_rows(matrix):
+    """행 단위 L2 정규화 (영벡터는 그대로 0 - 어떤 질의와도 유사도 0)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+
+class VectorIndex:
+    """라벨 목록과 정규화된 (라벨 x 차원) 행렬"""
+
+    def __init__(self, labels, vectors):
+        self.labels = list(labels)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.matrix = _normalize_rows(vectors.reshape(len(self.labels), -1) if self.labels else np.zeros((0, 0)))
+        self.positions = {label: i for i, label in enumerate(self.labels)}
+
+    @classmethod
+    def from_rows(cls, rows, label_key):
+        rows = [row for row in rows if row.get('vec')]
+        return cls([row[label_key] for row in rows], [row['vec'] for row in rows])
+
+    @property
+    def dim(self):
+        return self.matrix.shape[1]
+
+    def __len__(self):
+        return len(self.labels)
+
+    def scores(self, queries):
+        """(질의 x 라벨) 코사인 유사도 - 질의는 1차원 벡터 하나 또는 (질의 x 차원) 배열"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"Query vectors must have {self.dim} dimensions (got {queries.shape[1]})")
+        return _normalize_rows(queries) @ self.matrix.T
+
+    def search(self, queries, k=DEFAULT_K, exclude=None):
+        """
+        질의별 유사도 상위 k개 [(라벨, 유사도)] 목록 (질의 순서대로)
+        exclude: 질의별로 제외할 라벨 위치 (자기 자신 제외 등, 없으면 None)
+        """
+        scores = self.scores(queries)
+        if exclude is not None:
+            scores[np.arange(len(scores)), exclude] = -np.inf
+        k = min(k, len(self.labels))
+        if k <= 0:
+            return [[] for _ in range(len(scores))]
+
+        # 상위 k개만 부분 정렬 후 정렬
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        return [[(self.labels[j], round(float(s), 6)) for j, s in zip(row, row_scores) if np.isfinite(s)]
+                for row, row_scores in zip(top, top_scores)]
+
+    def neighbors(self, labels, k=DEFAULT_K):
+        """저장된 라벨들과 가장 가까운 다른 라벨 (라벨별 목록, 없는 라벨은 KeyError)"""
+        positions = [self.positions[label] for label in labels]
+        return self.search(self.matrix[positions], k, exclude=positions)
+
+
+class VectorStore:
+    """임베딩 캐시 파일의 산업/기업/페르소나 인덱스"""
+
+    def __init__(self, data):
+        self.industries = VectorIndex.from_rows(data.get('industries') or [], 'industry_ko')
+        self.companies = VectorIndex.from_rows(data.get('companies') or [], 'ticker')
+        self.personas = VectorIndex.from_rows(data.get('personas') or [], 'persona')
+        self.company_industries = {row['ticker']: row.get('industry') for row in data.get('companies') or []}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+
+_store = None
+_lock = threading.Lock()
+
+
+def _vectors_path():
+    configured = os.environ.get('ANALYSIS_VECTORS_FILE')
+    if configured:
+        return Path(configured)
+    candidates = [
+        Path(__file__).parent.parent.parent / '.cache' / 'kospi_vectors.json',
+        Path.cwd() / '.cache' / 'kospi_vectors.json',
+    ]
+    for path in candidates:
+        if path.exists():
+            return path
+    raise FileNotFoundError("kospi_vectors.json 파일을 찾을 수 없습니다")
+
+
+def get_store():
+    """프로세스 공용 벡터 저장소 (첫 호출 시 한 번 로드)"""
+    global _store
+    with _lock:
+        if _store is None:
+            _store = VectorStore.load(_vectors_path())
+        return _store
+
+
+def search_industries(queries, k=DEFAULT_K):
+    """질의 벡터별 유사 산업 상위 k개"""
+    return get_store().industries.search(queries, k)
+
+
+def related_industries(industries, k=DEFAULT_K):
+    """산업별로 가장 가까운 다른 산업 상위 k개"""
+    return get_store().industries.neighbors(industries, k)
+
+
+def search_request(engine, params):
+    """
+    산업 검색 요청 처리 - params: vectors(질의 벡터 목록) 또는 industries(산업명 목록), k
+    산업마다 산업 매핑 기준 소속 종목 목록을 함께 반환
+    """
+    k = int(params.get('k', DEFAULT_K))
+    if not 1 <= k <= 50:
+        raise ValueError("k must be between 1 and 50")
+
+    vectors = params.get('vectors')
+    industries = params.get('industries')
+    if isinstance(industries, str):
+        # 산업명에 쉼표가 들어 있으므로 문자열은 '|'로 구분
+        industries = [name.strip() for name in industries.split('|') if name.strip()]
+
+    if vectors:
+        queries = vectors if isinstance(vectors[0], (list, tuple)) else [vectors]
+        matches = search_industries(queries, k)
+    elif industries:
+        unknown = [name for name in industries if name not in get_store().industries.positions]
+        if unknown:
+            raise ValueError(f"Unknown industries: {', '.join(unknown)}")
+        matches = related_industries(industries, k)
+    else:
+        raise ValueError("vectors or industries parameter is required")
+
+    members = {}
+    for ticker, industry in engine.load_kospi_mapping().items():
+        members.setdefault(industry, []).append(ticker)
+
+    return {
+        'k': k,
+        'results': [[{'industry': industry, 'score': score, 'tickers': members.get(industry, [])}
+                     for industry, score in row] for row in matches],
+    }
@@ -0,0 +1,522 @@
+"""
+장중(분봉) 모드
+종목별 고정 크기 링 버퍼에 분봉을 쌓고, 봉이 들어올 때마다 MFI/RSI/볼린저/실현 변동성을 O(1)로 갱신
+(전체 시계열을 다시 계산하지 않음 - 값은 _indicators의 일봉 계산식과 같음)
+
+메모리는 종목당 버퍼 크기(INTRADAY_BUFFER_BARS)와 종목 수 상한(INTRADAY_MAX_TICKERS, 초과 시 가장 오래
+조회되지 않은 종목 제거)으로 제한
+
+피드 (poll(symbols, since) -> 새 봉 목록 [(심볼, Bar)])
+    since는 버퍼의 심볼별 마지막 봉 시각 (IntradayBook.last_times) - 피드는 심볼별 상태를 따로 두지 않으므로
+    버퍼에서 제거된 종목을 다시 요청하면 그날 분봉 전체로 다시 채움
+    YFinanceMinuteFeed  yfinance 1분봉 폴링 (_fetch_scheduler 경유)
+    ReplayFeed          저장된 분봉을 순서대로 재생 (로컬 테스트용, INTRADAY_REPLAY_DIR의 <심볼>.csv)
+
+파라미터
+    버퍼의 지표 윈도우는 세션 생성 시의 파라미터로 고정 - 요청에서는 신호등 임계값(THRESHOLD_PARAMS)만 바꿀 수 있고
+    그 밖의 파라미터가 세션과 다르면 check_params가 ValueError (조용히 무시하지 않음)
+"""
+import math
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime, time as dtime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+import _log
+import _market_data
+import _params
+
+log = _log.get_logger('intraday')
+
+Bar = namedtuple('Bar', ['time', 'open', 'high', 'low', 'close', 'volume'])
+
+# 한국거래소 정규장 (KST, 서머타임 없음)
+KST = timezone(timedelta(hours=9))
+KRX_OPEN = dtime(9, 0)
+KRX_CLOSE = dtime(15, 30)
+
+# 하루 정규장 분봉 수 (09:00~15:30) - 실현 변동성 연율화에 사용
+BARS_PER_DAY = 390
+TRADING_DAYS = 252
+
+# 요청마다 바꿀 수 있는 파라미터 (스냅샷 분류에만 쓰임)
+THRESHOLD_PARAMS = ('mfi_overbought', 'mfi_oversold', 'rsi_overbought', 'rsi_oversold',
+                    'bollinger_upper', 'bollinger_lower')
+
+# 실현 변동성 윈도우 (분봉 수)
+VOL_WINDOW = 30
+
+# 누적 합계 오차 보정 주기 (봉 수)
+RESUM_EVERY = 1000
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def is_krx_open(now=None):
+    """한국거래소 정규장 시간인지 (주말 제외, 공휴일은 고려하지 않음)"""
+    now = (now or datetime.now(KST)).astimezone(KST)
+    return now.weekday() < 5 and KRX_OPEN <= now.time() < KRX_CLOSE
+
+
+class RingBuffer:
+    """고정 크기 분봉 버퍼 (가득 차면 가장 오래된 봉을 덮어씀)"""
+
+    FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = np.empty(capacity, dtype='datetime64[ns]')
+        self.values = np.empty((capacity, len(self.FIELDS)), dtype=np.float64)
+        self.count = 0
+        self._next = 0
+
+    def append(self, bar):
+        self.times[self._next] = np.datetime64(pd.Timestamp(bar.time).tz_localize(None), 'ns')
+        self.values[self._next] = bar[1:]
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def last_time(self):
+        if not self.count:
+            return None
+        return pd.Timestamp(self.times[(self._next - 1) % self.capacity])
+
+    def _order(self):
+        if self.count < self.capacity:
+            return np.arange(self.count)
+        return (np.arange(self.capacity) + self._next) % self.capacity
+
+    def to_frame(self):
+        """시간순 DataFrame (컬럼은 일봉 데이터와 같은 Open/High/Low/Close/Volume)"""
+        order = self._order()
+        return pd.DataFrame(self.values[order], index=pd.DatetimeIndex(self.times[order]),
+                            columns=[field.title() for field in self.FIELDS])
+
+    def nbytes(self):
+        return self.times.nbytes + self.values.nbytes
+
+
+class WindowSum:
+    """최근 window개 값의 합 (O(1) 갱신, 주기적으로 다시 합산해 오차 보정)"""
+
+    def __init__(self, window):
+        self.window = window
+        self.items = np.zeros(window, dtype=np.float64)
+        self.total = 0.0
+        self.count = 0
+
+    def push(self, value):
+        slot = self.count % self.window
+        self.total += value - self.items[slot]
+        self.items[slot] = value
+        self.count += 1
+        if self.count % RESUM_EVERY == 0:
+            self.total = math.fsum(self.items)
+        return self.total
+
+    @property
+    def full(self):
+        return self.count >= self.window
+
+
+def _ratio_index(up, down):
+    """100 - 100 / (1 + up/down) (down이 0이면 100, 둘 다 0이면 NaN - 배열 계산과 같음)"""
+    if down == 0:
+        return 100.0 if up > 0 else math.nan
+    return 100 - 100 / (1 + up / down)
+
+
+class IncrementalMFI:
+    def __init__(self, period):
+        self.period = period
+        self.positive = WindowSum(period)
+        self.negative = WindowSum(period)
+        self.previous_tp = None
+        self.seen = 0
+        self.value = math.nan
+
+    def update(self, bar):
+        tp = (bar.high + bar.low + bar.close) / 3
+        flow = tp * bar.volume
+        previous, self.previous_tp = self.previous_tp, tp
+        up = self.positive.push(flow if previous is not None and tp > previous else 0.0)
+        down = self.negative.push(flow if previous is not None and tp < previous else 0.0)
+        self.seen += 1
+        self.value = _ratio_index(up, down) if self.seen > self.period else math.nan
+        return self.value
+
+
+class IncrementalRSI:
+    """단순 이동평균 RSI (계산기와 같은 방식)"""
+
+    def __init__(self, period):
+        self.period = period
+        self.gains = WindowSum(period)
+        self.losses = WindowSum(period)
+        self.previous_close = None
+        self.seen = 0
+        self.value = math.nan
+
+    def update(self, bar):
+        change = 0.0 if self.previous_close is None else bar.close - self.previous_close
+        self.previous_close = bar.close
+        gain = self.gains.push(max(change, 0.0))
+        loss = self.losses.push(max(-change, 0.0))
+        self.seen += 1
+        self.value = _ratio_index(gain, loss) if self.seen > self.period else math.nan
+        return self.value
+
+
+class IncrementalBollinger:
+    """이동 평균/표본 표준편차 (첫 종가 기준으로 평행 이동해 합계 오차를 줄임)"""
+
+    def __init__(self, period, num_std):
+        self.period = period
+        self.num_std = num_std
+        self.sums = WindowSum(period)
+        self.squares = WindowSum(period)
+        self.reference = None
+        self.value = None
+
+    def update(self, bar):
+        if self.reference is None:
+            self.reference = bar.close
+        centered = bar.close - self.reference
+        total = self.sums.push(centered)
+        squares = self.squares.push(centered * centered)
+        if not self.sums.full:
+            self.value = None
+            return None
+
+        variance = max((squares - total * total / self.period) / (self.period - 1), 0.0)
+        middle = total / self.period + self.reference
+        band = self.num_std * math.sqrt(variance)
+        upper, lower = middle + band, middle - band
+        percent_b = (bar.close - lower) / (upper - lower) if upper > lower else math.nan
+        self.value = (middle, upper, lower, percent_b)
+        return self.value
+
+
+class RealizedVolatility:
+    """최근 window개 분봉 로그수익률의 실현 변동성 (연율 환산 포함)"""
+
+    def __init__(self, window=VOL_WINDOW):
+        self.window = window
+        self.squares = WindowSum(window)
+        self.previous_close = None
+        self.value = math.nan
+
+    def update(self, bar):
+        if self.previous_close is not None and self.previous_close > 0 and bar.close > 0:
+            r = math.log(bar.close / self.previous_close)
+            total = self.squares.push(r * r)
+            if self.squares.full:
+                self.value = math.sqrt(total / self.window)
+        self.previous_close = bar.close
+        return self.value
+
+    def annualized(self):
+        return self.value * math.sqrt(BARS_PER_DAY * TRADING_DAYS)
+
+
+def _light(value, red, green):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return 'inactive'
+    return 'red' if red else 'green' if green else 'yellow'
+
+
+def _round(value, digits=4):
+    if value is None or math.isnan(value):
+        return None
+    return round(float(value), digits)
+
+
+class TickerState:
+    """종목 하나의 분봉 버퍼와 증분 지표"""
+
+    def __init__(self, symbol, capacity, params):
+        self.symbol = symbol
+        self.params = params
+        self.bars = RingBuffer(capacity)
+        self.mfi = IncrementalMFI(params.mfi_period)
+        self.rsi = IncrementalRSI(params.rsi_period)
+        self.bollinger = IncrementalBollinger(params.bollinger_period, params.bollinger_std)
+        self.volatility = RealizedVolatility()
+
+    def update(self, bar):
+        last = self.bars.last_time()
+        if last is not None and pd.Timestamp(bar.time).tz_localize(None) <= last:
+            return False  # 이미 받은 봉 (폴링 중복)
+        self.bars.append(bar)
+        self.mfi.update(bar)
+        self.rsi.update(bar)
+        self.bollinger.update(bar)
+        self.volatility.update(bar)
+        return True
+
+    def snapshot(self, params=None):
+        p = params or self.params
+        mfi, rsi = self.mfi.value, self.rsi.value
+        percent_b = self.bollinger.value[3] if self.bollinger.value else None
+        vol = self.volatility.value
+        annualized = self.volatility.annualized() if not math.isnan(vol) else math.nan
+
+        lights = {
+            'mfi': _light(mfi, mfi >= p.mfi_overbought, mfi <= p.mfi_oversold),
+            'rsi': _light(rsi, rsi >= p.rsi_overbought, rsi <= p.rsi_oversold),
+            'bollinger': _light(percent_b, percent_b is not None and percent_b >= p.bollinger_upper,
+                                percent_b is not None and percent_b <= p.bollinger_lower),
+            'volatility': _light(annualized, annualized > 0.4, annualized < 0.2),
+        }
+        technical = [lights[name] for name in ('mfi', 'rsi', 'bollinger') if lights[name] != 'inactive']
+        if not technical:
+            traffic_light = 'inactive'
+        elif technical.count('red') >= 2:
+            traffic_light = 'red'
+        elif technical.count('green') >= 2:
+            traffic_light = 'green'
+        else:
+            traffic_light = 'yellow'
+
+        last = self.bars.last_time()
+        bollinger = self.bollinger.value or (None, None, None, None)
+        return {
+            'symbol': self.symbol,
+            'mode': 'intraday',
+            'bars': self.bars.count,
+            'last_bar': last.isoformat() if last is not None else None,
+            'mfi': {'value': _round(mfi, 2), 'traffic_light': lights['mfi']},
+            'rsi': {'value': _round(rsi, 2), 'traffic_light': lights['rsi']},
+            'bollinger': {
+                'middle_band': _round(bollinger[0], 2),
+                'upper_band': _round(bollinger[1], 2),
+                'lower_band': _round(bollinger[2], 2),
+                'percent_b': _round(bollinger[3]),
+                'traffic_light': lights['bollinger'],
+            },
+            'realized_volatility': {
+                'window_bars': self.volatility.window,
+                'per_bar': _round(vol, 6),
+                'annualized': _round(annualized),
+                'traffic_light': lights['volatility'],
+            },
+            'traffic_light': traffic_light,
+        }
+
+    def nbytes(self):
+        windows = (self.mfi.positive, self.mfi.negative, self.rsi.gains, self.rsi.losses,
+                   self.bollinger.sums, self.bollinger.squares, self.volatility.squares)
+        return self.bars.nbytes() + sum(window.items.nbytes for window in windows)
+
+
+class IntradayBook:
+    """종목별 TickerState 모음 (종목 수 상한 초과 시 가장 오래 사용되지 않은 종목 제거)"""
+
+    def __init__(self, capacity=None, max_tickers=None, params=_params.DEFAULT_PARAMS):
+        self.capacity = capacity or _env_int('INTRADAY_BUFFER_BARS', BARS_PER_DAY)
+        self.max_tickers = max_tickers or _env_int('INTRADAY_MAX_TICKERS', 500)
+        self.params = params
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+        longest = max(params.mfi_period, params.rsi_period, params.bollinger_period, VOL_WINDOW)
+        if self.capacity <= longest:
+            raise ValueError(f"Intraday buffer ({self.capacity} bars) must exceed the longest window ({longest})")
+
+    def _state_locked(self, symbol):
+        state = self._states.get(symbol)
+        if state is None:
+            state = self._states[symbol] = TickerState(symbol, self.capacity, self.params)
+            while len(self._states) > self.max_tickers:
+                evicted, _ = self._states.popitem(last=False)
+                log.debug("장중 버퍼 제거: %s", evicted)
+        else:
+            self._states.move_to_end(symbol)
+        return state
+
+    def on_bar(self, symbol, bar):
+        with self._lock:
+            return self._state_locked(symbol).update(bar)
+
+    def apply(self, updates):
+        """피드에서 받은 [(심볼, Bar)] 반영 - 새로 추가된 봉 수 반환"""
+        added = 0
+        with self._lock:
+            for symbol, bar in updates:
+                added += self._state_locked(symbol).update(bar)
+        return added
+
+    def check_params(self, params):
+        """요청 파라미터 중 임계값이 아닌 값이 버퍼 파라미터와 다르면 ValueError"""
+        fixed = [name for name in _params.PARAM_SPECS
+                 if name not in THRESHOLD_PARAMS and getattr(params, name) != getattr(self.params, name)]
+        if fixed:
+            raise ValueError(f"intraday mode only supports threshold params; unsupported: {', '.join(fixed)}")
+
+    def snapshot(self, symbol, params=None):
+        """종목 스냅샷 (params가 있으면 그 임계값으로 신호등 분류) - 버퍼에 없으면 None"""
+        with self._lock:
+            state = self._states.get(symbol)
+            return state.snapshot(params) if state is not None else None
+
+    def frame(self, symbol):
+        with self._lock:
+            state = self._states.get(symbol)
+            return state.bars.to_frame() if state is not None else None
+
+    def symbols(self):
+        with self._lock:
+            return list(self._states)
+
+    def last_times(self, symbols):
+        """버퍼에 있는 심볼의 마지막 봉 시각 {심볼: Timestamp} (없는 심볼은 제외)"""
+        with self._lock:
+            times = {}
+            for symbol in symbols:
+                state = self._states.get(symbol)
+                if state is not None and state.bars.count:
+                    times[symbol] = state.bars.last_time()
+            return times
+
+    def nbytes(self):
+        with self._lock:
+            return sum(state.nbytes() for state in self._states.values())
+
+
+def _frame_bars(frame):
+    """분봉 DataFrame -> Bar 목록 (NaN 행 제외)"""
+    frame = frame[['Open', 'High', 'Low', 'Close', 'Volume']].dropna()
+    return [Bar(time, *values) for time, values in zip(frame.index, frame.to_numpy(dtype=np.float64).tolist())]
+
+
+def _naive(time):
+    return pd.Timestamp(time).tz_localize(None)
+
+
+class YFinanceMinuteFeed:
+    """yfinance 1분봉 폴링 - 심볼별로 since 이후 봉만 반환 (since에 없는 심볼은 받은 분봉 전체)"""
+
+    def __init__(self, interval='1m', period='1d'):
+        self.interval = interval
+        self.period = period
+
+    def poll(self, symbols, since=None):
+        since = since or {}
+        yahoo = {_market_data.to_yahoo_symbol(symbol): symbol for symbol in symbols}
+        frames = _market_data.load_intraday(list(yahoo), period=self.period, interval=self.interval)
+        updates = []
+        for yahoo_symbol, frame in frames.items():
+            symbol = yahoo[yahoo_symbol]
+            last = since.get(symbol)
+            updates.extend((symbol, bar) for bar in _frame_bars(frame) if last is None or _naive(bar.time) > last)
+        return updates
+
+
+class ReplayFeed:
+    """
+    저장된 분봉 재생 - poll 한 번에 심볼별로 step개씩 다음 봉을 반환 (끝나면 빈 목록)
+    since가 주어졌는데 심볼이 없으면(버퍼에서 제거됨) 지금까지 재생한 봉부터 다시 반환
+    frames: {심볼: Open/High/Low/Close/Volume 분봉 DataFrame}
+    """
+
+    def __init__(self, frames, step=1):
+        self.step = step
+        self._bars = {symbol: _frame_bars(frame.sort_index()) for symbol, frame in frames.items()}
+        self._positions = {symbol: 0 for symbol in self._bars}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_directory(cls, path, step=1):
+        """path/<심볼>.csv (첫 컬럼은 시간) 파일들로 생성"""
+        frames = {}
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.csv'):
+                frames[name[:-4].upper()] = pd.read_csv(os.path.join(path, name), index_col=0, parse_dates=True)
+        return cls(frames, step)
+
+    def poll(self, symbols, since=None):
+        updates = []
+        with self._lock:
+            for symbol in symbols:
+                bars = self._bars.get(symbol, [])
+                start = self._positions.get(symbol, 0)
+                chunk = bars[start:start + self.step]
+                self._positions[symbol] = start + len(chunk)
+                if since is not None and symbol not in since:
+                    chunk = bars[:start + len(chunk)]
+                updates.extend((symbol, bar) for bar in chunk)
+        return updates
+
+    def exhausted(self, symbol):
+        return self._positions.get(symbol, 0) >= len(self._bars.get(symbol, []))
+
+
+def default_feed():
+    """INTRADAY_REPLAY_DIR가 있으면 재생 피드, 없으면 yfinance 분봉 폴링"""
+    replay_dir = os.environ.get('INTRADAY_REPLAY_DIR')
+    if replay_dir:
+        return ReplayFeed.from_directory(replay_dir, step=_env_int('INTRADAY_REPLAY_STEP', 1))
+    return YFinanceMinuteFeed()
+
+
+class IntradaySession:
+    """피드와 버퍼 묶음 - 요청 시 한 번 폴링(refresh)하거나 백그라운드 스레드로 주기적 폴링"""
+
+    def __init__(self, feed=None, book=None):
+        self.feed = feed or default_feed()
+        self.book = book or IntradayBook()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def refresh(self, symbols):
+        updates = self.feed.poll(symbols, self.book.last_times(symbols))
+        return self.book.apply(updates)
+
+    def start(self, symbols, interval=60.0):
+        """interval초마다 symbols 폴링 (장 시간에만, 데몬 스레드)"""
+        def run():
+            while not self._stop.wait(interval):
+                if not is_krx_open():
+                    continue
+                try:
+                    self.refresh(symbols)
+                except Exception as e:
+                    log.warning("장중 데이터 폴링 실패: %s", e)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name='intraday-feed', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """프로세스 공용 세션 (첫 호출 시 생성)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = IntradaySession()
+        return _session
+
+
+def set_session(session):
+    """세션 교체 (재생 피드 테스트 등) - 이전 세션 반환"""
+    global _session
+    with _session_lock:
+        previous = _session
+        _session = session
+        return previous
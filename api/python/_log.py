@@ -0,0 +1,102 @@
+"""
+분석 서비스 공용 로깅 설정
+기본은 WARNING 이상만 stderr로 출력하고, 환경변수로 레벨/포맷/샘플링 조정
+
+    ANALYSIS_LOG_LEVEL        DEBUG | INFO | WARNING | ERROR (기본 WARNING)
+    ANALYSIS_LOG_FORMAT       text | json (기본 text)
+    ANALYSIS_LOG_SAMPLE_RATE  0~1, DEBUG/INFO 로그 중 출력할 비율 (기본 1.0)
+
+메시지는 logger.debug("... %s", value) 형태로 넘겨 레벨이 꺼져 있으면 포맷팅 비용이 없도록 함
+"""
+import json
+import logging
+import os
+import random
+import sys
+import threading
+
+ROOT_LOGGER_NAME = 'analysis'
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+class SamplingFilter(logging.Filter):
+    """WARNING 미만 로그를 sample_rate 비율로만 통과시킴"""
+
+    def __init__(self, sample_rate):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.sample_rate >= 1.0:
+            return True
+        return random.random() < self.sample_rate
+
+
+class TextFormatter(logging.Formatter):
+    """기존 로그 형식 유지: [TAG] 메시지"""
+
+    def format(self, record):
+        message = f"[{record.name.rsplit('.', 1)[-1].upper()}] {record.getMessage()}"
+        if record.exc_info:
+            message = f"{message}\n{self.formatException(record.exc_info)}"
+        return message
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 구조화 로그"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _parse_sample_rate(value):
+    try:
+        return min(max(float(value), 0.0), 1.0)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def configure(level=None, fmt=None, sample_rate=None):
+    """루트 분석 로거 설정 (인자를 생략하면 환경변수 사용)"""
+    global _configured
+
+    level = (level or os.environ.get('ANALYSIS_LOG_LEVEL') or 'WARNING').upper()
+    fmt = (fmt or os.environ.get('ANALYSIS_LOG_FORMAT') or 'text').lower()
+    if sample_rate is None:
+        sample_rate = _parse_sample_rate(os.environ.get('ANALYSIS_LOG_SAMPLE_RATE', '1.0'))
+
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    with _configure_lock:
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+        stream_handler.addFilter(SamplingFilter(sample_rate))
+
+        root.addHandler(stream_handler)
+        root.setLevel(getattr(logging, level, logging.WARNING))
+        root.propagate = False
+        _configured = True
+
+    return root
+
+
+def get_logger(name):
+    """analysis.<name> 로거 반환 (최초 호출 시 환경변수로 설정)"""
+    if not _configured:
+        configure()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
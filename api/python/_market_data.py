@@ -0,0 +1,371 @@
+"""
+시장 데이터 로드 공용 모듈
+yfinance 조회 결과를 프로세스 단위로 캐시하고, 같은 심볼을 동시에 요청하면 다운로드는 한 번만 수행
+더 짧은 기간 요청은 캐시된 더 긴 기간 데이터를 잘라서 반환 (재다운로드 없음)
+제공자가 데이터 없음을 확인한 심볼(상장폐지, 오타 등)은 부정 캐시에 기록해 유지 시간 동안 다운로드 없이 바로 실패
+모든 다운로드는 _fetch_scheduler(요청 속도/동시성 제한, 재시도, 회로 차단기)를 거침
+(파일명이 _로 시작하므로 Vercel 서버리스 함수로 배포되지 않음)
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import pandas as pd
+import yfinance as yf
+
+import _fetch_scheduler
+
+# 캐시 유지 시간 (초)
+CACHE_TTL_SECONDS = 15 * 60
+
+# 캐시 최대 항목 수 (넘으면 가장 오래 쓰지 않은 항목부터 제거)와 만료 항목 정리 주기 (초)
+CACHE_MAX_ENTRIES = 2048
+CACHE_SWEEP_INTERVAL_SECONDS = 60
+
+# 데이터 없음 결과(부정 캐시) 유지 시간 (초)와 최대 항목 수
+NEGATIVE_TTL_SECONDS = 5 * 60
+NEGATIVE_MAX_ENTRIES = 1024
+
+# yf.download 한 번에 요청할 최대 심볼 수
+BULK_CHUNK_SIZE = 100
+
+# yfinance history()는 기본 설정에서 네트워크 오류/요청 한도 초과까지 로그만 남기고 빈 DataFrame을 반환해
+# 스케줄러의 재시도와 회로 차단기가 오류를 볼 수 없음 -> 예외를 그대로 올리도록 설정
+# (데이터 없음도 YFPricesMissingError/YFTzMissingError로 올라오므로 _download_range에서 NoDataError로 변환)
+if hasattr(yf, 'config'):
+    yf.config.debug.hide_exceptions = False
+    HISTORY_OPTIONS = {}
+else:  # 구버전 yfinance
+    HISTORY_OPTIONS = {'raise_errors': True}
+
+
+def to_yahoo_symbol(symbol):
+    """티커를 야후 파이낸스 심볼로 변환 (한국 주식은 .KS 접미사 추가)"""
+    if symbol.startswith('^'):  # 지수 심볼 (^KS11, ^IXIC 등)
+        return symbol
+    if symbol.isdigit() and len(symbol) == 6:  # 한국 주식 코드 (6자리 숫자)
+        return f"{symbol}.KS"
+    if '.' not in symbol:  # 접미사가 없는 일반 주식
+        return f"{symbol}.KS"
+    return symbol
+
+
+def normalize_history(hist):
+    """컬럼명 표준화 및 timezone 제거"""
+    hist.columns = [col.replace(' ', '').title() for col in hist.columns]
+    hist.rename(columns={'Adjclose': 'AdjClose'}, inplace=True)
+
+    # timezone 정보 제거 (일관성을 위해)
+    if hist.index.tz is not None:
+        hist.index = hist.index.tz_localize(None)
+    return hist
+
+
+class NoDataError(ValueError):
+    """제공자가 심볼/기간에 데이터가 없다고 확인 (YFPricesMissingError/YFTzMissingError, 부정 캐시 대상)"""
+
+
+class PriceCache:
+    """
+    TTL 기반 가격 데이터 캐시 (진행 중인 다운로드 중복 제거, 데이터 없음 결과의 부정 캐시 포함)
+    키에 요청의 임의 기간이 들어가므로 항목 수는 max_entries로 제한 (LRU), 만료 항목은 put 때 주기적으로 정리
+    부정 캐시도 max_misses개까지만 유지 (오래된 기록부터 제거)
+    """
+
+    def __init__(self, ttl=CACHE_TTL_SECONDS, negative_ttl=NEGATIVE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES,
+                 max_misses=NEGATIVE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.max_misses = max_misses
+        self._entries = OrderedDict()
+        self._swept_at = time.time()
+        self._misses = OrderedDict()  # 키 -> (기록 시각, 오류 메시지)
+        self._inflight = {}
+        self._spans = {}  # 심볼 -> 캐시된 최근 N일 기간들 (load_history 키)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._get_locked(key)
+
+    def _get_locked(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, frame = entry
+        if time.time() - stored_at > self.ttl:
+            self._remove_locked(key)
+            return None
+        self._entries.move_to_end(key)
+        return frame
+
+    def _remove_locked(self, key):
+        del self._entries[key]
+        if len(key) == 2:
+            spans = self._spans.get(key[0])
+            if spans is not None:
+                spans.discard(key[1])
+                if not spans:
+                    del self._spans[key[0]]
+
+    def _sweep_locked(self, now):
+        """만료 항목 정리 (CACHE_SWEEP_INTERVAL_SECONDS마다)"""
+        if now - self._swept_at < CACHE_SWEEP_INTERVAL_SECONDS:
+            return
+        self._swept_at = now
+        for key in [key for key, (stored_at, _) in self._entries.items() if now - stored_at > self.ttl]:
+            self._remove_locked(key)
+
+    def _miss_locked(self, key):
+        entry = self._misses.get(key)
+        if entry is None:
+            return None
+        stored_at, message = entry
+        if time.time() - stored_at > self.negative_ttl:
+            del self._misses[key]
+            return None
+        return message
+
+    def is_missing(self, key):
+        """데이터 없음으로 기록된 키인지 (유지 시간 내)"""
+        with self._lock:
+            return self._miss_locked(key) is not None
+
+    def put_missing(self, key, message):
+        with self._lock:
+            self._misses[key] = (time.time(), message)
+            self._misses.move_to_end(key)
+            while len(self._misses) > self.max_misses:
+                self._misses.popitem(last=False)
+
+    def put(self, key, frame):
+        with self._lock:
+            now = time.time()
+            self._sweep_locked(now)
+            self._entries[key] = (now, frame)
+            self._entries.move_to_end(key)
+            if len(key) == 2:
+                self._spans.setdefault(key[0], set()).add(key[1])
+            while len(self._entries) > self.max_entries:
+                self._remove_locked(next(iter(self._entries)))
+
+    def find_covering(self, symbol, days):
+        """symbol의 캐시 중 days일 이상을 담은 가장 짧은 (기간, 데이터) 반환 (없으면 None)"""
+        with self._lock:
+            spans = self._spans.get(symbol)
+            if not spans:
+                return None
+            for span in sorted(span for span in spans if span >= days):
+                frame = self._get_locked((symbol, span))
+                if frame is not None:
+                    return span, frame
+                spans.discard(span)
+            return None
+
+    def get_or_load(self, key, loader):
+        """
+        캐시에 없으면 loader로 로드 - 같은 키를 로드 중인 스레드가 있으면 완료를 기다림
+        loader가 NoDataError를 내면 부정 캐시에 기록하고, 이후 같은 키는 다운로드 없이 같은 오류
+        """
+        while True:
+            with self._lock:
+                frame = self._get_locked(key)
+                if frame is not None:
+                    return frame
+                message = self._miss_locked(key)
+                if message is not None:
+                    raise NoDataError(message)
+                event = self._inflight.get(key)
+                owner = event is None
+                if owner:
+                    event = threading.Event()
+                    self._inflight[key] = event
+
+            if not owner:
+                # 다른 스레드의 다운로드 완료 대기 후 캐시 재확인 (실패했으면 직접 로드)
+                event.wait()
+                continue
+
+            try:
+                frame = loader()
+                self.put(key, frame)
+                return frame
+            except NoDataError as e:
+                self.put_missing(key, str(e))
+                raise
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                event.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._spans.clear()
+            self._misses.clear()
+
+
+_cache = PriceCache()
+
+
+class YFinanceProvider:
+    """기본 데이터 제공자 - yfinance 호출"""
+
+    def history(self, yahoo_symbol, start, end):
+        return yf.Ticker(yahoo_symbol).history(start=start, end=end, **HISTORY_OPTIONS)
+
+    def download(self, yahoo_symbols, start, end):
+        return yf.download(yahoo_symbols, start=start, end=end, group_by='ticker',
+                           auto_adjust=True, threads=True, progress=False)
+
+    def intraday(self, yahoo_symbols, period, interval):
+        return yf.download(yahoo_symbols, period=period, interval=interval, group_by='ticker',
+                           auto_adjust=True, threads=True, progress=False)
+
+
+_provider = YFinanceProvider()
+
+
+def get_provider():
+    return _provider
+
+
+def set_provider(provider):
+    """데이터 제공자 교체 (벤치마크/부하 테스트용 합성 데이터 등) - 캐시는 비움, 이전 제공자 반환"""
+    global _provider
+    previous = _provider
+    _provider = provider
+    _cache.clear()
+    return previous
+
+
+def _date_range(days):
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+    return start_date, end_date
+
+
+def _download_history(yahoo_symbol, days):
+    start_date, end_date = _date_range(days)
+    return _download_range(yahoo_symbol, start_date, end_date)
+
+
+def _download_range(yahoo_symbol, start, end):
+    try:
+        hist = _fetch_scheduler.call(_provider.history, yahoo_symbol, start, end)
+    except _fetch_scheduler.MISSING_DATA_ERRORS as e:
+        raise NoDataError(f"No data available for {yahoo_symbol}") from e
+    if hist is None or hist.empty:
+        # 오류 없이 빈 데이터 - 일시적일 수 있으므로 부정 캐시하지 않음
+        raise ValueError(f"No data available for {yahoo_symbol}")
+    return normalize_history(hist)
+
+
+def _slice_recent(frame, days):
+    """캐시된 긴 기간 데이터에서 최근 days일만 잘라냄"""
+    start_date, _ = _date_range(days)
+    return frame.loc[frame.index >= pd.Timestamp(start_date).normalize()]
+
+
+def load_history(yahoo_symbol, days=365):
+    """
+    야후 심볼의 최근 days일 일봉 데이터 로드 (캐시 사용)
+    days 이상을 담은 캐시가 있으면 다운로드 없이 잘라서 반환
+    """
+    covering = _cache.find_covering(yahoo_symbol, days)
+    if covering is not None:
+        span, frame = covering
+        return frame if span == days else _slice_recent(frame, days)
+    return _cache.get_or_load((yahoo_symbol, days), lambda: _download_history(yahoo_symbol, days))
+
+
+def has_history(yahoo_symbol, days=365):
+    """load_history(yahoo_symbol, days)를 다운로드 없이 캐시로 응답할 수 있는지 확인"""
+    return _cache.find_covering(yahoo_symbol, days) is not None
+
+
+def seed_history(yahoo_symbol, days, frame):
+    """이미 가진 데이터를 load_history(yahoo_symbol, days) 캐시에 넣음 (프로세스 풀 워커 등)"""
+    _cache.put((yahoo_symbol, days), frame)
+
+
+def load_history_range(yahoo_symbol, start, end):
+    """지정한 기간(start~end, 'YYYY-MM-DD')의 일봉 데이터 로드 (캐시 사용)"""
+    return _cache.get_or_load((yahoo_symbol, start, end), lambda: _download_range(yahoo_symbol, start, end))
+
+
+def _split_bulk_frame(data, yahoo_symbol):
+    if isinstance(data.columns, pd.MultiIndex):
+        if yahoo_symbol not in data.columns.get_level_values(0):
+            return None
+        frame = data[yahoo_symbol]
+    else:
+        frame = data
+    frame = frame.dropna(how='all')
+    if frame.empty:
+        return None
+    return normalize_history(frame.copy())
+
+
+def prefetch_history(yahoo_symbols, days=365):
+    """
+    여러 심볼을 yf.download로 묶어서 미리 받아 캐시에 저장
+    이미 캐시된 심볼과 중복 심볼은 제외, 실패한 심볼은 개별 로드 시 다시 시도됨
+    """
+    start_date, end_date = _date_range(days)
+    uncovered = [s for s in yahoo_symbols if _cache.find_covering(s, days) is None]
+    return _prefetch(uncovered, lambda s: (s, days), start_date, end_date)
+
+
+def prefetch_history_range(yahoo_symbols, start, end):
+    """prefetch_history의 기간 지정 버전 - load_history_range(s, start, end)와 같은 캐시 키로 저장"""
+    return _prefetch(yahoo_symbols, lambda s: (s, start, end), start, end)
+
+
+def _prefetch(yahoo_symbols, cache_key, start_date, end_date):
+    pending = [s for s in dict.fromkeys(yahoo_symbols)
+               if _cache.get(cache_key(s)) is None and not _cache.is_missing(cache_key(s))]
+    if not pending:
+        return 0
+
+    loaded = 0
+    for i in range(0, len(pending), BULK_CHUNK_SIZE):
+        chunk = pending[i:i + BULK_CHUNK_SIZE]
+        try:
+            data = _fetch_scheduler.call(_provider.download, chunk, start_date, end_date)
+        except Exception:
+            continue
+        if data is None or data.empty:
+            continue
+
+        for yahoo_symbol in chunk:
+            frame = _split_bulk_frame(data, yahoo_symbol)
+            if frame is not None:
+                _cache.put(cache_key(yahoo_symbol), frame)
+                loaded += 1
+
+    return loaded
+
+
+def load_intraday(yahoo_symbols, period='1d', interval='1m'):
+    """
+    분봉 데이터 조회 (장중 모드 폴링용, 캐시하지 않음) - {야후 심볼: DataFrame}
+    데이터가 없는 심볼은 결과에서 빠짐
+    """
+    frames = {}
+    for i in range(0, len(yahoo_symbols), BULK_CHUNK_SIZE):
+        chunk = yahoo_symbols[i:i + BULK_CHUNK_SIZE]
+        data = _fetch_scheduler.call(_provider.intraday, chunk, period, interval)
+        if data is None or data.empty:
+            continue
+        for yahoo_symbol in chunk:
+            frame = _split_bulk_frame(data, yahoo_symbol)
+            if frame is not None:
+                frames[yahoo_symbol] = frame
+    return frames
+
+
+def clear_cache():
+    _cache.clear()
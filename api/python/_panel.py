@@ -0,0 +1,146 @@
+"""
+거래일 정렬 가격 패널
+여러 종목의 일봉을 KRX 거래일(KOSPI 지수 ^KS11 종가가 있는 날) 기준으로 한 번에 정렬해
+(날짜 x 종목) 가격/수익률 배열과 누락 마스크로 보관
+timezone 정규화, 정렬, 공통 거래일 선택을 분석마다 따로 하지 않고 CAPM/산업/과거 시계열/백테스트가 공유
+
+    prices    종가 (거래일에 가격이 없으면 NaN)
+    observed  가격 존재 마스크
+    returns   전 거래일 대비 단순 수익률 (연속한 두 거래일 모두 가격이 있을 때만, 나머지 NaN)
+    valid     수익률 존재 마스크 (observed[t] & observed[t-1])
+
+지수를 받을 수 없거나 KRX 외 종목이 섞여 있으면 전체 종목 날짜의 합집합을 거래일로 사용
+"""
+import numpy as np
+import pandas as pd
+
+MARKET_SYMBOL = '^KS11'
+
+# KRX 상장 종목의 야후 심볼 접미사 (코스피, 코스닥)
+KRX_SUFFIXES = ('.KS', '.KQ')
+
+
+def is_krx_symbol(symbol):
+    """KRX 상장 종목 심볼인지 (.KS/.KQ 접미사 또는 6자리 종목 코드)"""
+    symbol = symbol.upper()
+    return symbol.endswith(KRX_SUFFIXES) or (symbol.isdigit() and len(symbol) == 6)
+
+
+def _naive_index(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index
+
+
+def clean_series(data, field='Close'):
+    """DataFrame(field 컬럼) 또는 Series -> 결측 제거, timezone 제거, 중복 날짜 정리 후 날짜순 Series"""
+    series = data[field] if isinstance(data, pd.DataFrame) else data
+    series = series.dropna()
+    series.index = _naive_index(series.index)
+    return series[~series.index.duplicated(keep='last')].sort_index()
+
+
+def trading_calendar(market_frame, field='Close'):
+    """KOSPI 지수 일봉에서 거래일 인덱스"""
+    return clean_series(market_frame, field).index
+
+
+def _union_calendar(series_list):
+    calendar = pd.DatetimeIndex([])
+    for series in series_list:
+        calendar = calendar.union(series.index)
+    return calendar
+
+
+def align_fields(frames, calendar=None, fields=('Close',)):
+    """
+    종목별 일봉 frame -> {컬럼: (거래일 x 종목) DataFrame}
+    calendar가 없으면 종목 날짜의 합집합 사용
+    """
+    frames = {ticker: frame.set_axis(_naive_index(frame.index), axis=0) for ticker, frame in frames.items()}
+    frames = {ticker: frame[~frame.index.duplicated(keep='last')] for ticker, frame in frames.items()}
+    calendar = _naive_index(calendar) if calendar is not None else \
+        _union_calendar([frame.dropna(how='all') for frame in frames.values()])
+    return {field: pd.concat({ticker: frame[field] for ticker, frame in frames.items()}, axis=1).reindex(calendar)
+            for field in fields}
+
+
+class PricePanel:
+    """(거래일 x 종목) 종가/수익률 배열과 누락 마스크"""
+
+    def __init__(self, dates, tickers, prices):
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        self.positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.prices = np.asarray(prices, dtype=np.float64).reshape(len(self.dates), len(self.tickers))
+        self.observed = np.isfinite(self.prices)
+
+        self.valid = np.zeros(self.prices.shape, dtype=bool)
+        self.returns = np.full(self.prices.shape, np.nan)
+        if len(self.dates) > 1:
+            self.valid[1:] = self.observed[1:] & self.observed[:-1]
+            # 큰 패널에서 임시 배열이 생기지 않도록 제자리 연산
+            with np.errstate(divide='ignore', invalid='ignore'):
+                np.divide(self.prices[1:], self.prices[:-1], out=self.returns[1:])
+            self.returns[1:] -= 1
+            self.returns[~self.valid] = np.nan
+
+    @classmethod
+    def build(cls, data, calendar=None, field='Close'):
+        """
+        data: {종목: 일봉 DataFrame 또는 종가 Series} (None은 건너뜀)
+        calendar: 거래일 인덱스 (trading_calendar) - 없으면 종목 날짜의 합집합
+        """
+        columns = {ticker: clean_series(values, field) for ticker, values in data.items() if values is not None}
+        calendar = _naive_index(calendar) if calendar is not None else _union_calendar(columns.values())
+        prices = np.empty((len(calendar), len(columns)))
+        for i, series in enumerate(columns.values()):
+            prices[:, i] = series.reindex(calendar).to_numpy(dtype=np.float64)
+        return cls(calendar, columns, prices)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def _columns(self, tickers):
+        if tickers is None:
+            return list(range(len(self.tickers)))
+        return [self.positions[ticker] for ticker in tickers]
+
+    def complete_rows(self, tickers=None):
+        """모든 (지정) 종목에 가격이 있는 거래일 마스크"""
+        return self.observed[:, self._columns(tickers)].all(axis=1)
+
+    def take(self, rows):
+        """선택한 거래일만 남긴 새 패널 (수익률은 남은 거래일 사이로 다시 계산)"""
+        return PricePanel(self.dates[rows], self.tickers, self.prices[rows])
+
+    def mean_returns(self, tickers=None):
+        """
+        동일가중 평균 수익률과 존재 마스크
+        날짜마다 수익률이 있는 종목만 평균 (모두 없으면 NaN)
+        """
+        columns = self._columns(tickers)
+        valid = self.valid[:, columns]
+        counts = valid.sum(axis=1)
+        totals = np.where(valid, self.returns[:, columns], 0.0).sum(axis=1)
+        with np.errstate(invalid='ignore'):
+            mean = np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+        return mean, counts > 0
+
+    def paired_returns(self, ticker, other):
+        """
+        두 종목 수익률이 모두 있는 거래일의 (ticker 수익률, other 수익률, 날짜)
+        other는 종목 이름 또는 (값 배열, 마스크) - mean_returns 결과를 그대로 넘길 수 있음
+        """
+        i = self.positions[ticker]
+        if isinstance(other, tuple):
+            other_values, other_valid = other
+        else:
+            j = self.positions[other]
+            other_values, other_valid = self.returns[:, j], self.valid[:, j]
+        mask = self.valid[:, i] & other_valid
+        return self.returns[mask, i], other_values[mask], self.dates[mask]
+
+    def returns_frame(self):
+        return pd.DataFrame(self.returns, index=self.dates, columns=self.tickers)
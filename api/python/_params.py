@@ -0,0 +1,84 @@
+"""
+분석 파라미터 (조회 기간, 지표 윈도우, 신호등 임계값)
+요청 파라미터(쿼리 문자열 또는 JSON 본문)에서 허용 범위를 검증해 읽고, 지정하지 않은 값은 기본값 사용
+기본값은 기존 계산기의 고정값과 같음
+"""
+
+# 이름: (기본값, 최소, 최대, 타입)
+PARAM_SPECS = {
+    'lookback_days': (365, 60, 3650, int),
+    'mfi_period': (14, 2, 100, int),
+    'mfi_overbought': (80.0, 50.0, 100.0, float),
+    'mfi_oversold': (20.0, 0.0, 50.0, float),
+    'rsi_period': (14, 2, 100, int),
+    'rsi_overbought': (70.0, 50.0, 100.0, float),
+    'rsi_oversold': (30.0, 0.0, 50.0, float),
+    'bollinger_period': (20, 5, 200, int),
+    'bollinger_std': (2.0, 0.5, 5.0, float),
+    'bollinger_upper': (0.8, 0.5, 1.5, float),
+    'bollinger_lower': (0.2, -0.5, 0.5, float),
+    'capm_window': (126, 20, 756, int),
+    'industry_window': (126, 20, 756, int),
+    'industry_peers': (10, 1, 50, int),
+}
+
+
+class AnalysisParams:
+    """검증된 분석 파라미터 (속성으로 접근, 변경 불가)"""
+
+    __slots__ = tuple(PARAM_SPECS)
+
+    def __init__(self, **values):
+        for name, (default, _, _, _) in PARAM_SPECS.items():
+            object.__setattr__(self, name, values.get(name, default))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("AnalysisParams is immutable")
+
+    def changed(self):
+        """기본값과 다른 파라미터만 dict로 반환"""
+        return {name: getattr(self, name) for name, spec in PARAM_SPECS.items()
+                if getattr(self, name) != spec[0]}
+
+    def cache_key(self):
+        """ETag 등에 쓰는 안정적인 키 (기본값만 쓰면 빈 튜플)"""
+        return tuple(sorted(self.changed().items()))
+
+    def __repr__(self):
+        return f"AnalysisParams({self.changed()})"
+
+
+DEFAULT_PARAMS = AnalysisParams()
+
+
+def _coerce(name, value):
+    default, minimum, maximum, cast = PARAM_SPECS[name]
+    try:
+        number = float(value)
+        if cast is int:
+            if not number.is_integer():
+                raise ValueError
+            number = int(number)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for {name}: {value!r}")
+    if not minimum <= number <= maximum:
+        raise ValueError(f"{name} must be between {minimum} and {maximum} (got {value})")
+    return number
+
+
+def from_request(values):
+    """
+    요청 값 dict(쿼리는 첫 값만 넘김)에서 알려진 파라미터만 골라 검증
+    범위를 벗어나거나 과매수/과매도 임계값 순서가 뒤집히면 ValueError
+    """
+    parsed = {name: _coerce(name, values[name]) for name in PARAM_SPECS
+              if name in values and values[name] not in (None, '')}
+    if not parsed:
+        return DEFAULT_PARAMS
+
+    params = AnalysisParams(**parsed)
+    for low, high in (('mfi_oversold', 'mfi_overbought'), ('rsi_oversold', 'rsi_overbought'),
+                      ('bollinger_lower', 'bollinger_upper')):
+        if getattr(params, low) >= getattr(params, high):
+            raise ValueError(f"{low} must be lower than {high}")
+    return params
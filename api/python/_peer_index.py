@@ -0,0 +1,204 @@
+"""
+동종 기업(peer) 인덱스
+같은 산업 종목 중 최근 일간 수익률 상관계수가 높은 순서로 상위 k개를 미리 계산해 JSON으로 저장하고,
+요청 시에는 dict 조회 한 번으로 동종 기업 목록 반환 (인덱스에 없는 종목은 기존 산업 매핑 순서로 대체)
+
+갱신
+    - python api/python/_peer_index.py (로컬/배치 작업) - 기본 경로 src/data/kospi_peer_index.json에 저장해 커밋
+      (파일이 없으면 모든 종목이 산업 매핑 순서를 사용)
+    - GET /api/python/unified_analysis?type=peer_index (외부 스케줄러용, Authorization: Bearer $CRON_SECRET 필요)
+      배포 번들의 src/data는 읽기 전용이고 인스턴스마다 메모리가 따로이므로, ANALYSIS_PEER_INDEX_FILE이
+      공유 저장소를 가리킬 때만 주기적으로 호출 (vercel.json 크론은 공유 저장소가 생길 때까지 두지 않음)
+    메모리 인덱스보다 오래된 파일은 다시 읽지 않음 (저장에 실패한 인스턴스가 예전 파일로 되돌아가지 않게)
+
+환경변수
+    ANALYSIS_PEER_INDEX_FILE  인덱스 파일 경로 (쓰기 가능한 공유 저장소, 기본 src/data/kospi_peer_index.json)
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import _log
+import _params
+import _signal_backtest
+import _timing
+
+log = _log.get_logger('peer_index')
+
+# 상관계수 계산 구간 (거래일)과 최소 공통 관측 수
+CORRELATION_WINDOW = 252
+MIN_OVERLAP = 60
+
+# 종목당 저장하는 동종 기업 수 (요청 파라미터 industry_peers의 최대값)
+PEERS_PER_TICKER = _params.PARAM_SPECS['industry_peers'][2]
+
+# 수익률 데이터 로드 기간 (달력일)
+FETCH_DAYS = 400
+
+# 저장소에 커밋되는 기본 인덱스 (산업 매핑 데이터와 같은 위치)
+DEFAULT_PATH = Path(__file__).parent.parent.parent / 'src' / 'data' / 'kospi_peer_index.json'
+
+
+def index_path():
+    return Path(os.environ.get('ANALYSIS_PEER_INDEX_FILE') or DEFAULT_PATH)
+
+
+def correlated_peers(returns, mapping, k=PEERS_PER_TICKER, min_overlap=MIN_OVERLAP):
+    """
+    returns: (날짜 x 종목) 수익률 DataFrame, mapping: {종목: 산업}
+    산업별 상관행렬에서 종목마다 상관계수 내림차순 상위 k개 [(동종 기업, 상관계수)] 반환
+    """
+    industries = {}
+    for ticker in returns.columns:
+        if ticker in mapping:
+            industries.setdefault(mapping[ticker], []).append(ticker)
+
+    peers = {}
+    for members in industries.values():
+        if len(members) < 2:
+            continue
+        corr = returns[members].corr(min_periods=min_overlap).to_numpy(copy=True)
+        np.fill_diagonal(corr, np.nan)
+        # NaN(공통 관측 부족)은 맨 뒤로 보내고 제외
+        order = np.argsort(np.where(np.isnan(corr), -np.inf, -corr), axis=1, kind='stable')[:, :k]
+        for i, ticker in enumerate(members):
+            ranked = [(members[j], round(float(corr[i, j]), 4)) for j in order[i] if not np.isnan(corr[i, j])]
+            if ranked:
+                peers[ticker] = ranked
+    return peers
+
+
+class PeerIndex:
+    """종목 -> 상관계수 순 동종 기업 목록"""
+
+    def __init__(self, peers, built_at=None, window=CORRELATION_WINDOW):
+        self.peers = peers
+        self.built_at = built_at
+        self.window = window
+
+    def lookup(self, ticker, limit):
+        """상관계수 상위 limit개 동종 기업 티커 (인덱스에 없으면 None)"""
+        ranked = self.peers.get(ticker)
+        if ranked is None:
+            return None
+        return [peer for peer, _ in ranked[:limit]]
+
+    def to_dict(self):
+        return {'built_at': self.built_at, 'window': self.window,
+                'peers': {ticker: [list(item) for item in ranked] for ticker, ranked in self.peers.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        peers = {ticker: [tuple(item) for item in ranked] for ticker, ranked in data.get('peers', {}).items()}
+        return cls(peers, data.get('built_at'), data.get('window', CORRELATION_WINDOW))
+
+    def save(self, path):
+        """원자적 저장 (임시 파일 후 교체)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+
+_index = None
+# 메모리 인덱스의 기준 시각 (파일에서 읽었으면 파일 mtime, 메모리에서 갱신했으면 갱신 시각)
+_index_time = None
+_lock = threading.Lock()
+
+
+def get_index():
+    """저장된 인덱스 (메모리 인덱스보다 새 파일이면 다시 읽음, 없으면 None)"""
+    global _index, _index_time
+    path = index_path()
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return _index  # 파일 저장에 실패했더라도 메모리에서 갱신한 인덱스는 사용
+
+    with _lock:
+        if _index_time is None or mtime > _index_time:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    _index = PeerIndex.from_dict(json.load(f))
+                _index_time = mtime
+            except (OSError, ValueError) as e:
+                log.warning("동종 기업 인덱스 읽기 실패: %s", e)
+        return _index
+
+
+def set_index(index, index_time=None):
+    """메모리 인덱스 교체 (기준 시각 기본값은 현재, None으로 비우면 다음 조회 때 파일을 다시 읽음) - 이전 인덱스 반환"""
+    global _index, _index_time
+    with _lock:
+        previous = _index
+        _index = index
+        if index is None:
+            _index_time = None
+        else:
+            _index_time = time.time() if index_time is None else index_time
+        return previous
+
+
+def lookup(ticker, limit):
+    index = get_index()
+    return index.lookup(ticker, limit) if index is not None else None
+
+
+def build(engine, tickers=None, window=CORRELATION_WINDOW):
+    """산업 매핑 전체 (또는 tickers)의 일봉을 한 번에 받아 상관계수 인덱스 생성"""
+    mapping = engine.load_kospi_mapping()
+    tickers = list(dict.fromkeys(tickers or sorted(mapping)))
+    end = pd.Timestamp(datetime.now().date()) + pd.Timedelta(days=1)
+    start = end - pd.Timedelta(days=FETCH_DAYS)
+    frames, market_frame, failed = _signal_backtest.load_universe(
+        engine, tickers, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+    if not frames:
+        raise ValueError("유효한 주가 데이터가 없습니다")
+
+    with _timing.stage('compute'):
+        panel, _ = _signal_backtest.build_panel(frames, market_frame)
+        returns = panel['Close'].pct_change(fill_method=None).iloc[-window:]
+        peers = correlated_peers(returns, mapping)
+    return PeerIndex(peers, datetime.now().isoformat(timespec='seconds'), window), failed
+
+
+def refresh(engine, tickers=None, path=None):
+    """인덱스를 다시 계산해 메모리에 반영하고 파일로 저장 (저장 실패 시 메모리 인덱스만 사용) - 요약 반환"""
+    started = time.perf_counter()
+    index, failed = build(engine, tickers)
+
+    path = path or index_path()
+    saved = True
+    try:
+        index.save(path)
+        # 방금 저장한 파일을 다시 읽지 않도록 파일 mtime을 기준 시각으로 사용
+        set_index(index, Path(path).stat().st_mtime)
+    except OSError as e:
+        saved = False
+        set_index(index)
+        log.warning("동종 기업 인덱스 저장 실패 (메모리 인덱스만 사용): %s", e)
+
+    summary = {
+        'built_at': index.built_at,
+        'tickers': len(index.peers),
+        'failed_tickers': len(failed),
+        'saved': saved,
+        'path': str(path),
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+    log.info("동종 기업 인덱스 갱신: %d개 종목, %.1fms", summary['tickers'], summary['elapsed_ms'])
+    return summary
+
+
+if __name__ == '__main__':
+    from unified_analysis import AnalysisEngine
+
+    print(json.dumps(refresh(AnalysisEngine()), ensure_ascii=False, indent=2))
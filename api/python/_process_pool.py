@@ -0,0 +1,181 @@
+"""
+프로세스 풀 실행 계층
+CPU 위주 배치 작업(GARCH 적합 등 Python 루프가 있는 계산)을 여러 프로세스에 나눠 GIL 경합 없이 실행
+가격 데이터는 부모 프로세스가 공유 메모리 한 블록에 패킹하고, 워커는 복사 없이 읽기 전용 뷰로 사용
+작업은 종목 그룹 단위 청크로 나눠 전달 (같은 종목의 작업은 같은 워커에서 실행)
+
+환경변수
+    ANALYSIS_PROCESS_WORKERS  워커 프로세스 수 (0/1이면 사용 안 함 - 기본값, auto면 CPU 코어 수)
+    ANALYSIS_PROCESS_START    프로세스 시작 방식 (기본 spawn, forkserver/fork)
+    ANALYSIS_PROCESS_CHUNKS   워커당 청크 수 (기본 4 - 클수록 부하 분산, 작을수록 전송 오버헤드 감소)
+
+서버리스 환경(Vercel)은 단일 프로세스이므로 기본값으로 꺼져 있고, 자체 호스팅 워커에서 켬
+"""
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import _log
+
+log = _log.get_logger('process_pool')
+
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+DEFAULT_CHUNKS_PER_WORKER = 4
+
+_pool = None
+_pool_lock = threading.Lock()
+_in_worker = False
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def worker_count():
+    value = os.environ.get('ANALYSIS_PROCESS_WORKERS', '0').strip().lower()
+    if value == 'auto':
+        return os.cpu_count() or 1
+    return _env_int('ANALYSIS_PROCESS_WORKERS', 0)
+
+
+def enabled():
+    """프로세스 풀 사용 여부 (워커 프로세스 안에서는 다시 풀을 만들지 않음)"""
+    return not _in_worker and worker_count() > 1
+
+
+def in_worker():
+    return _in_worker
+
+
+def _worker_init():
+    global _in_worker
+    _in_worker = True
+
+
+def get_pool():
+    """프로세스 공용 풀 (첫 호출 시 생성, 워커는 재사용)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            context = multiprocessing.get_context(os.environ.get('ANALYSIS_PROCESS_START', 'spawn'))
+            _pool = ProcessPoolExecutor(max_workers=worker_count(), mp_context=context, initializer=_worker_init)
+            log.info("프로세스 풀 시작: 워커 %d개", worker_count())
+        return _pool
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+class SharedFrames:
+    """
+    여러 일봉 DataFrame의 OHLCV를 공유 메모리 한 블록에 패킹
+    블록 구성: 날짜(int64 ns) 행 전체 다음에 (행 x 5) float64 값 - 종목별 행 범위는 index에 기록
+    """
+
+    def __init__(self, shm, rows, index):
+        self.shm = shm
+        self.rows = rows
+        self.index = index
+
+    @classmethod
+    def create(cls, frames):
+        index = {}
+        rows = 0
+        for key, frame in frames.items():
+            index[key] = (rows, rows + len(frame))
+            rows += len(frame)
+
+        width = len(PRICE_COLUMNS)
+        shm = shared_memory.SharedMemory(create=True, size=max(rows * (width + 1) * 8, 8))
+        dates, values = _views(shm.buf, rows)
+        for key, frame in frames.items():
+            start, stop = index[key]
+            dates[start:stop] = frame.index.to_numpy(dtype='datetime64[ns]').view(np.int64)
+            values[start:stop] = frame.reindex(columns=list(PRICE_COLUMNS)).to_numpy(dtype=np.float64)
+        del dates, values  # 블록을 닫을 수 있도록 뷰 해제
+        return cls(shm, rows, index)
+
+    def descriptor(self):
+        """워커에 넘기는 작은 설명자 (블록 이름, 행 수, 종목별 행 범위)"""
+        return self.shm.name, self.rows, self.index
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _views(buffer, rows):
+    width = len(PRICE_COLUMNS)
+    dates = np.ndarray((rows,), dtype=np.int64, buffer=buffer)
+    values = np.ndarray((rows, width), dtype=np.float64, buffer=buffer, offset=rows * 8)
+    return dates, values
+
+
+class AttachedFrames:
+    """워커 쪽 공유 블록 - frames()는 블록을 복사하지 않는 읽기 전용 DataFrame"""
+
+    def __init__(self, descriptor):
+        name, self.rows, self.index = descriptor
+        # 워커는 부모의 resource_tracker를 함께 쓰므로 블록 해제(unlink)는 만든 부모가 담당
+        self.shm = shared_memory.SharedMemory(name=name)
+
+    def frames(self):
+        dates, values = _views(self.shm.buf, self.rows)
+        values.flags.writeable = False
+        frames = {}
+        for key, (start, stop) in self.index.items():
+            index = pd.DatetimeIndex(dates[start:stop].view('datetime64[ns]'))
+            frames[key] = pd.DataFrame(values[start:stop], index=index, columns=list(PRICE_COLUMNS), copy=False)
+        return frames
+
+    def close(self):
+        try:
+            self.shm.close()
+        except BufferError:
+            # 아직 참조 중인 뷰가 있으면 프로세스 종료 시 해제
+            log.debug("공유 메모리 뷰가 남아 있어 닫기를 미룸: %s", self.shm.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def chunk_groups(groups, workers, chunks_per_worker=None):
+    """종목 그룹 목록을 워커 수 x 워커당 청크 수 개 정도의 청크로 분할"""
+    chunks_per_worker = chunks_per_worker or _env_int('ANALYSIS_PROCESS_CHUNKS', DEFAULT_CHUNKS_PER_WORKER)
+    size = max(1, math.ceil(len(groups) / max(workers * chunks_per_worker, 1)))
+    return [groups[i:i + size] for i in range(0, len(groups), size)]
+
+
+def map_chunks(fn, groups, *args):
+    """
+    fn(청크, *args)를 워커 프로세스에서 실행하고 완료되는 순서대로 결과 반환
+    fn과 인자는 pickle 가능해야 함 (모듈 최상위 함수)
+    """
+    pool = get_pool()
+    futures = [pool.submit(fn, chunk, *args) for chunk in chunk_groups(groups, worker_count())]
+    for future in as_completed(futures):
+        yield future.result()
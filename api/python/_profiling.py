@@ -0,0 +1,241 @@
+"""
+요청 단위 온디맨드 프로파일링 (기본 비활성)
+요청 헤더 X-Debug-Profile 또는 환경변수 ANALYSIS_PROFILE로 켬
+
+    sample    요청 스레드 스택을 주기적으로 샘플링해 collapsed-stack(flamegraph 입력 형식) 요약 생성
+    cprofile  cProfile로 함수별 누적 시간 상위 목록 생성
+
+요청이 워커 스레드로 나눠 실행되면 워커에서 attach(current_profile())로 같은 프로파일에 합침
+
+헤더로 켜려면 ANALYSIS_PROFILE_TOKEN이 설정되어 있고 X-Debug-Profile-Token 헤더가 일치해야 함
+(토큰이 설정되지 않았으면 헤더는 무시)
+ANALYSIS_PROFILE_DIR이 설정되어 있으면 전체 결과를 파일로도 저장
+"""
+import cProfile
+import hmac
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_MODES = ('sample', 'cprofile')
+
+SAMPLE_INTERVAL_SECONDS = 0.005
+
+# 응답에 포함할 상위 스택/함수 개수
+SUMMARY_LIMIT = 50
+
+
+def requested_mode(headers=None):
+    """헤더/환경변수에서 프로파일링 모드 결정 (꺼져 있으면 None)"""
+    mode = None
+    if headers is not None:
+        header_mode = (headers.get('X-Debug-Profile') or '').strip().lower()
+        if header_mode:
+            token = os.environ.get('ANALYSIS_PROFILE_TOKEN')
+            if token and hmac.compare_digest(headers.get('X-Debug-Profile-Token') or '', token):
+                mode = header_mode
+    if mode is None:
+        mode = (os.environ.get('ANALYSIS_PROFILE') or '').strip().lower() or None
+
+    if mode in ('1', 'true', 'on', 'yes'):
+        mode = 'sample'
+    return mode if mode in PROFILE_MODES else None
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class StackSampler:
+    """대상 스레드의 스택을 일정 간격으로 수집하는 샘플링 프로파일러"""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL_SECONDS):
+        self.thread_ids = {thread_id}
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._threads_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def add_thread(self, thread_id):
+        with self._threads_lock:
+            self.thread_ids.add(thread_id)
+
+    def remove_thread(self, thread_id):
+        with self._threads_lock:
+            self.thread_ids.discard(thread_id)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._threads_lock:
+                thread_ids = list(self.thread_ids)
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(labels))] += 1
+                self.samples += 1
+
+    def collapsed(self, limit=None):
+        return [f"{stack} {count}" for stack, count in self.stacks.most_common(limit)]
+
+
+class RequestProfile:
+    """프로파일링 결과 - summary()로 응답용 dict 생성"""
+
+    def __init__(self, mode, label):
+        self.mode = mode
+        self.label = label
+        self.elapsed = 0.0
+        self.sampler = None
+        self.profiler = None
+        self.worker_profilers = []
+        self.closed = False
+        self.saved_path = None
+        self._lock = threading.Lock()
+
+    def _stats(self):
+        with self._lock:
+            workers = list(self.worker_profilers)
+        return pstats.Stats(self.profiler, *workers)
+
+    def _cprofile_rows(self, limit):
+        stats = self._stats()
+        rows = []
+        for (filename, line, name), (cc, nc, tt, ct, _) in stats.stats.items():
+            rows.append({
+                'function': f"{os.path.basename(filename)}:{line}:{name}",
+                'ncalls': nc,
+                'tottime_ms': round(tt * 1000, 3),
+                'cumtime_ms': round(ct * 1000, 3),
+            })
+        rows.sort(key=lambda row: row['cumtime_ms'], reverse=True)
+        return rows if limit is None else rows[:limit]
+
+    def summary(self):
+        summary = {'mode': self.mode, 'elapsed_ms': round(self.elapsed * 1000, 2)}
+        if self.sampler is not None:
+            summary['samples'] = self.sampler.samples
+            summary['interval_ms'] = self.sampler.interval * 1000
+            summary['collapsed'] = self.sampler.collapsed(SUMMARY_LIMIT)
+        if self.profiler is not None:
+            summary['top'] = self._cprofile_rows(SUMMARY_LIMIT)
+        if self.saved_path:
+            summary['saved_to'] = self.saved_path
+        return summary
+
+    def save(self, directory):
+        """전체 결과를 파일로 저장 (sample은 .collapsed, cprofile은 .pstats)"""
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        safe_label = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in self.label)
+        if self.sampler is not None:
+            path = os.path.join(directory, f"{stamp}_{safe_label}.collapsed")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(self.sampler.collapsed()) + "\n")
+        else:
+            path = os.path.join(directory, f"{stamp}_{safe_label}.pstats")
+            self._stats().dump_stats(path)
+        self.saved_path = path
+        return path
+
+
+_local = threading.local()
+
+
+def current_profile():
+    """현재 스레드에서 진행 중인 요청 프로파일 (없으면 None)"""
+    return getattr(_local, 'profile', None)
+
+
+@contextmanager
+def attach(profile):
+    """
+    워커 스레드 실행을 요청 프로파일에 포함 (profile이 None이면 아무 것도 하지 않음)
+    sample은 샘플러 대상 스레드에 추가, cprofile은 스레드별 프로파일러 결과를 합침
+    요청이 이미 끝난 뒤(마감 후 버려진 워커)의 결과는 합치지 않음
+    """
+    if profile is None or profile.closed:
+        yield
+        return
+
+    thread_id = threading.get_ident()
+    profiler = None
+    if profile.sampler is not None:
+        profile.sampler.add_thread(thread_id)
+    else:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # 다른 프로파일러가 이미 활성화된 경우 (Python 3.12+)
+            profiler = None
+    try:
+        yield
+    finally:
+        if profile.sampler is not None:
+            profile.sampler.remove_thread(thread_id)
+        elif profiler is not None:
+            profiler.disable()
+            with profile._lock:
+                if not profile.closed:
+                    profile.worker_profilers.append(profiler)
+
+
+@contextmanager
+def profile_request(mode, label='request'):
+    """
+    with 블록 동안 현재 스레드를 프로파일링
+    mode가 None이면 아무 것도 하지 않고 None을 yield
+    """
+    if mode is None:
+        yield None
+        return
+
+    profile = RequestProfile(mode, label)
+    previous = current_profile()
+    _local.profile = profile
+    started = time.perf_counter()
+    if mode == 'sample':
+        profile.sampler = StackSampler(threading.get_ident())
+        profile.sampler.start()
+    else:
+        profile.profiler = cProfile.Profile()
+        profile.profiler.enable()
+
+    try:
+        yield profile
+    finally:
+        _local.profile = previous
+        if profile.sampler is not None:
+            profile.sampler.stop()
+        else:
+            profile.profiler.disable()
+        with profile._lock:
+            profile.closed = True
+        profile.elapsed = time.perf_counter() - started
+
+        directory = os.environ.get('ANALYSIS_PROFILE_DIR')
+        if directory:
+            try:
+                profile.save(directory)
+            except OSError:
+                pass
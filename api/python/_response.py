@@ -0,0 +1,143 @@
+"""
+HTTP 응답 공용 유틸리티
+ETag 기반 조건부 GET(304)과 Accept-Encoding에 따른 gzip/brotli 압축 처리
+(Accept 헤더에 따른 Arrow 응답 형식 선택은 _arrow 참고)
+"""
+import gzip
+import hashlib
+import hmac
+import json
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli는 선택 의존성 - 없으면 gzip만 사용
+    brotli = None
+
+# 이 크기보다 작은 응답은 압축하지 않음 (바이트)
+MIN_COMPRESS_SIZE = 1024
+
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 5
+
+
+def make_etag(*parts):
+    """요청 키(심볼, 분석 타입, 마지막 거래일 등)로부터 약한 ETag 생성"""
+    key = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match 헤더 값이 ETag와 일치하는지 확인 (약한 비교)"""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+
+    def strip_weak(tag):
+        tag = tag.strip()
+        return tag[2:] if tag.startswith('W/') else tag
+
+    target = strip_weak(etag)
+    return any(strip_weak(tag) == target for tag in if_none_match.split(','))
+
+
+def parse_quality(header):
+    """Accept/Accept-Encoding 헤더를 {이름: q값} dict로 변환 (q 생략 시 1.0)"""
+    accepted = {}
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        if not name.strip():
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding):
+    """Accept-Encoding에서 사용할 압축 방식 선택 (br 우선, 없으면 gzip)"""
+    if not accept_encoding:
+        return None
+
+    accepted = parse_quality(accept_encoding)
+
+    def allowed(name):
+        return accepted.get(name, accepted.get('*', 0.0)) > 0
+
+    if brotli is not None and allowed('br'):
+        return 'br'
+    if allowed('gzip'):
+        return 'gzip'
+    return None
+
+
+def compress_body(body, encoding):
+    """선택된 방식으로 본문 압축"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+def send_json_body(request_handler, body, status=200, etag=None, cors_headers=None,
+                   content_type='application/json'):
+    """
+    JSON 본문 전송 - If-None-Match가 ETag와 같으면 304, 클라이언트가 허용하면 압축
+    body: 이미 인코딩된 bytes (content_type을 바꿔 Arrow 등 다른 형식도 전송)
+    """
+    cors_headers = cors_headers or {}
+    encoding = None
+    if len(body) >= MIN_COMPRESS_SIZE:
+        encoding = choose_encoding(request_handler.headers.get('Accept-Encoding'))
+        body = compress_body(body, encoding)
+
+    request_handler.send_response(status)
+    request_handler.send_header('Content-type', content_type)
+    for name, value in cors_headers.items():
+        request_handler.send_header(name, value)
+    request_handler.send_header('Access-Control-Expose-Headers', 'ETag')
+    request_handler.send_header('Vary', 'Accept, Accept-Encoding')
+    if etag:
+        request_handler.send_header('ETag', etag)
+        request_handler.send_header('Cache-Control', 'no-cache')
+    if encoding:
+        request_handler.send_header('Content-Encoding', encoding)
+    request_handler.send_header('Content-Length', str(len(body)))
+    request_handler.end_headers()
+    request_handler.wfile.write(body)
+
+
+def send_not_modified(request_handler, etag, cors_headers=None):
+    """304 Not Modified 응답 (본문 없음)"""
+    request_handler.send_response(304)
+    for name, value in (cors_headers or {}).items():
+        request_handler.send_header(name, value)
+    request_handler.send_header('Access-Control-Expose-Headers', 'ETag')
+    request_handler.send_header('Vary', 'Accept, Accept-Encoding')
+    request_handler.send_header('ETag', etag)
+    request_handler.send_header('Cache-Control', 'no-cache')
+    request_handler.end_headers()
+
+
+def cron_authorized(headers):
+    """
+    크론/운영용 요청 확인 - Vercel 크론이 보내는 Authorization: Bearer $CRON_SECRET 헤더가 일치해야 함
+    CRON_SECRET이 설정되지 않았으면 항상 거부
+    """
+    secret = os.environ.get('CRON_SECRET')
+    if not secret:
+        return False
+    return hmac.compare_digest(headers.get('Authorization') or '', f"Bearer {secret}")
+
+
+def is_not_modified(request_handler, etag):
+    """요청의 If-None-Match가 현재 ETag와 일치하는지 확인"""
+    return etag_matches(request_handler.headers.get('If-None-Match'), etag)
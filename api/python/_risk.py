@@ -0,0 +1,241 @@
+"""
+포트폴리오 VaR/CVaR 위험 엔진
+거래일 정렬 패널(_panel)의 수익률 행렬 하나로 여러 포트폴리오(비중 벡터)의 1일 VaR/CVaR를
+신뢰수준별로 한 번에 계산 (포트폴리오 수익률은 (날짜 x 종목) @ (종목 x 포트폴리오) 행렬 곱 한 번)
+
+    historical  최근 window 거래일 포트폴리오 수익률의 경험 분위수와 꼬리 평균
+    parametric  수익률 평균/공분산 기반 정규분포 VaR/CVaR
+    garch       GARCH(1,1) 필터링 역사적 시뮬레이션 - 표준화 잔차 분위수 x 다음 날 예측 변동성
+                (계산기와 같은 고정 파라미터 alpha 0.1, beta 0.8, omega = 분산 x 0.1)
+
+VaR/CVaR는 손실률(%)을 양수로 반환 (GARCH 계산기의 var95_pct와 같은 부호)
+모든 종목 수익률이 있는 거래일만 사용
+
+종목 데이터는 한 번에 선로딩 - 제공자가 데이터가 없다고 확인한 종목(NoDataError)만 요청 오류(ValueError),
+일시적 실패나 회로 차단(CircuitOpenError)은 그대로 전달 (요청 오류로 바꾸지 않음)
+"""
+from statistics import NormalDist
+
+import numpy as np
+
+import _history
+import _market_data
+import _panel
+import _timing
+
+METHODS = ('historical', 'parametric', 'garch')
+DEFAULT_LEVELS = (0.95, 0.99)
+DEFAULT_WINDOW = 250
+
+# 요청 제한
+MIN_OBSERVATIONS = 60
+MAX_LEVELS = 5
+MAX_PORTFOLIOS = 1000
+MAX_TICKERS = 200
+
+
+def window_returns(panel, tickers=None, window=DEFAULT_WINDOW):
+    """패널에서 지정 종목 수익률이 모두 있는 최근 window 거래일의 (수익률 행렬, 날짜)"""
+    columns = list(range(len(panel.tickers))) if tickers is None else [panel.positions[t] for t in tickers]
+    rows = np.flatnonzero(panel.valid[:, columns].all(axis=1))[-window:]
+    return panel.returns[np.ix_(rows, columns)], panel.dates[rows]
+
+
+def normalize_weights(weights):
+    """(포트폴리오 x 종목) 비중을 행 합 1로 정규화 (합이 0인 행은 ValueError)"""
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    totals = weights.sum(axis=1, keepdims=True)
+    if (totals == 0).any():
+        raise ValueError("Portfolio weights must not sum to zero")
+    return weights / totals
+
+
+def _tail_mean(values, cutoffs):
+    """values (날짜 x 포트폴리오)에서 신뢰수준별 cutoff 이하 값의 평균 (신뢰수준 x 포트폴리오)"""
+    tail = values[None, :, :] <= cutoffs[:, None, :]
+    return np.where(tail, values[None, :, :], 0.0).sum(axis=1) / np.maximum(tail.sum(axis=1), 1)
+
+
+def historical(portfolio_returns, levels):
+    cutoffs = np.quantile(portfolio_returns, 1 - np.asarray(levels), axis=0)
+    return -cutoffs, -_tail_mean(portfolio_returns, cutoffs)
+
+
+def parametric(returns, weights, levels):
+    mean = weights @ returns.mean(axis=0)
+    covariance = np.atleast_2d(np.cov(returns, rowvar=False))
+    sigma = np.sqrt(np.maximum(np.einsum('pi,ij,pj->p', weights, covariance, weights), 0))
+
+    normal = NormalDist()
+    z = np.array([normal.inv_cdf(1 - level) for level in levels])[:, None]
+    tail_density = np.array([normal.pdf(normal.inv_cdf(1 - level)) / (1 - level) for level in levels])[:, None]
+    return -(mean + z * sigma), -(mean - tail_density * sigma)
+
+
+def garch_filtered(portfolio_returns, levels):
+    """포트폴리오별 GARCH(1,1) 조건부 분산 재귀 (날짜 루프 한 번, 포트폴리오 방향은 벡터)"""
+    a, b = _history.GARCH_ALPHA, _history.GARCH_BETA
+    variance = portfolio_returns.var(axis=0)
+    omega = _history.GARCH_OMEGA_RATIO * variance
+
+    sigma2 = np.empty_like(portfolio_returns)
+    sigma2[0] = variance
+    for t in range(1, len(portfolio_returns)):
+        sigma2[t] = omega + a * portfolio_returns[t - 1] ** 2 + b * sigma2[t - 1]
+    forecast = np.sqrt(omega + a * portfolio_returns[-1] ** 2 + b * sigma2[-1])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        standardized = np.where(sigma2 > 0, portfolio_returns / np.sqrt(sigma2), 0.0)
+    cutoffs = np.quantile(standardized, 1 - np.asarray(levels), axis=0)
+    return -cutoffs * forecast, -_tail_mean(standardized, cutoffs) * forecast
+
+
+def portfolio_risk(returns, weights, levels=DEFAULT_LEVELS, methods=METHODS):
+    """
+    returns: (날짜 x 종목) 단순 수익률, weights: (포트폴리오 x 종목) 정규화된 비중
+    {방법: (VaR, CVaR)} - 각각 (신뢰수준 x 포트폴리오) 손실률 배열과 포트폴리오별 일간 변동성
+    """
+    if len(returns) < MIN_OBSERVATIONS:
+        raise ValueError(f"Insufficient overlapping data: {len(returns)} days (need {MIN_OBSERVATIONS})")
+    portfolio_returns = returns @ weights.T
+
+    calculators = {
+        'historical': lambda: historical(portfolio_returns, levels),
+        'parametric': lambda: parametric(returns, weights, levels),
+        'garch': lambda: garch_filtered(portfolio_returns, levels),
+    }
+    estimates = {method: calculators[method]() for method in methods}
+    return estimates, portfolio_returns.std(axis=0, ddof=1)
+
+
+def _level_key(level):
+    return f"{level:g}"
+
+
+def format_results(tickers, weights, estimates, volatility, levels):
+    """포트폴리오별 응답 dict 목록 (비중이 0인 종목은 생략, 값은 %)"""
+    results = []
+    for p, row in enumerate(weights):
+        risk = {method: {_level_key(level): {'var_pct': round(float(var[l, p] * 100), 4),
+                                             'cvar_pct': round(float(cvar[l, p] * 100), 4)}
+                         for l, level in enumerate(levels)}
+                for method, (var, cvar) in estimates.items()}
+        results.append({
+            'weights': {ticker: round(float(w), 6) for ticker, w in zip(tickers, row) if w != 0},
+            'daily_volatility_pct': round(float(volatility[p] * 100), 4),
+            **risk,
+        })
+    return results
+
+
+def _as_list(value, separator=','):
+    if value is None or value == '':
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(separator) if item.strip()]
+    return list(value)
+
+
+def parse_levels(value):
+    """신뢰수준 목록 (0.5 초과 1 미만, 최대 MAX_LEVELS개) - 없으면 기본값"""
+    try:
+        levels = sorted({float(level) for level in _as_list(value)}) or list(DEFAULT_LEVELS)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for confidence: {value!r}")
+    if len(levels) > MAX_LEVELS or not all(0.5 < level < 1 for level in levels):
+        raise ValueError(f"confidence must be up to {MAX_LEVELS} levels between 0.5 and 1")
+    return levels
+
+
+def parse_portfolios(params):
+    """
+    포트폴리오 목록 [{종목: 비중}]
+        portfolios: [{'tickers': [...], 'weights': [...]}] 또는 [{종목: 비중}]
+        tickers + weights: 비중 목록 하나 또는 목록의 목록 (쿼리는 'a,b' / '1,2;3,4')
+    """
+    portfolios = params.get('portfolios')
+    if not portfolios:
+        tickers = [ticker.upper() for ticker in _as_list(params.get('tickers'))]
+        weights = params.get('weights')
+        if isinstance(weights, str):
+            weights = [_as_list(row) for row in weights.split(';') if row.strip()]
+        elif weights and not isinstance(weights[0], (list, tuple)):
+            weights = [weights]
+        weights = weights or [[1] * len(tickers)]
+        portfolios = [{'tickers': tickers, 'weights': row} for row in weights]
+
+    parsed = []
+    for portfolio in portfolios:
+        if 'tickers' in portfolio:
+            tickers = [str(ticker).upper() for ticker in portfolio['tickers']]
+            weights = portfolio.get('weights') or [1] * len(tickers)
+            if len(weights) != len(tickers):
+                raise ValueError("Each portfolio needs one weight per ticker")
+            portfolio = dict(zip(tickers, weights))
+        try:
+            parsed.append({str(ticker).upper(): float(weight) for ticker, weight in portfolio.items()})
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid portfolio weights: {portfolio!r}")
+
+    if not parsed or not all(parsed):
+        raise ValueError("At least one portfolio with tickers is required")
+    if len(parsed) > MAX_PORTFOLIOS:
+        raise ValueError(f"Up to {MAX_PORTFOLIOS} portfolios per request")
+    return parsed
+
+
+def risk_request(engine, params):
+    """
+    포트폴리오 위험 요청 처리 - params: 포트폴리오(parse_portfolios), confidence, window, methods
+    모든 포트폴리오 종목을 하나의 패널로 정렬해 한 번에 계산
+    """
+    portfolios = parse_portfolios(params)
+    levels = parse_levels(params.get('confidence'))
+    methods = _as_list(params.get('methods')) or list(METHODS)
+    unknown = [method for method in methods if method not in METHODS]
+    if unknown:
+        raise ValueError(f"Unknown risk methods: {', '.join(unknown)}")
+    try:
+        window = int(params.get('window', DEFAULT_WINDOW))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for window: {params.get('window')!r}")
+    if window < MIN_OBSERVATIONS:
+        raise ValueError(f"window must be at least {MIN_OBSERVATIONS}")
+
+    tickers = list(dict.fromkeys(ticker for portfolio in portfolios for ticker in portfolio))
+    if len(tickers) > MAX_TICKERS:
+        raise ValueError(f"Up to {MAX_TICKERS} distinct tickers per request (got {len(tickers)})")
+
+    days = engine.params.lookback_days
+    yahoo_symbols = {ticker: engine.resolve_yahoo_symbol(ticker) for ticker in tickers}
+    frames = {}
+    failed = []
+    with _timing.stage('fetch'):
+        _market_data.prefetch_history(list(yahoo_symbols.values()), days=days)
+        for ticker, yahoo_symbol in yahoo_symbols.items():
+            try:
+                frames[ticker] = _market_data.load_history(yahoo_symbol, days=days)
+            except _market_data.NoDataError:
+                failed.append(ticker)
+            except ValueError as e:
+                # 오류 없이 빈 응답 등 - 일시적일 수 있으므로 요청 오류로 보지 않음
+                raise RuntimeError(f"Failed to load price data for {ticker}: {e}") from e
+    if failed:
+        raise ValueError(f"No price data for: {', '.join(failed)}")
+
+    with _timing.stage('align'):
+        panel = _panel.PricePanel.build(frames, calendar=engine.load_trading_calendar())
+        returns, dates = window_returns(panel, tickers, window)
+        weights = normalize_weights([[portfolio.get(ticker, 0.0) for ticker in tickers] for portfolio in portfolios])
+
+    with _timing.stage('compute'):
+        estimates, volatility = portfolio_risk(returns, weights, levels, methods)
+
+    return {
+        'start': dates[0].date().isoformat(),
+        'end': dates[-1].date().isoformat(),
+        'observations': len(dates),
+        'confidence': levels,
+        'methods': methods,
+        'portfolios': format_results(tickers, weights, estimates, volatility, levels),
+    }
@@ -0,0 +1,76 @@
+"""
+JSON 직렬화 공용 모듈
+orjson이 설치되어 있으면 사용하고, 없으면 표준 json으로 대체
+numpy 스칼라/배열, pandas Timestamp를 별도 변환 없이 그대로 직렬화하여 bytes로 반환
+NaN/Infinity는 orjson과 같게 null로 기록 (표준 json의 NaN은 브라우저 JSON.parse가 읽지 못함)
+"""
+import json
+import math
+from datetime import date, datetime
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # orjson은 선택 의존성
+    orjson = None
+
+_ORJSON_OPTIONS = 0
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    """표준 json/orjson이 직접 처리하지 못하는 객체 변환"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, 'isoformat'):  # pandas Timestamp 등
+        return obj.isoformat()
+    if hasattr(obj, 'tolist'):  # pandas Series/Index
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj):
+    """표준 json 대체 경로용 - 유한하지 않은 실수를 None으로 바꾼 사본 (_default 변환 결과도 포함)"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    if obj is None or isinstance(obj, (str, int)):
+        return obj
+    return _finite(_default(obj))
+
+
+def dumps(obj):
+    """객체를 UTF-8 JSON bytes로 직렬화"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(_finite(obj), ensure_ascii=False, allow_nan=False).encode('utf-8')
+
+
+def dumps_line(obj):
+    """NDJSON 한 줄 (개행 포함)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+    return dumps(obj) + b"\n"
+
+
+def write_json(wfile, obj):
+    """직렬화한 bytes를 wfile에 바로 기록"""
+    wfile.write(dumps(obj))
+
+
+def append_field(body, key, value):
+    """이미 직렬화된 JSON 객체 bytes 끝에 필드 하나 추가 (본문 전체를 다시 직렬화하지 않음)"""
+    body = body.rstrip()
+    if not body.endswith(b'}'):
+        return body
+    separator = b',' if body[:-1].strip() != b'{' else b''
+    return body[:-1] + separator + dumps(key) + b':' + dumps(value) + b'}'
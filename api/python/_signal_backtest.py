@@ -0,0 +1,348 @@
+"""
+신호등 전략 백테스트
+유니버스 전체 (날짜 x 종목) 패널에서 과거 technical/market/risk 신호등을 한 번에 계산하고
+신호등별 선행 수익률과 적중률, 신호등 기반 포지션의 누적 손익을 패널 연산으로 집계
+(종목/날짜 단위 Python 루프 없음 - 계산식과 분류 기준은 _history/계산기와 동일)
+
+    technical  MFI/볼린저 %B/RSI 신호등 다수결 - green(매수) 롱, red(매도) 숏 또는 청산
+    market     capm_window(기본 126)거래일 롤링 시장 베타/R² (CAPM 계산기 기준)
+    risk       GARCH(1,1) 예측 변동성 (GARCH 계산기 기준)
+
+포지션은 당일 종가 신호로 정하고 다음 거래일 수익률부터 반영, 활성 포지션끼리 동일 비중
+지표 윈도우/임계값은 요청 파라미터(_params.AnalysisParams)를 사용 - 산업 파라미터는 쓰지 않으므로 요청에서 거부
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import _history
+import _indicators
+import _market_data
+import _panel
+import _params
+import _timing
+
+DEFAULT_HORIZONS = (1, 5, 20)
+
+MARKET_SYMBOL = _panel.MARKET_SYMBOL
+
+# 신호등 점수 (inactive는 NaN)
+LIGHT_SCORES = {'green': 1.0, 'yellow': 0.0, 'red': -1.0}
+
+# 신호등 백테스트가 사용하지 않는 파라미터 (요청에 기본값이 아닌 값이 있으면 거부)
+UNSUPPORTED_PARAMS = ('industry_window', 'industry_peers')
+
+# 샤프 비율 무위험 수익률 (backtest.py와 동일)
+RISK_FREE_RATE = 0.03
+
+# HTTP 요청 한 번에 허용하는 최대 종목 수 (요청에서는 tickers 필수)
+MAX_REQUEST_TICKERS = 200
+
+# 요청 한 번에 허용하는 선행 수익률 기간 수와 최대 기간 (거래일, 1년)
+MAX_REQUEST_HORIZONS = 10
+MAX_HORIZON_DAYS = 252
+
+
+def _score(valid, red, green):
+    """신호등 점수 패널 (green 1, yellow 0, red -1, 무효 NaN)"""
+    score = np.where(green, 1.0, np.where(red, -1.0, 0.0))
+    score[~valid] = np.nan
+    return score
+
+
+def build_panel(frames, market_frame):
+    """종목별 OHLCV를 KOSPI 지수 거래일 기준 (날짜 x 종목) 패널로 정렬"""
+    calendar = _panel.trading_calendar(market_frame)
+    panel = _panel.align_fields(frames, calendar, ('High', 'Low', 'Close', 'Volume'))
+    return panel, _panel.clean_series(market_frame).reindex(calendar)
+
+
+def check_params(params):
+    """신호등 백테스트에 반영되지 않는 파라미터가 기본값과 다르면 ValueError"""
+    unsupported = sorted(set(params.changed()) & set(UNSUPPORTED_PARAMS))
+    if unsupported:
+        raise ValueError(f"signal_backtest does not support: {', '.join(unsupported)}")
+
+
+def technical_scores(high, low, close, volume, observed_count, params=_params.DEFAULT_PARAMS):
+    """MFI/볼린저/RSI 신호등 다수결 점수 패널 (지표별 최소 관측 수는 계산기와 같은 기간 + 1)"""
+    mfi = _indicators.mfi(high, low, close, volume, params.mfi_period)
+    rsi = _indicators.rsi(close, params.rsi_period)
+    percent_b = _indicators.bollinger(close, params.bollinger_period, params.bollinger_std)[3]
+
+    with np.errstate(invalid='ignore'):
+        scores = np.stack([
+            _score((observed_count > params.mfi_period) & ~np.isnan(mfi),
+                   mfi >= params.mfi_overbought, mfi <= params.mfi_oversold),
+            _score((observed_count > params.bollinger_period) & ~np.isnan(percent_b),
+                   percent_b >= params.bollinger_upper, percent_b <= params.bollinger_lower),
+            _score((observed_count > params.rsi_period) & ~np.isnan(rsi),
+                   rsi >= params.rsi_overbought, rsi <= params.rsi_oversold),
+        ])
+
+    red_count = (scores == -1).sum(axis=0)
+    green_count = (scores == 1).sum(axis=0)
+    valid_count = (~np.isnan(scores)).sum(axis=0)
+    return _score(valid_count > 0, red_count >= 2, green_count >= 2)
+
+
+def market_scores(returns, market_returns, pair_valid, window=_history.REGRESSION_WINDOW):
+    """롤링 시장 베타/R² 신호등 점수 패널 (수익률은 %, 누락 구간은 pair_valid로 제외)"""
+    x = np.where(pair_valid, market_returns[:, None], 0.0)
+    y = np.where(pair_valid, returns, 0.0)
+
+    n = _indicators.trailing_sum(pair_valid.astype(np.float64), window)
+    sx = _indicators.trailing_sum(x, window)
+    sy = _indicators.trailing_sum(y, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = _indicators.trailing_sum(x * y, window) - sx * sy / n
+        var_x = _indicators.trailing_sum(x * x, window) - sx * sx / n
+        var_y = _indicators.trailing_sum(y * y, window) - sy * sy / n
+        beta = cov / var_x
+        r_squared = cov * cov / (var_x * var_y)
+
+        valid = (n >= _history.regression_min_periods(window)) & np.isfinite(beta) & np.isfinite(r_squared)
+        return _score(valid,
+                      (beta > 1.5) & (r_squared >= 0.3),
+                      (beta >= 0.8) & (beta <= 1.3) & (r_squared >= 0.3))
+
+
+def risk_scores(returns, valid):
+    """GARCH(1,1) 예측 변동성 신호등 점수 패널 (_history.garch_series의 패널 버전)"""
+    a, b = _history.GARCH_ALPHA, _history.GARCH_BETA
+    window = _history.GARCH_WINDOW
+    r = np.where(valid, returns, 0.0)
+    squared = r * r
+
+    count = np.cumsum(valid, axis=0)
+    n = _indicators.trailing_sum(valid.astype(np.float64), window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = _indicators.trailing_sum(r, window) / n
+        variance = _indicators.trailing_sum(squared, window) / n - mean * mean
+    omega = _history.GARCH_OMEGA_RATIO * variance
+
+    # 전일까지의 r² 지수가중 합 (종목별 ewm을 한 번에 계산)
+    padded = np.vstack([np.zeros((1, r.shape[1])), squared])
+    weighted = pd.DataFrame(padded).ewm(alpha=1 - b, adjust=False).mean().to_numpy() / (1 - b)
+    weighted = weighted[:-1]
+
+    decay = b ** (np.minimum(count, window) - 1).clip(min=0)
+    last_sigma2 = decay * variance + omega * (1 - decay) / (1 - b) + a * weighted
+    with np.errstate(invalid='ignore'):
+        annualized = np.sqrt(omega + a * squared + b * last_sigma2) * np.sqrt(252) / 100
+        return _score((count >= _history.GARCH_MIN_RETURNS) & np.isfinite(annualized),
+                      annualized > 0.4, annualized < 0.2)
+
+
+def compute_scores(panel, market_close, params=_params.DEFAULT_PARAMS):
+    """패널에서 technical/market/risk 점수와 관측 여부, (누락일을 채운) 종가 배열 계산"""
+    close_frame = panel['Close']
+    observed = close_frame.notna().to_numpy()
+    observed_count = np.cumsum(observed, axis=0)
+
+    # 누락일은 직전 값(상장 전은 첫 값)으로 채워 롤링 합이 끊기지 않게 하고, 결과는 관측 수로 거름
+    close = close_frame.ffill().bfill().to_numpy(dtype=np.float64)
+    high = panel['High'].ffill().bfill().to_numpy(dtype=np.float64)
+    low = panel['Low'].ffill().bfill().to_numpy(dtype=np.float64)
+    volume = panel['Volume'].where(close_frame.notna()).fillna(0).to_numpy(dtype=np.float64)
+
+    returns = np.full(close.shape, np.nan)
+    returns[1:] = (close[1:] / close[:-1] - 1) * 100
+    return_valid = np.zeros(close.shape, dtype=bool)
+    return_valid[1:] = observed[1:] & observed[:-1]
+
+    market = market_close.ffill().to_numpy(dtype=np.float64)
+    market_returns = np.full(market.shape, np.nan)
+    market_returns[1:] = (market[1:] / market[:-1] - 1) * 100
+    pair_valid = return_valid & ~np.isnan(market_returns)[:, None]
+
+    scores = {
+        'technical': technical_scores(high, low, close, volume, observed_count, params),
+        'market': market_scores(returns, np.nan_to_num(market_returns), pair_valid, params.capm_window),
+        'risk': risk_scores(returns, return_valid),
+    }
+    return scores, observed, close
+
+
+def positions_from_scores(scores, observed, allow_short=False, risk_filter=True):
+    """technical 점수를 포지션으로 변환 (risk_filter면 market/risk가 red인 종목은 청산)"""
+    position = np.nan_to_num(scores['technical'])
+    if not allow_short:
+        position = np.maximum(position, 0.0)
+    if risk_filter:
+        position[(scores['market'] == -1) | (scores['risk'] == -1)] = 0.0
+    position[~observed] = 0.0
+    return position
+
+
+def forward_returns(close, observed, horizon):
+    """horizon 거래일 뒤까지의 수익률 (관측되지 않은 날과 끝부분은 NaN)"""
+    forward = np.full(close.shape, np.nan)
+    forward[:-horizon] = close[horizon:] / close[:-horizon] - 1
+    forward[~observed] = np.nan
+    return forward
+
+
+def light_statistics(scores, forwards):
+    """신호등별 선행 수익률 평균, 상승 비율, 적중률 (green은 상승, red는 하락을 맞춘 비율)"""
+    stats = {}
+    for layer, score in scores.items():
+        stats[layer] = {}
+        for light, value in LIGHT_SCORES.items():
+            mask = score == value
+            entry = {}
+            for horizon, forward in forwards.items():
+                values = forward[mask & ~np.isnan(forward)]
+                if values.size == 0:
+                    entry[f"{horizon}d"] = {'count': 0}
+                    continue
+                up_ratio = float((values > 0).mean())
+                hit_rate = up_ratio if value > 0 else float((values < 0).mean()) if value < 0 else None
+                entry[f"{horizon}d"] = {
+                    'count': int(values.size),
+                    'mean_return_pct': round(float(values.mean()) * 100, 4),
+                    'up_ratio': round(up_ratio, 4),
+                    'hit_rate': None if hit_rate is None else round(hit_rate, 4),
+                }
+            stats[layer][light] = entry
+    return stats
+
+
+def performance(daily_returns):
+    """일간 수익률 배열의 성과 지표 (%)"""
+    daily_returns = np.nan_to_num(daily_returns)
+    cumulative = np.cumprod(1 + daily_returns)
+    days = max(len(daily_returns), 1)
+    total = cumulative[-1] - 1 if len(cumulative) else 0.0
+    annualized = (1 + total) ** (252 / days) - 1
+    volatility = daily_returns.std() * np.sqrt(252)
+    sharpe = (annualized - RISK_FREE_RATE) / volatility if volatility > 0 else 0.0
+    peak = np.maximum.accumulate(cumulative) if len(cumulative) else cumulative
+    max_drawdown = ((cumulative - peak) / peak).min() if len(cumulative) else 0.0
+    return {
+        'total_return': round(float(total) * 100, 2),
+        'annualized_return': round(float(annualized) * 100, 2),
+        'volatility': round(float(volatility) * 100, 2),
+        'sharpe_ratio': round(float(sharpe), 2),
+        'max_drawdown': round(float(max_drawdown) * 100, 2),
+    }
+
+
+def evaluate(scores, observed, close, dates, start_index, horizons=DEFAULT_HORIZONS,
+             allow_short=False, risk_filter=True):
+    """start_index 이후 구간의 신호등 통계와 전략 성과"""
+    position = positions_from_scores(scores, observed, allow_short, risk_filter)
+    forwards = {h: forward_returns(close, observed, h)[start_index:] for h in horizons}
+    window_scores = {layer: score[start_index:] for layer, score in scores.items()}
+    window_position = position[start_index:]
+
+    # 포지션별 적중률 (방향과 선행 수익률 부호가 같은 비율)
+    hit_rates = {}
+    for horizon, forward in forwards.items():
+        active = (window_position != 0) & ~np.isnan(forward)
+        hits = np.sign(window_position[active]) * forward[active] > 0
+        hit_rates[f"{horizon}d"] = round(float(hits.mean()), 4) if hits.size else None
+
+    # 일간 손익: 전일 포지션 x 당일 수익률, 활성 포지션끼리 동일 비중
+    daily = np.zeros(close.shape)
+    daily[1:] = close[1:] / close[:-1] - 1
+    held = position[:-1]
+    active_count = (held != 0).sum(axis=1)
+    strategy = np.zeros(len(close))
+    strategy[1:] = (held * daily[1:]).sum(axis=1) / np.maximum(active_count, 1)
+
+    both_observed = np.zeros(observed.shape, dtype=bool)
+    both_observed[1:] = observed[1:] & observed[:-1]
+    benchmark = np.zeros(len(close))
+    counts = both_observed.sum(axis=1)
+    benchmark[counts > 0] = (daily * both_observed).sum(axis=1)[counts > 0] / counts[counts > 0]
+
+    weights = position / np.maximum((position != 0).sum(axis=1), 1)[:, None]
+    turnover = np.abs(np.diff(weights[start_index:], axis=0)).sum(axis=1)
+
+    # 평가 구간 첫날 수익은 구간 이전 포지션의 결과이므로 제외
+    strategy = strategy[start_index + 1:]
+    benchmark = benchmark[start_index + 1:]
+    window_dates = dates[start_index + 1:]
+    strategy_curve = np.round((np.cumprod(1 + strategy) - 1) * 100, 2)
+    benchmark_curve = np.round((np.cumprod(1 + benchmark) - 1) * 100, 2)
+
+    return {
+        'light_stats': light_statistics(window_scores, forwards),
+        'strategy': {
+            'hit_rate': hit_rates,
+            'performance': performance(strategy),
+            'benchmark': performance(benchmark),
+            'average_exposure': round(float((window_position != 0).mean()), 4),
+            'average_turnover': round(float(turnover.mean()), 4) if turnover.size else 0.0,
+        },
+        'cumulative': [{'date': d, 'strategy': s, 'benchmark': b} for d, s, b in
+                       zip(window_dates.strftime('%Y-%m-%d'), strategy_curve.tolist(), benchmark_curve.tolist())],
+    }
+
+
+def load_universe(engine, tickers, fetch_start, fetch_end):
+    """유니버스 종목과 KOSPI 지수 일봉 로드 (한 번에 선로딩 후 캐시에서 읽음) - (종목별 frame, 지수 frame, 실패 목록)"""
+    yahoo_symbols = {ticker: engine.resolve_yahoo_symbol(ticker) for ticker in tickers}
+    with _timing.stage('fetch'):
+        _market_data.prefetch_history_range(list(yahoo_symbols.values()) + [MARKET_SYMBOL], fetch_start, fetch_end)
+        market_frame = _market_data.load_history_range(MARKET_SYMBOL, fetch_start, fetch_end)
+        frames = {}
+        failed = []
+        for ticker, yahoo_symbol in yahoo_symbols.items():
+            try:
+                frames[ticker] = _market_data.load_history_range(yahoo_symbol, fetch_start, fetch_end)
+            except Exception:
+                failed.append(ticker)
+    return frames, market_frame, failed
+
+
+def run_signal_backtest(engine, tickers=None, start=None, end=None, horizons=DEFAULT_HORIZONS,
+                        allow_short=False, risk_filter=True):
+    """
+    유니버스 신호등 전략 백테스트
+    tickers가 없으면 KOSPI 산업 매핑 전체, 기간 기본값은 end 이전 lookback_days (지표 파라미터는 engine.params)
+    """
+    params = engine.params
+    check_params(params)
+    end_date = pd.Timestamp(end) if end else pd.Timestamp(datetime.now().date())
+    start_date = pd.Timestamp(start) if start else end_date - pd.Timedelta(days=params.lookback_days)
+    if start_date > end_date:
+        raise ValueError(f"start({start_date.date()}) must not be after end({end_date.date()})")
+    horizons = tuple(sorted({int(h) for h in horizons}))
+    if not horizons or horizons[0] < 1:
+        raise ValueError("horizons must be positive trading-day counts")
+
+    tickers = list(dict.fromkeys(tickers or sorted(engine.load_kospi_mapping())))
+    fetch_start = (start_date - pd.Timedelta(days=_history.lookback_days(params))).strftime('%Y-%m-%d')
+    fetch_end = (end_date + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+    frames, market_frame, failed = load_universe(engine, tickers, fetch_start, fetch_end)
+    if not frames:
+        raise ValueError("유효한 주가 데이터가 없습니다")
+
+    with _timing.stage('align'):
+        panel, market_close = build_panel(frames, market_frame)
+        in_range = panel['Close'].index <= end_date
+        panel = {col: frame.loc[in_range] for col, frame in panel.items()}
+        market_close = market_close.loc[in_range]
+        dates = market_close.index
+        start_index = int(np.searchsorted(dates, start_date))
+        if start_index >= len(dates) - 1:
+            raise ValueError(f"No trading days between {start_date.date()} and {end_date.date()}")
+
+    with _timing.stage('compute'):
+        scores, observed, close = compute_scores(panel, market_close, params)
+        result = evaluate(scores, observed, close, dates, start_index, horizons, allow_short, risk_filter)
+
+    return {
+        'start': dates[start_index].date().isoformat(),
+        'end': dates[-1].date().isoformat(),
+        'universe_size': len(frames),
+        'failed_tickers': failed,
+        'horizons': list(horizons),
+        'allow_short': allow_short,
+        'risk_filter': risk_filter,
+        **result,
+        'timestamp': datetime.now().isoformat(),
+    }
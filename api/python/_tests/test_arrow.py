@@ -0,0 +1,82 @@
+"""
+Arrow IPC 응답 왕복 테스트 (pyarrow가 없으면 JSON 대체 동작만 확인)
+
+    python -m unittest discover -s api/python/_tests
+"""
+import json
+import os
+import sys
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PYTHON_DIR = os.path.dirname(TESTS_DIR)
+if PYTHON_DIR not in sys.path:
+    sys.path.insert(0, PYTHON_DIR)
+
+import _arrow
+
+ARROW_ACCEPT = 'application/vnd.apache.arrow.stream'
+
+
+def _history_result():
+    return {
+        'symbol': '005930',
+        'dates': ['2026-01-02', '2026-01-05', '2026-01-06'],
+        'series': {
+            'rsi': {'rsi': [55.1, None, 71.2], 'lights': ['yellow', 'inactive', 'red']},
+        },
+    }
+
+
+def _backtest_result():
+    return {
+        'success': True,
+        'data': {'dailyReturns': [{'date': '2026-01-02', 'value': 0.0}, {'date': '2026-01-05', 'value': 1.25}],
+                 'totalReturn': 1.25},
+    }
+
+
+class ArrowFallbackTest(unittest.TestCase):
+    def test_json_when_pyarrow_missing(self):
+        previous = _arrow.pa
+        _arrow.pa = None
+        try:
+            self.assertIsNone(_arrow.requested_format(ARROW_ACCEPT))
+            self.assertIsNone(_arrow.to_table(_history_result()))
+        finally:
+            _arrow.pa = previous
+
+
+@unittest.skipIf(_arrow.pa is None, "pyarrow가 설치되어 있지 않음")
+class ArrowRoundTripTest(unittest.TestCase):
+    def _read(self, body, fmt):
+        import pyarrow.ipc as pa_ipc
+        reader = pa_ipc.open_stream(body) if fmt == 'stream' else pa_ipc.open_file(body)
+        return reader.read_all()
+
+    def test_history_round_trip(self):
+        result = _history_result()
+        for fmt in ('stream', 'file'):
+            body = _arrow.write(_arrow.to_table(result), fmt, {'_timings': {'total': 1.0}})
+            table = self._read(body, fmt)
+            self.assertEqual([d.isoformat() for d in table.column('date').to_pylist()], result['dates'])
+            self.assertEqual(table.column('rsi.rsi').to_pylist(), [55.1, None, 71.2])
+            self.assertEqual(table.column('rsi.lights').to_pylist(), ['yellow', 'inactive', 'red'])
+            metadata = table.schema.metadata
+            self.assertEqual(json.loads(metadata[b'result'])['symbol'], '005930')
+            self.assertEqual(json.loads(metadata[b'_timings']), {'total': 1.0})
+
+    def test_backtest_records_round_trip(self):
+        result = _backtest_result()
+        table = self._read(_arrow.write(_arrow.to_table(result), 'stream'), 'stream')
+        self.assertEqual(table.column('value').to_pylist(), [0.0, 1.25])
+        rest = json.loads(table.schema.metadata[b'result'])
+        self.assertEqual(rest['data'], {'totalReturn': 1.25})
+
+    def test_accept_header(self):
+        self.assertEqual(_arrow.requested_format(ARROW_ACCEPT), 'stream')
+        self.assertIsNone(_arrow.requested_format('application/json, application/vnd.apache.arrow.stream;q=0.5'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+다운로드 스케줄러 재시도/회로 차단기 테스트 (가짜 데이터 제공자 사용, 네트워크 없음)
+
+    python -m unittest discover -s api/python/_tests
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PYTHON_DIR = os.path.dirname(TESTS_DIR)
+if PYTHON_DIR not in sys.path:
+    sys.path.insert(0, PYTHON_DIR)
+
+import _fetch_scheduler
+import _market_data
+
+
+def _frame(days=30):
+    index = pd.date_range(end=pd.Timestamp.now().normalize(), periods=days, freq='D')
+    close = np.linspace(100, 110, days)
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                         'Volume': np.full(days, 1000)}, index=index)
+
+
+class FlakyProvider:
+    """처음 failures번은 error를 던지고 이후 frame(없으면 정상 데이터)을 반환하는 가짜 제공자"""
+
+    def __init__(self, failures=0, error=ConnectionError("Connection reset by peer"), frame=None):
+        self.failures = failures
+        self.error = error
+        self.frame = frame
+        self.calls = 0
+
+    def history(self, yahoo_symbol, start, end):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return _frame() if self.frame is None else self.frame
+
+
+class FetchSchedulerTest(unittest.TestCase):
+
+    def use(self, provider, max_retries=3, breaker=None):
+        previous_provider = _market_data.set_provider(provider)
+        previous_scheduler = _fetch_scheduler.set_scheduler(_fetch_scheduler.FetchScheduler(
+            rate=0, max_retries=max_retries, backoff_base=0, backoff_max=0, breaker=breaker))
+        self.addCleanup(_market_data.set_provider, previous_provider)
+        self.addCleanup(_fetch_scheduler.set_scheduler, previous_scheduler)
+
+    def test_transient_error_is_retried(self):
+        provider = FlakyProvider(failures=2)
+        self.use(provider)
+
+        frame = _market_data.load_history('005930.KS', 30)
+
+        self.assertEqual(provider.calls, 3)
+        self.assertFalse(frame.empty)
+
+    def test_transient_error_after_retries_is_raised(self):
+        provider = FlakyProvider(failures=10)
+        self.use(provider, max_retries=2)
+
+        with self.assertRaises(ConnectionError):
+            _market_data.load_history('005930.KS', 30)
+        self.assertEqual(provider.calls, 3)
+
+    def test_deterministic_error_is_not_retried(self):
+        provider = FlakyProvider(failures=10, error=KeyError('Close'))
+        self.use(provider)
+
+        with self.assertRaises(KeyError):
+            _market_data.load_history('005930.KS', 30)
+        self.assertEqual(provider.calls, 1)
+
+    @unittest.skipUnless(_fetch_scheduler.MISSING_DATA_ERRORS, "yfinance without missing-data exceptions")
+    def test_missing_data_is_not_retried(self):
+        error = _fetch_scheduler.MISSING_DATA_ERRORS[0]('BAD.KS', '(period=1y)')
+        provider = FlakyProvider(failures=10, error=error)
+        self.use(provider)
+
+        with self.assertRaises(_market_data.NoDataError):
+            _market_data.load_history('BAD.KS', 30)
+        self.assertEqual(provider.calls, 1)
+
+        # 확인된 데이터 없음은 부정 캐시 - 다시 요청해도 제공자를 호출하지 않음
+        with self.assertRaises(_market_data.NoDataError):
+            _market_data.load_history('BAD.KS', 30)
+        self.assertEqual(provider.calls, 1)
+
+    def test_empty_frame_is_not_negative_cached(self):
+        provider = FlakyProvider(frame=pd.DataFrame())
+        self.use(provider)
+
+        for _ in range(2):
+            with self.assertRaises(ValueError) as raised:
+                _market_data.load_history('005930.KS', 30)
+            self.assertNotIsInstance(raised.exception, _market_data.NoDataError)
+        self.assertEqual(provider.calls, 2)
+
+    def test_open_breaker_stops_retries(self):
+        provider = FlakyProvider(failures=10)
+        breaker = _fetch_scheduler.CircuitBreaker(threshold=2, cooldown=60)
+        self.use(provider, max_retries=5, breaker=breaker)
+
+        with self.assertRaises(_fetch_scheduler.CircuitOpenError) as raised:
+            _market_data.load_history('005930.KS', 30)
+        self.assertEqual(provider.calls, 2)
+        self.assertIsInstance(raised.exception.__cause__, ConnectionError)
+
+        with self.assertRaises(_fetch_scheduler.CircuitOpenError):
+            _market_data.load_history('000660.KS', 30)
+        self.assertEqual(provider.calls, 2)
+
+    def test_failed_probe_reopens_breaker(self):
+        provider = FlakyProvider(failures=10)
+        breaker = _fetch_scheduler.CircuitBreaker(threshold=1, cooldown=60)
+        self.use(provider, max_retries=3, breaker=breaker)
+
+        with self.assertRaises(_fetch_scheduler.CircuitOpenError):
+            _market_data.load_history('005930.KS', 30)
+        self.assertEqual(provider.calls, 1)
+
+        # 차단 시간이 지나면 시험 호출 하나만 나가고, 실패하면 재시도 없이 다시 열림
+        breaker.opened_at -= breaker.cooldown
+        with self.assertRaises(_fetch_scheduler.CircuitOpenError):
+            _market_data.load_history('005930.KS', 30)
+        self.assertEqual(provider.calls, 2)
+        self.assertEqual(breaker.state, 'open')
+        self.assertFalse(breaker._probing)
+
+
+if __name__ == '__main__':
+    unittest.main()
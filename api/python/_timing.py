@@ -0,0 +1,210 @@
+"""
+요청 단계별 소요 시간 측정과 히스토그램
+단계(fetch, align, compute.*, encode 등)는 배타적으로 측정 - 안쪽 단계가 실행되는 동안 바깥 단계 시간은 멈춤
+같은 분류(접두어)의 단계가 중첩되면 바깥 단계에 합산 (예: fetch.peers 안의 fetch)
+
+Prometheus 출력
+    analysis_stage_seconds         누적 히스토그램 (버킷/합계/개수는 줄지 않음 - 구간 집계는 PromQL rate로)
+    analysis_stage_window_seconds  최근 ROLLING_WINDOW개 관측치의 분위수 (gauge)
+"""
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import _serializer
+
+# 히스토그램 버킷 경계 (초)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0)
+
+# 시리즈별로 보관하는 최근 관측치 개수 (분위수 gauge용)
+ROLLING_WINDOW = 1024
+
+# 최근 관측치 분위수
+QUANTILES = (0.5, 0.9, 0.99)
+
+_local = threading.local()
+
+
+class RequestTimer:
+    """요청 하나의 단계별 누적 시간 (여러 스레드에서 같은 타이머를 써도 안전)"""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started_at = time.perf_counter()
+        self.stages = {}
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        """단계 시간 누적 (finish 이후 - 마감 뒤 버려진 워커 등 - 에는 무시)"""
+        with self._lock:
+            if self.finished:
+                return
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.started_at
+
+    def summary_ms(self):
+        """단계별 시간(ms) - total과 나머지(other) 포함"""
+        total = self.elapsed()
+        with self._lock:
+            stages = dict(self.stages)
+        summary = {name: round(seconds * 1000, 2) for name, seconds in sorted(stages.items())}
+        summary['other'] = round(max(total - sum(stages.values()), 0.0) * 1000, 2)
+        summary['total'] = round(total * 1000, 2)
+        return summary
+
+    def finish(self):
+        """요청 종료 - 단계별 시간과 전체 시간을 히스토그램에 기록"""
+        total = self.elapsed()
+        with self._lock:
+            if self.finished:
+                return
+            self.finished = True
+            stages = dict(self.stages)
+        for name, seconds in stages.items():
+            registry.observe(self.endpoint, name, seconds)
+        registry.observe(self.endpoint, 'total', total)
+
+
+def current_timer():
+    return getattr(_local, 'timer', None)
+
+
+@contextmanager
+def activate(timer):
+    """현재 스레드에서 timer를 활성화 (워커 스레드로 타이머를 넘길 때 사용)"""
+    previous = getattr(_local, 'timer', None)
+    previous_stack = getattr(_local, 'stack', None)
+    _local.timer = timer
+    _local.stack = []
+    try:
+        yield timer
+    finally:
+        _local.timer = previous
+        _local.stack = previous_stack
+
+
+@contextmanager
+def stage(name):
+    """현재 타이머에 단계 시간 기록 (활성 타이머가 없으면 아무 것도 하지 않음)"""
+    timer = current_timer()
+    if timer is None:
+        yield
+        return
+
+    stack = _local.stack
+    if stack and stack[-1][0].split('.')[0] == name.split('.')[0]:
+        # 같은 분류의 바깥 단계에 합산
+        yield
+        return
+
+    now = time.perf_counter()
+    if stack:
+        parent = stack[-1]
+        timer.add(parent[0], now - parent[1])
+
+    frame = [name, now]
+    stack.append(frame)
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        stack.pop()
+        timer.add(name, end - frame[1])
+        if stack:
+            stack[-1][1] = end
+
+
+class StageHistogram:
+    """누적 버킷 카운터와 최근 ROLLING_WINDOW개 관측치 (분위수용)"""
+
+    def __init__(self, window=ROLLING_WINDOW):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.values = deque(maxlen=window)
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(BUCKETS, seconds)
+        if index < len(BUCKETS):
+            self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.values.append(seconds)
+
+    def snapshot(self):
+        """(누적 버킷 카운트(le 기준), 개수, 합계, 최근 관측치 분위수)"""
+        counts = []
+        running = 0
+        for bucket in self.buckets:
+            running += bucket
+            counts.append(running)
+        values = sorted(self.values)
+        quantiles = [values[min(int(q * len(values)), len(values) - 1)] for q in QUANTILES] if values else []
+        return counts, self.count, self.total, quantiles
+
+
+class MetricsRegistry:
+    """(엔드포인트, 단계)별 히스토그램 모음"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, name, seconds):
+        key = (endpoint, name)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = StageHistogram()
+            histogram.observe(seconds)
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 포맷 출력"""
+        lines = [
+            "# HELP analysis_stage_seconds Per-stage request latency since process start.",
+            "# TYPE analysis_stage_seconds histogram",
+        ]
+        with self._lock:
+            snapshots = [(key, histogram.snapshot()) for key, histogram in sorted(self._histograms.items())]
+
+        for (endpoint, name), (counts, count, total, _) in snapshots:
+            labels = f'endpoint="{endpoint}",stage="{name}"'
+            for bound, bucket_count in zip(BUCKETS, counts):
+                lines.append(f'analysis_stage_seconds_bucket{{{labels},le="{bound}"}} {bucket_count}')
+            lines.append(f'analysis_stage_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'analysis_stage_seconds_sum{{{labels}}} {total:.6f}')
+            lines.append(f'analysis_stage_seconds_count{{{labels}}} {count}')
+
+        lines += [
+            f"# HELP analysis_stage_window_seconds Per-stage latency quantiles over the last {ROLLING_WINDOW} requests.",
+            "# TYPE analysis_stage_window_seconds gauge",
+        ]
+        for (endpoint, name), (_, _, _, quantiles) in snapshots:
+            for q, value in zip(QUANTILES, quantiles):
+                lines.append(f'analysis_stage_window_seconds{{endpoint="{endpoint}",stage="{name}",quantile="{q}"}} '
+                             f'{value:.6f}')
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def attach_timings(body, timer):
+    """
+    이미 직렬화된 JSON 객체 bytes 끝에 _timings 필드 추가
+    (encode 단계 시간까지 포함하기 위해 본문을 다시 직렬화하지 않음)
+    """
+    return _serializer.append_field(body, '_timings', timer.summary_ms())
+
+
+def wants_timings(value):
+    """쿼리/본문의 timings 옵션 해석"""
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('1', 'true', 'yes', 'on')
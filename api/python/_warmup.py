@@ -0,0 +1,165 @@
+"""
+캐시 워밍업
+자주 요청되는 종목(핫셋)의 가격 데이터, KOSPI 지수(^KS11), 산업 매핑과 동종 기업 데이터를 미리 로드
+
+핫셋 우선순위
+    1. ANALYSIS_WARMUP_SYMBOLS (쉼표 구분 티커)
+    2. 요청 횟수 상위 종목 (데이터 로드에 성공한 요청만 집계, 상위 STATS_MAX_SYMBOLS개만 유지)
+       ANALYSIS_WARMUP_STATS_FILE이 있으면 파일에 누적해 재시작 후에도 사용 (저장은 백그라운드 스레드)
+    3. 기본 대형주 목록 (요청 기록이 부족할 때 채움)
+
+실행 방법
+    - ANALYSIS_WARMUP_ON_START=1 이면 워커 시작 시 백그라운드로 실행
+    - GET /api/python/unified_analysis?type=warmup (크론 등 외부 스케줄러에서 주기적으로 호출,
+      Authorization: Bearer $CRON_SECRET 헤더 필요)
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+import _log
+
+log = _log.get_logger('warmup')
+
+# 핫셋 크기 기본값
+DEFAULT_TOP_N = 20
+
+# 요청 횟수를 정리/파일에 기록하는 간격 (요청 수)
+STATS_FLUSH_EVERY = 50
+
+# 집계를 유지할 최대 심볼 수 (정리 때 상위만 남김)
+STATS_MAX_SYMBOLS = 500
+
+_counts = Counter()
+_pending = 0
+_lock = threading.Lock()
+_write_lock = threading.Lock()
+_loaded_stats = False
+
+
+def _top_n():
+    try:
+        return int(os.environ.get('ANALYSIS_WARMUP_TOP_N', DEFAULT_TOP_N))
+    except ValueError:
+        return DEFAULT_TOP_N
+
+
+def _stats_file():
+    return os.environ.get('ANALYSIS_WARMUP_STATS_FILE')
+
+
+def _load_stats_locked():
+    global _loaded_stats
+    if _loaded_stats:
+        return
+    _loaded_stats = True
+    path = _stats_file()
+    if not path or not os.path.exists(path):
+        return
+    try:
+        with open(path, encoding='utf-8') as f:
+            _counts.update({symbol: int(count) for symbol, count in json.load(f).items()})
+    except (OSError, ValueError) as e:
+        log.warning("요청 통계 파일 읽기 실패: %s", e)
+
+
+def _prune_locked():
+    """상위 STATS_MAX_SYMBOLS개만 남기고 그 스냅샷 반환"""
+    global _pending
+    _pending = 0
+    top = dict(_counts.most_common(STATS_MAX_SYMBOLS))
+    _counts.clear()
+    _counts.update(top)
+    return top
+
+
+def _write_stats(snapshot):
+    """요청 통계 파일 저장 (_lock 밖에서 실행, 저장끼리는 _write_lock으로 직렬화)"""
+    path = _stats_file()
+    if not path:
+        return
+    with _write_lock:
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            log.warning("요청 통계 파일 저장 실패: %s", e)
+
+
+def record_request(symbol):
+    """
+    분석 요청된 심볼 기록 (핫셋 선정용) - 데이터 로드에 성공한 심볼만 호출
+    STATS_FLUSH_EVERY건마다 상위 심볼만 남기고, 파일 저장은 요청을 막지 않도록 백그라운드 스레드에서 실행
+    """
+    global _pending
+    with _lock:
+        _load_stats_locked()
+        _counts[symbol] += 1
+        _pending += 1
+        if _pending < STATS_FLUSH_EVERY:
+            return
+        snapshot = _prune_locked()
+    if _stats_file():
+        threading.Thread(target=_write_stats, args=(snapshot,), name='warmup-stats', daemon=True).start()
+
+
+def hot_symbols(default_symbols=(), top_n=None):
+    """워밍업 대상 심볼 목록 (중복 제거, 최대 top_n개)"""
+    top_n = top_n or _top_n()
+    configured = [s.strip().upper() for s in os.environ.get('ANALYSIS_WARMUP_SYMBOLS', '').split(',') if s.strip()]
+    with _lock:
+        _load_stats_locked()
+        requested = [symbol for symbol, _ in _counts.most_common(top_n)]
+    return list(dict.fromkeys(configured + requested + list(default_symbols)))[:top_n]
+
+
+def run_warmup(engine, symbols=None, default_symbols=()):
+    """
+    engine(AnalysisEngine)으로 핫셋 데이터를 미리 로드하고 요약 반환
+    통합 분석에 필요한 데이터(종목, ^KS11, 동종 기업)를 배치 선로딩과 같은 방식으로 한 번에 받음
+    """
+    started = time.perf_counter()
+    symbols = symbols or hot_symbols(default_symbols)
+
+    mapping_size = 0
+    try:
+        mapping_size = len(engine.load_kospi_mapping())
+    except Exception as e:
+        log.warning("산업 매핑 로드 실패: %s", e)
+
+    loaded = engine.prefetch_batch_data([(symbol, ['speedtraffic']) for symbol in symbols])
+
+    with _lock:
+        snapshot = _prune_locked() if _pending else None
+    if snapshot is not None:
+        _write_stats(snapshot)
+
+    summary = {
+        'symbols': symbols,
+        'loaded': loaded,
+        'mapping_size': mapping_size,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+    log.info("워밍업 완료: %d개 심볼, 신규 로드 %d건, %.1fms", len(symbols), loaded, summary['elapsed_ms'])
+    return summary
+
+
+def start_background(engine_factory, default_symbols=()):
+    """워커 시작 시 워밍업 (요청 처리를 막지 않도록 데몬 스레드에서 실행)"""
+    def run():
+        try:
+            run_warmup(engine_factory(), default_symbols=default_symbols)
+        except Exception as e:
+            log.warning("워밍업 실패: %s", e)
+
+    thread = threading.Thread(target=run, name='cache-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def wants_warmup_on_start():
+    return os.environ.get('ANALYSIS_WARMUP_ON_START', '').lower() in ('1', 'true', 'yes', 'on')
@@ -13,14 +13,65 @@ warnings.filterwarnings('ignore')
 
 # 필요한 라이브러리 import
 try:
-    import yfinance as yf
     import pandas as pd
     import numpy as np
-    from datetime import datetime, timedelta
+    from datetime import datetime
 except ImportError as e:
     print(f"라이브러리 import 오류: {e}", file=sys.stderr)
     sys.exit(1)
 
+# 현재 디렉토리를 Python 경로에 추가 (공용 모듈 import용)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+import _serializer
+import _market_data
+import _panel
+import _risk
+import _log
+import _timing
+
+log = _log.get_logger('backtest')
+
+def load_trading_calendar(tickers, start_date, end_date):
+    """
+    모든 종목이 KRX 종목이면 KRX 거래일 (KOSPI 지수 기준)
+    KRX 외 종목이 있거나 지수를 받을 수 없으면 None (종목 날짜의 합집합으로 정렬 - 지수를 따로 받지 않음)
+    """
+    if not tickers or not all(_panel.is_krx_symbol(ticker) for ticker in tickers):
+        return None
+    try:
+        return _panel.trading_calendar(_market_data.load_history_range(_panel.MARKET_SYMBOL, start_date, end_date))
+    except Exception as e:
+        log.warning("KOSPI 거래일 로드 실패: %s", e)
+        return None
+
+def data_version(tickers, start_date, end_date):
+    """
+    ETag용 데이터 버전 - 종목별 (마지막 거래일, 마지막 종가), 로드 실패한 종목은 None
+    백테스트와 같은 기간으로 캐시에서 읽으므로 이어지는 백테스트는 다시 받지 않음
+    """
+    version = []
+    with _timing.stage('fetch'):
+        for ticker in tickers:
+            try:
+                hist = _market_data.load_history_range(ticker, start_date, end_date)
+                version.append((hist.index[-1].date().isoformat(), round(float(hist['Close'].iloc[-1]), 4)))
+            except Exception:
+                version.append(None)
+    return version
+
+def portfolio_risk(returns, weights):
+    """백테스트 포트폴리오의 방법/신뢰수준별 VaR/CVaR (%) - 관측일이 부족하면 None"""
+    if len(returns) < _risk.MIN_OBSERVATIONS:
+        return None
+    weights = _risk.normalize_weights(weights)
+    estimates, volatility = _risk.portfolio_risk(returns, weights)
+    risk = _risk.format_results(list(range(weights.shape[1])), weights, estimates, volatility, _risk.DEFAULT_LEVELS)[0]
+    risk.pop('weights')
+    return risk
+
 def calculate_portfolio_backtest(tickers, weights, start_date, end_date, period):
     """
     포트폴리오 백테스팅 계산
@@ -45,64 +96,67 @@ def calculate_portfolio_backtest(tickers, weights, start_date, end_date, period)
         
         # 주가 데이터 수집
         price_data = {}
-        for ticker in tickers:
-            try:
-                stock = yf.Ticker(ticker)
-                hist = stock.history(start=start_date, end=end_date)
-                if hist.empty:
-                    print(f"⚠️ {ticker} 데이터가 없습니다", file=sys.stderr)
+        with _timing.stage('fetch'):
+            for ticker in tickers:
+                try:
+                    hist = _market_data.load_history_range(ticker, start_date, end_date)
+                    price_data[ticker] = hist['Close']
+                except ValueError:
+                    log.warning("%s 데이터가 없습니다", ticker)
                     continue
-                price_data[ticker] = hist['Close']
-            except Exception as e:
-                print(f"⚠️ {ticker} 데이터 수집 실패: {e}", file=sys.stderr)
-                continue
+                except Exception as e:
+                    log.warning("%s 데이터 수집 실패: %s", ticker, e)
+                    continue
+            calendar = load_trading_calendar(list(price_data), start_date, end_date)
         
         if not price_data:
             raise ValueError("유효한 주가 데이터가 없습니다")
         
-        # 데이터프레임 생성
-        df = pd.DataFrame(price_data)
-        df = df.dropna()
-        
-        if df.empty:
-            raise ValueError("공통 거래일 데이터가 없습니다")
+        with _timing.stage('align'):
+            # 거래일(KRX 또는 종목 날짜 합집합) 기준 패널에서 모든 종목 가격이 있는 날만 사용
+            panel = _panel.PricePanel.build(price_data, calendar=calendar)
+            panel = panel.take(panel.complete_rows())
+            
+            if len(panel) == 0:
+                raise ValueError("공통 거래일 데이터가 없습니다")
+            
+            weight_by_ticker = dict(zip(tickers, normalized_weights))
+            panel_weights = np.array([weight_by_ticker[ticker] for ticker in panel.tickers])
         
-        # 일일 수익률 계산
-        returns = df.pct_change().dropna()
+        with _timing.stage('compute'):
+            # 포트폴리오 수익률 계산 (가중평균, 첫 거래일 제외)
+            portfolio_returns = pd.Series(panel.returns[1:] @ panel_weights, index=panel.dates[1:])
         
-        # 포트폴리오 수익률 계산 (가중평균)
-        portfolio_returns = (returns * normalized_weights).sum(axis=1)
+            # 누적 수익률 계산
+            cumulative_returns = (1 + portfolio_returns).cumprod()
         
-        # 누적 수익률 계산
-        cumulative_returns = (1 + portfolio_returns).cumprod()
+            # 성과 지표 계산
+            total_return = (cumulative_returns.iloc[-1] - 1) * 100  # 총 수익률 (%)
         
-        # 성과 지표 계산
-        total_return = (cumulative_returns.iloc[-1] - 1) * 100  # 총 수익률 (%)
+            # 연환산 수익률
+            days = len(portfolio_returns)
+            annualized_return = ((cumulative_returns.iloc[-1]) ** (252/days) - 1) * 100
         
-        # 연환산 수익률
-        days = len(portfolio_returns)
-        annualized_return = ((cumulative_returns.iloc[-1]) ** (252/days) - 1) * 100
+            # 변동성 (연환산)
+            volatility = portfolio_returns.std() * np.sqrt(252) * 100
         
-        # 변동성 (연환산)
-        volatility = portfolio_returns.std() * np.sqrt(252) * 100
+            # 샤프 비율 (무위험 수익률 3% 가정)
+            risk_free_rate = 0.03
+            excess_return = (annualized_return/100) - risk_free_rate
+            sharpe_ratio = excess_return / (volatility/100) if volatility > 0 else 0
         
-        # 샤프 비율 (무위험 수익률 3% 가정)
-        risk_free_rate = 0.03
-        excess_return = (annualized_return/100) - risk_free_rate
-        sharpe_ratio = excess_return / (volatility/100) if volatility > 0 else 0
+            # 최대 낙폭 (Maximum Drawdown)
+            peak = cumulative_returns.expanding().max()
+            drawdown = (cumulative_returns - peak) / peak
+            max_drawdown = drawdown.min() * 100
         
-        # 최대 낙폭 (Maximum Drawdown)
-        peak = cumulative_returns.expanding().max()
-        drawdown = (cumulative_returns - peak) / peak
-        max_drawdown = drawdown.min() * 100
+            # 일일 수익률 데이터 (차트용) - 날짜 포맷과 반올림을 배열 단위로 한 번에 처리
+            dates = cumulative_returns.index.strftime('%Y-%m-%d')
+            values = np.round((cumulative_returns.values - 1) * 100, 2)  # 수익률 %
+            daily_returns_data = [{'date': d, 'value': v} for d, v in zip(dates, values.tolist())]
         
-        # 일일 수익률 데이터 (차트용)
-        daily_returns_data = []
-        for date, value in cumulative_returns.items():
-            daily_returns_data.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'value': round((value - 1) * 100, 2)  # 수익률 %
-            })
+            # 백테스트 기간 1일 VaR/CVaR (관측일이 부족하면 생략)
+            risk = portfolio_risk(panel.returns[1:], panel_weights)
         
         # 결과 반환
         result = {
@@ -112,6 +166,7 @@ def calculate_portfolio_backtest(tickers, weights, start_date, end_date, period)
             'volatility': round(volatility, 2),
             'sharpe_ratio': round(sharpe_ratio, 2),
             'max_drawdown': round(max_drawdown, 2),
+            'risk': risk,
             'dailyReturns': daily_returns_data
         }
         
@@ -165,12 +220,12 @@ if __name__ == "__main__":
         result = handle_backtest_request(input_data)
         
         # 결과 출력
-        print(json.dumps(result, ensure_ascii=False))
+        sys.stdout.buffer.write(_serializer.dumps_line(result))
         
     except Exception as e:
         error_result = {
             'error': str(e),
             'timestamp': datetime.now().isoformat()
         }
-        print(json.dumps(error_result, ensure_ascii=False), file=sys.stderr)
+        sys.stderr.buffer.write(_serializer.dumps_line(error_result))
         sys.exit(1)
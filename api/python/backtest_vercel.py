@@ -9,27 +9,38 @@ sys.path.append(current_dir)
 
 # backtest 모듈에서 필요한 함수들 가져오기
 try:
+    import backtest
     from backtest import handle_backtest_request
 except ImportError:
     # 로컬 개발 환경에서는 직접 import
     import backtest
     handle_backtest_request = backtest.handle_backtest_request
 
+import _response
+import _serializer
+import _log
+import _timing
+import _profiling
+import _arrow
+import _downsample
+
+log = _log.get_logger('backtest')
+
+# GET 응답 CORS 헤더
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, If-None-Match, X-Debug-Profile, X-Debug-Profile-Token',
+}
+
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
         """
         Vercel 서버리스 함수로 POST 요청 처리
         포트폴리오 백테스팅 수행
         """
+        timer = None
         try:
-            # CORS 헤더 설정
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-            self.end_headers()
-
             # 요청 본문 읽기
             content_length = int(self.headers.get('Content-Length', 0))
             post_data = self.rfile.read(content_length)
@@ -41,39 +52,75 @@ class handler(BaseHTTPRequestHandler):
                 self.send_error_response(400, f"Invalid JSON: {str(e)}")
                 return
 
-            # 백테스팅 실행
-            result = handle_backtest_request(request_data)
+            # 백테스팅 실행 (단계별 소요 시간 기록, 요청 시 프로파일링)
+            profile_mode = _profiling.requested_mode(self.headers)
+            arrow_format = _arrow.requested_format(self.headers.get('Accept'))
+            include_timings = _timing.wants_timings(request_data.get('timings', False))
+            try:
+                points = _downsample.parse_points(request_data.get('points'))
+            except ValueError as e:
+                self.send_error_response(400, str(e))
+                return
+            timer = _timing.RequestTimer('backtest')
+            with _profiling.profile_request(profile_mode, 'backtest') as profile, _timing.activate(timer):
+                result = handle_backtest_request(request_data)
             
-            # 성공 응답
-            response_data = {
-                'success': True,
-                'data': result,
-                'timestamp': result.get('timestamp', '')
-            }
+                # 성공 응답
+                response_data = {
+                    'success': True,
+                    'data': result,
+                    'timestamp': result.get('timestamp', '')
+                }
+                response_data = _downsample.downsample_result(response_data, points)
             
-            self.wfile.write(json.dumps(response_data, ensure_ascii=False).encode('utf-8'))
+                with _timing.stage('encode'):
+                    table = _arrow.to_table(response_data) if arrow_format else None
+                    body = _serializer.dumps(response_data) if table is None else None
+
+            # Arrow IPC 응답 (Accept 헤더로 요청한 경우, 수익률 곡선은 date/value 컬럼)
+            if table is not None:
+                body = _arrow.write(table, arrow_format, _arrow.debug_fields(timer if include_timings else None, profile))
+                _response.send_json_body(self, body, cors_headers=CORS_HEADERS,
+                                         content_type=_arrow.CONTENT_TYPES[arrow_format])
+                return
+
+            if include_timings:
+                body = _timing.attach_timings(body, timer)
+            if profile is not None:
+                body = _serializer.append_field(body, '_profile', profile.summary())
+
+            # CORS 헤더 설정
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type, X-Debug-Profile, X-Debug-Profile-Token')
+            self.end_headers()
+            self.wfile.write(body)
             
         except Exception as e:
             self.send_error_response(500, f"백테스팅 처리 오류: {str(e)}")
+        finally:
+            # 실패한 요청도 소요 시간 기록
+            if timer is not None:
+                timer.finish()
 
     def do_GET(self):
         """
         GET 요청 처리 (쿼리 파라미터 방식)
         """
+        timer = None
         try:
             from urllib.parse import urlparse, parse_qs
-            
-            # CORS 헤더 설정
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-            self.end_headers()
 
             # URL 파싱
             parsed_url = urlparse(self.path)
             query_params = parse_qs(parsed_url.query)
+
+            # 단계별 소요 시간 히스토그램 (Prometheus 텍스트 포맷)
+            if query_params.get('type', [''])[0] == 'metrics':
+                self.send_metrics_response()
+                return
             
             # 쿼리 파라미터에서 데이터 추출
             tickers = query_params.get('tickers', [''])[0].split(',') if query_params.get('tickers') else []
@@ -92,20 +139,70 @@ class handler(BaseHTTPRequestHandler):
                 'period': period
             }
             
-            # 백테스팅 실행
-            result = handle_backtest_request(request_data)
-            
-            # 성공 응답
+            # 백테스팅 실행 (단계별 소요 시간 기록, 요청 시 프로파일링)
+            profile_mode = _profiling.requested_mode(self.headers)
+            arrow_format = _arrow.requested_format(self.headers.get('Accept'))
+            include_timings = _timing.wants_timings(query_params.get('timings', ['0'])[0])
+            # 차트용 다운샘플링 목표 점 개수 (points=N)
+            try:
+                points = _downsample.parse_points(query_params.get('points', [None])[0])
+            except ValueError as e:
+                self.send_error_response(400, str(e))
+                return
+            timer = _timing.RequestTimer('backtest')
+            with _profiling.profile_request(profile_mode, 'backtest') as profile, _timing.activate(timer):
+                # 조건부 GET: 요청 파라미터와 종목별 마지막 일봉이 같으면 백테스트 없이 304 응답
+                version = backtest.data_version(tickers, start_date, end_date) if start_date and end_date else []
+                etag = _response.make_etag(tickers, weights, start_date, end_date, period, *version,
+                                           *([arrow_format] if arrow_format else []), *([points] if points else []))
+                if profile is None and _response.is_not_modified(self, etag):
+                    _response.send_not_modified(self, etag, CORS_HEADERS)
+                    return
+
+                result = handle_backtest_request(request_data)
+
+            # 성공 응답 (클라이언트가 허용하면 압축)
             response_data = {
                 'success': True,
                 'data': result,
                 'timestamp': result.get('timestamp', '')
             }
+            response_data = _downsample.downsample_result(response_data, points)
             
-            self.wfile.write(json.dumps(response_data, ensure_ascii=False).encode('utf-8'))
+            with _timing.activate(timer), _timing.stage('encode'):
+                table = _arrow.to_table(response_data) if arrow_format else None
+                body = _serializer.dumps(response_data) if table is None else None
+
+            content_type = 'application/json'
+            if table is not None:
+                body = _arrow.write(table, arrow_format, _arrow.debug_fields(timer if include_timings else None, profile))
+                content_type = _arrow.CONTENT_TYPES[arrow_format]
+            else:
+                if include_timings:
+                    body = _timing.attach_timings(body, timer)
+                if profile is not None:
+                    body = _serializer.append_field(body, '_profile', profile.summary())
+
+            _response.send_json_body(self, body, etag=etag, cors_headers=CORS_HEADERS, content_type=content_type)
             
         except Exception as e:
             self.send_error_response(500, f"백테스팅 처리 오류: {str(e)}")
+        finally:
+            # 실패한 요청도 소요 시간 기록
+            if timer is not None:
+                timer.finish()
+
+    def send_metrics_response(self):
+        """
+        단계별 소요 시간 롤링 히스토그램 응답 (Prometheus 텍스트 포맷)
+        """
+        body = _timing.registry.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
     def do_OPTIONS(self):
         """
@@ -114,7 +211,7 @@ class handler(BaseHTTPRequestHandler):
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match, X-Debug-Profile, X-Debug-Profile-Token')
         self.end_headers()
 
     def send_error_response(self, status_code, error_message):
@@ -133,12 +230,12 @@ class handler(BaseHTTPRequestHandler):
                 'timestamp': ''
             }
             
-            self.wfile.write(json.dumps(error_data, ensure_ascii=False).encode('utf-8'))
+            _serializer.write_json(self.wfile, error_data)
         except Exception as e:
-            print(f"에러 응답 전송 실패: {e}", file=sys.stderr)
+            log.error("에러 응답 전송 실패: %s", e)
 
     def log_message(self, format, *args):
         """
         로그 메시지 출력 (Vercel 환경에서는 stderr로)
         """
-        print(f"[BACKTEST] {format % args}", file=sys.stderr)
+        log.info(format, *args)
@@ -1,19 +1,126 @@
 from http.server import BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 import json
+import os
+import sys
 import pandas as pd
-import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import datetime
 import urllib.parse
 import numpy as np
-import math
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
+# 현재 디렉토리를 Python 경로에 추가 (공용 모듈 import용)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+import _market_data
+import _fetch_scheduler
+import _response
+import _serializer
+import _log
+import _timing
+import _profiling
+import _indicators
+import _params
+import _warmup
+import _history
+import _signal_backtest
+import _intraday
+import _peer_index
+import _industry_vectors
+import _arrow
+import _downsample
+import _process_pool
+import _panel
+import _risk
+
+api_log = _log.get_logger('python_api')
+ticker_log = _log.get_logger('ticker_convert')
+data_log = _log.get_logger('load_data')
+batch_log = _log.get_logger('batch')
+analysis_log = _log.get_logger('unified_analysis')
+
+# GET 응답 CORS 헤더
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, User-Agent, Accept, If-None-Match, X-Debug-Profile, X-Debug-Profile-Token',
+}
+
+# 배치 요청 제한
+MAX_BATCH_SYMBOLS = 500
+BATCH_MAX_WORKERS = 8
+
+# 분석 타입별 계산 메서드
+ANALYSIS_METHODS = {
+    'mfi': 'calculate_mfi',
+    'rsi': 'calculate_rsi',
+    'bollinger': 'calculate_bollinger',
+    'capm': 'calculate_capm',
+    'garch': 'calculate_garch_analysis',
+    'industry': 'calculate_industry_analysis',
+    'intraday': 'calculate_intraday',
+    'speedtraffic': 'run_integrated_analysis',
+}
+
+# 통합 분석(speedtraffic) 실행 순서와 로그용 이름
+INTEGRATED_ANALYSES = ('mfi', 'bollinger', 'rsi', 'industry', 'capm', 'garch')
+ANALYSIS_LABELS = {
+    'mfi': 'MFI',
+    'bollinger': 'Bollinger',
+    'rsi': 'RSI',
+    'industry': 'Industry',
+    'capm': 'CAPM',
+    'garch': 'GARCH',
+}
+
+# 통합 분석 기본 시간 예산 (초) - 기본은 제한 없음, 요청의 deadline_ms나 이 환경변수로 켬
+# (예: Node 쪽 45초 타임아웃보다 먼저 부분 결과를 받으려면 40)
+DEFAULT_DEADLINE_SECONDS = float(os.environ.get('ANALYSIS_DEADLINE_SECONDS', 0))
+MAX_DEADLINE_MS = 300000
+
+# 간단한 회사명-티커 매핑 (주요 기업들) - 워밍업 기본 대상으로도 사용
+MAJOR_COMPANY_TICKERS = {
+    '삼성전자': '005930',
+    'SK하이닉스': '000660',
+    'LG에너지솔루션': '373220',
+    'NAVER': '035420',
+    '카카오': '035720',
+    'LG화학': '051910',
+    '현대차': '005380',
+    'KB금융': '105560',
+    '신한지주': '055550',
+    'LG전자': '066570',
+    '포스코홀딩스': '005490',
+    '기아': '000270',
+    'SK': '034730',
+    'KT&G': '033780',
+    '하나금융지주': '086790',
+    'SK이노베이션': '096770',
+    '현대모비스': '012330',
+    'LG': '003550',
+    '우리금융지주': '316140',
+    'POSCO DX': '022100'
+}
+
+# 산업 매핑 (프로세스 단위로 한 번만 파싱)
+_kospi_mapping_cache = None
+
 class handler(BaseHTTPRequestHandler):
+    # lean 모드 계산 dtype (None이면 기존 DataFrame 계산) - 요청의 lean 옵션으로 덮어씀
+    lean_dtype = _indicators.lean_dtype(os.environ.get('ANALYSIS_LEAN'))
+    # 조회 기간/지표 윈도우/임계값 (_params 기본값) - 요청 파라미터로 덮어씀
+    params = _params.DEFAULT_PARAMS
+    # 통합 분석 마감 시각 (time.monotonic 기준, None이면 제한 없음) - 요청의 deadline_ms로 설정
+    deadline = None
+
     def do_GET(self):
-        import sys
+        timer = None
         try:
-            print(f"[PYTHON_API] GET 요청 수신: {self.path}", file=sys.stderr)
+            api_log.debug("GET 요청 수신: %s", self.path)
 
             # URL 파라미터 파싱
             parsed_url = urllib.parse.urlparse(self.path)
@@ -23,62 +130,210 @@ class handler(BaseHTTPRequestHandler):
             analysis_type = query_params.get('type', ['speedtraffic'])[0]
             symbol = query_params.get('symbol', [None])[0]
 
-            print(f"[PYTHON_API] 파라미터 - symbol: {symbol}, type: {analysis_type}", file=sys.stderr)
+            # 단계별 소요 시간 히스토그램 (Prometheus 텍스트 포맷)
+            if analysis_type == 'metrics':
+                self.send_metrics_response()
+                return
+
+            # 유니버스 신호등 전략 백테스트 (심볼 불필요)
+            if analysis_type == 'signal_backtest':
+                self.send_signal_backtest_response(query_params)
+                return
+
+            # 산업 벡터 검색 (type=industry_search&industries=산업명|산업명&k=5)
+            if analysis_type == 'industry_search':
+                try:
+                    result = _industry_vectors.search_request(
+                        AnalysisEngine(), {key: values[0] for key, values in query_params.items()})
+                except ValueError as e:
+                    self.send_error_response(400, str(e))
+                    return
+                _response.send_json_body(self, _serializer.dumps(result), cors_headers=CORS_HEADERS)
+                return
+
+            # 포트폴리오 VaR/CVaR (type=portfolio_risk&tickers=005930,000660&weights=6,4;5,5&confidence=0.95,0.99)
+            if analysis_type == 'portfolio_risk':
+                values = {key: values[0] for key, values in query_params.items()}
+                try:
+                    engine = AnalysisEngine()
+                    engine.params = _params.from_request(values)
+                    result = _risk.risk_request(engine, values)
+                except ValueError as e:
+                    self.send_error_response(400, str(e))
+                    return
+                except _fetch_scheduler.CircuitOpenError as e:
+                    self.send_error_response(503, str(e))
+                    return
+                _response.send_json_body(self, _serializer.dumps(result), cors_headers=CORS_HEADERS)
+                return
+
+            # 동종 기업 상관계수 인덱스 갱신 (크론으로 매일 호출, Authorization: Bearer $CRON_SECRET 필요)
+            if analysis_type == 'peer_index':
+                if not _response.cron_authorized(self.headers):
+                    self.send_error_response(401, "Unauthorized")
+                    return
+                summary = _peer_index.refresh(AnalysisEngine())
+                _response.send_json_body(self, _serializer.dumps(summary), cors_headers=CORS_HEADERS)
+                return
+
+            # 캐시 워밍업 (크론 등에서 주기적으로 호출, Authorization: Bearer $CRON_SECRET 필요)
+            if analysis_type == 'warmup':
+                if not _response.cron_authorized(self.headers):
+                    self.send_error_response(401, "Unauthorized")
+                    return
+                summary = _warmup.run_warmup(AnalysisEngine(), default_symbols=MAJOR_COMPANY_TICKERS.values())
+                _response.send_json_body(self, _serializer.dumps(summary), cors_headers=CORS_HEADERS)
+                return
+
+            api_log.debug("파라미터 - symbol: %s, type: %s", symbol, analysis_type)
 
             if not symbol:
-                print("[PYTHON_API] 오류: Symbol 파라미터 누락", file=sys.stderr)
                 self.send_error_response(400, "Symbol parameter is required")
                 return
 
             symbol = symbol.upper()
-            print(f"[PYTHON_API] {symbol} {analysis_type} 분석 시작", file=sys.stderr)
-
-            # 분석 타입에 따라 다른 함수 호출
-            if analysis_type == 'mfi':
-                result = self.calculate_mfi(symbol)
-            elif analysis_type == 'rsi':
-                result = self.calculate_rsi(symbol)
-            elif analysis_type == 'bollinger':
-                result = self.calculate_bollinger(symbol)
-            elif analysis_type == 'capm':
-                result = self.calculate_capm(symbol)
-            elif analysis_type == 'garch':
-                result = self.calculate_garch_analysis(symbol)
-            elif analysis_type == 'industry':
-                result = self.calculate_industry_analysis(symbol)
-            else:  # speedtraffic (통합 분석)
-                result = self.run_integrated_analysis(symbol)
-
-            print(f"[PYTHON_API] {symbol} {analysis_type} 분석 완료: {result.get('traffic_light', 'unknown')}", file=sys.stderr)
-
-            # 성공 응답
+
+            include_timings = _timing.wants_timings(query_params.get('timings', ['0'])[0])
+            if 'lean' in query_params:
+                self.lean_dtype = _indicators.lean_dtype(query_params['lean'][0])
+            try:
+                self.params = _params.from_request({key: values[0] for key, values in query_params.items()})
+                # 차트용 다운샘플링 목표 점 개수 (points=N)
+                points = _downsample.parse_points(query_params.get('points', [None])[0])
+                self.deadline = parse_deadline(query_params.get('deadline_ms', [None])[0])
+                # 장중 모드는 신호등 임계값 외의 파라미터를 반영할 수 없으므로 미리 거부
+                if analysis_type == 'intraday':
+                    _intraday.get_session().book.check_params(self.params)
+            except ValueError as e:
+                self.send_error_response(400, str(e))
+                return
+
+            # 과거 신호등 시계열 옵션 (type=history&start=YYYY-MM-DD&end=YYYY-MM-DD&indicators=mfi,rsi)
+            history_options = {}
+            if analysis_type == 'history':
+                history_options = {key: query_params[key][0]
+                                   for key in ('start', 'end', 'indicators') if key in query_params}
+
+            # 디버그 프로파일링 (X-Debug-Profile 헤더 또는 ANALYSIS_PROFILE 환경변수)
+            profile_mode = _profiling.requested_mode(self.headers)
+
+            # Accept 헤더로 Arrow IPC 응답 요청 (시계열이 있는 결과만, 나머지는 JSON)
+            arrow_format = _arrow.requested_format(self.headers.get('Accept'))
+
+            timer = _timing.RequestTimer('analysis')
+            with _profiling.profile_request(profile_mode, f"analysis_{symbol}_{analysis_type}") as profile, \
+                    _timing.activate(timer):
+                # 조건부 GET: (심볼, 분석 타입, 마지막 거래일)이 같으면 분석 없이 304 응답 (프로파일링 요청은 제외)
+                etag = None
+                # 장중 모드는 분봉이 계속 바뀌므로 일봉 기준 ETag를 쓰지 않음
+                data_version = self.get_data_version(symbol) if analysis_type != 'intraday' else None
+                if data_version is not None:
+                    etag = _response.make_etag(symbol, analysis_type, *data_version,
+                                               np.dtype(self.lean_dtype).name if self.lean_dtype else 'full',
+                                               *sorted(history_options.items()), *self.params.cache_key(),
+                                               *([arrow_format] if arrow_format else []), *([points] if points else []))
+                    if profile is None and _response.is_not_modified(self, etag):
+                        api_log.debug("%s %s 변경 없음 (304)", symbol, analysis_type)
+                        self.record_hot_symbol(symbol)
+                        _response.send_not_modified(self, etag, CORS_HEADERS)
+                        return
+
+                api_log.debug("%s %s 분석 시작", symbol, analysis_type)
+
+                # 분석 타입에 따라 다른 함수 호출
+                if analysis_type == 'history':
+                    result = self.calculate_history(symbol, **history_options)
+                else:
+                    result = self.run_analysis(symbol, analysis_type)
+
+                api_log.info("%s %s 분석 완료: %s", symbol, analysis_type, result.get('traffic_light', 'unknown'))
+                self.record_hot_symbol(symbol)
+
+                # 마감으로 일부만 계산한 응답은 재사용되지 않도록 ETag를 붙이지 않음
+                if result.get('partial'):
+                    etag = None
+
+                if points:
+                    with _timing.stage('downsample'):
+                        result = _downsample.downsample_result(result, points)
+
+                with _timing.stage('encode'):
+                    table = _arrow.to_table(result) if arrow_format else None
+                    body = _serializer.dumps(result) if table is None else None
+
+            content_type = 'application/json'
+            if table is not None:
+                body = _arrow.write(table, arrow_format, _arrow.debug_fields(timer if include_timings else None, profile))
+                content_type = _arrow.CONTENT_TYPES[arrow_format]
+            else:
+                if include_timings:
+                    body = _timing.attach_timings(body, timer)
+                if profile is not None:
+                    body = _serializer.append_field(body, '_profile', profile.summary())
+
+            # 성공 응답 (클라이언트가 허용하면 압축)
+            _response.send_json_body(self, body, etag=etag, cors_headers=CORS_HEADERS, content_type=content_type)
+
+        except Exception as e:
+            api_log.exception("오류 발생: %s", e)
+            self.send_error_response(500, f"Internal server error: {str(e)}")
+        finally:
+            # 실패한 요청도 소요 시간 기록
+            if timer is not None:
+                timer.finish()
+    
+    def do_POST(self):
+        """배치 분석 요청 처리 - 결과를 NDJSON으로 스트리밍"""
+        streaming = False
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            post_data = self.rfile.read(content_length)
+
+            try:
+                input_data = json.loads(post_data.decode('utf-8'))
+            except json.JSONDecodeError as e:
+                self.send_error_response(400, f"Invalid JSON: {str(e)}")
+                return
+
+            if not is_batch_request(input_data):
+                self.send_error_response(400, "Batch body must contain a 'requests' list")
+                return
+
+            try:
+                parse_batch_request(input_data)
+                _params.from_request(input_data)
+            except ValueError as e:
+                self.send_error_response(400, str(e))
+                return
+
+            api_log.info("배치 분석 요청: %d건", len(input_data['requests']))
+
             self.send_response(200)
-            self.send_header('Content-type', 'application/json')
+            self.send_header('Content-type', 'application/x-ndjson; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
             self.send_header('Access-Control-Allow-Headers', 'Content-Type, User-Agent, Accept')
             self.end_headers()
+            streaming = True
 
-            response_json = json.dumps(result, ensure_ascii=False)
-            self.wfile.write(response_json.encode('utf-8'))
+            write_batch_ndjson(self.wfile, input_data)
 
         except Exception as e:
-            print(f"[PYTHON_API] 오류 발생: {str(e)}", file=sys.stderr)
-            import traceback
-            traceback.print_exc(file=sys.stderr)
-            self.send_error_response(500, f"Internal server error: {str(e)}")
-    
+            api_log.exception("배치 처리 오류: %s", e)
+            if not streaming:
+                self.send_error_response(500, f"Internal server error: {str(e)}")
+
     def do_OPTIONS(self):
         # CORS preflight 요청 처리
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', CORS_HEADERS['Access-Control-Allow-Headers'])
         self.end_headers()
     
     def send_error_response(self, status_code, message):
-        import sys
-        print(f"[PYTHON_API] 오류 응답 전송: {status_code} - {message}", file=sys.stderr)
+        api_log.warning("오류 응답 전송: %s - %s", status_code, message)
 
         self.send_response(status_code)
         self.send_header('Content-type', 'application/json')
@@ -92,13 +347,83 @@ class handler(BaseHTTPRequestHandler):
             "timestamp": datetime.now().isoformat(),
             "status": status_code
         }
-        response_json = json.dumps(error_response, ensure_ascii=False)
-        self.wfile.write(response_json.encode('utf-8'))
+        _serializer.write_json(self.wfile, error_response)
+
+    def send_metrics_response(self):
+        """단계별 소요 시간 롤링 히스토그램을 Prometheus 텍스트 포맷으로 응답"""
+        body = _timing.registry.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_signal_backtest_response(self, query_params):
+        """신호등 전략 백테스트 결과 응답 (tickers, start, end, horizons, allow_short, risk_filter)"""
+        arrow_format = _arrow.requested_format(self.headers.get('Accept'))
+        include_timings = _timing.wants_timings(query_params.get('timings', ['0'])[0])
+        timer = _timing.RequestTimer('signal_backtest')
+        try:
+            with _timing.activate(timer):
+                # 잘못된 옵션(tickers, horizons, start/end, points, 지표 파라미터)은 400
+                try:
+                    values = {key: values[0] for key, values in query_params.items()}
+                    options = parse_signal_backtest_options(values)
+                    points = _downsample.parse_points(query_params.get('points', [None])[0])
+                    engine = AnalysisEngine()
+                    engine.params = _params.from_request(values)
+                    result = _signal_backtest.run_signal_backtest(engine, **options)
+                except ValueError as e:
+                    self.send_error_response(400, str(e))
+                    return
+                result = _downsample.downsample_result(result, points)
+                with _timing.stage('encode'):
+                    table = _arrow.to_table(result) if arrow_format else None
+                    body = _serializer.dumps(result) if table is None else None
+
+            content_type = 'application/json'
+            if table is not None:
+                body = _arrow.write(table, arrow_format, _arrow.debug_fields(timer if include_timings else None))
+                content_type = _arrow.CONTENT_TYPES[arrow_format]
+            elif include_timings:
+                body = _timing.attach_timings(body, timer)
+            _response.send_json_body(self, body, cors_headers=CORS_HEADERS, content_type=content_type)
+        finally:
+            # 실패한 요청도 소요 시간 기록
+            timer.finish()
+
+    def log_message(self, format, *args):
+        """접근 로그는 INFO 레벨로 출력 (기본 설정에서는 출력 안 함)"""
+        api_log.info(format, *args)
+
+    def run_analysis(self, symbol, analysis_type):
+        """분석 타입에 맞는 계산 메서드 실행 (알 수 없는 타입은 통합 분석)"""
+        if analysis_type not in ANALYSIS_METHODS or analysis_type == 'speedtraffic':
+            # 통합 분석은 계산기별로 단계를 나눠 기록
+            return self.run_integrated_analysis(symbol)
+        with _timing.stage(f"compute.{analysis_type}"):
+            return getattr(self, ANALYSIS_METHODS[analysis_type])(symbol)
+
+    def record_hot_symbol(self, symbol):
+        """요청 심볼의 일봉이 로드되어 캐시에 있을 때만 워밍업 핫셋 통계에 기록 (다운로드를 기다리지 않음)"""
+        if _market_data.has_history(self.resolve_yahoo_symbol(symbol), self.params.lookback_days):
+            _warmup.record_request(self.convert_company_name_to_ticker(symbol))
+
+    def get_data_version(self, symbol):
+        """ETag용 데이터 버전 (마지막 거래일, 마지막 종가) - 로드 실패 시 None"""
+        try:
+            df = self.load_stock_data(symbol)
+            return df.index[-1].date().isoformat(), round(float(df['Close'].iloc[-1]), 4)
+        except Exception:
+            return None
+
+    def resolve_yahoo_symbol(self, symbol):
+        """회사명/티커 입력을 야후 파이낸스 심볼로 변환"""
+        return _market_data.to_yahoo_symbol(self.convert_company_name_to_ticker(symbol))
 
     def convert_company_name_to_ticker(self, input_symbol):
         """회사명을 티커로 변환하는 함수"""
-        import sys
-
         # 이미 6자리 숫자 티커면 그대로 반환
         if input_symbol.isdigit() and len(input_symbol) == 6:
             return input_symbol
@@ -112,89 +437,43 @@ class handler(BaseHTTPRequestHandler):
         if clean_symbol.isdigit() and len(clean_symbol) == 6:
             return clean_symbol
 
-        # 간단한 회사명-티커 매핑 (주요 기업들)
-        company_ticker_map = {
-            '삼성전자': '005930',
-            'SK하이닉스': '000660',
-            'LG에너지솔루션': '373220',
-            'NAVER': '035420',
-            '카카오': '035720',
-            'LG화학': '051910',
-            '현대차': '005380',
-            'KB금융': '105560',
-            '신한지주': '055550',
-            'LG전자': '066570',
-            '포스코홀딩스': '005490',
-            '기아': '000270',
-            'SK': '034730',
-            'KT&G': '033780',
-            '하나금융지주': '086790',
-            'SK이노베이션': '096770',
-            '현대모비스': '012330',
-            'LG': '003550',
-            '우리금융지주': '316140',
-            'POSCO DX': '022100'
-        }
-
         # 정확한 매칭 시도
-        if input_symbol in company_ticker_map:
-            converted = company_ticker_map[input_symbol]
-            print(f"[TICKER_CONVERT] '{input_symbol}' -> '{converted}'", file=sys.stderr)
+        if input_symbol in MAJOR_COMPANY_TICKERS:
+            converted = MAJOR_COMPANY_TICKERS[input_symbol]
+            ticker_log.debug("'%s' -> '%s'", input_symbol, converted)
             return converted
 
         # 부분 매칭 시도 (회사명에 포함된 키워드로 검색)
-        for company_name, ticker in company_ticker_map.items():
+        for company_name, ticker in MAJOR_COMPANY_TICKERS.items():
             if company_name in input_symbol or input_symbol in company_name:
-                print(f"[TICKER_CONVERT] 부분매칭 '{input_symbol}' -> '{ticker}' (via {company_name})", file=sys.stderr)
+                ticker_log.debug("부분매칭 '%s' -> '%s' (via %s)", input_symbol, ticker, company_name)
                 return ticker
 
         # 매칭되지 않으면 원본 반환
-        print(f"[TICKER_CONVERT] 매칭 실패, 원본 반환: '{input_symbol}'", file=sys.stderr)
+        ticker_log.debug("매칭 실패, 원본 반환: '%s'", input_symbol)
         return input_symbol
 
     def load_stock_data(self, symbol):
         """주식 데이터 로드 (한국 주식 지원)"""
         try:
-            import sys
-
             # 입력된 심볼이 회사명인지 확인하고 티커로 변환
             original_symbol = symbol
             converted_ticker = self.convert_company_name_to_ticker(symbol)
 
             if converted_ticker != symbol:
-                print(f"[LOAD_DATA] 회사명 변환: '{symbol}' -> '{converted_ticker}'", file=sys.stderr)
+                data_log.debug("회사명 변환: '%s' -> '%s'", symbol, converted_ticker)
                 symbol = converted_ticker
 
             # 한국 주식의 경우 .KS 접미사 추가 (지수는 제외)
-            yahoo_symbol = symbol
-            if symbol.startswith('^'):  # 지수 심볼 (^KS11, ^IXIC 등)
-                yahoo_symbol = symbol  # 지수는 그대로 사용
-            elif symbol.isdigit() and len(symbol) == 6:  # 한국 주식 코드 (6자리 숫자)
-                yahoo_symbol = f"{symbol}.KS"
-            elif '.' not in symbol and not symbol.startswith('^'):  # 접미사가 없는 일반 주식
-                yahoo_symbol = f"{symbol}.KS"
-
-            print(f"[LOAD_DATA] {original_symbol} -> {symbol} -> {yahoo_symbol} 데이터 로드 시작", file=sys.stderr)
-
-            # 1년간의 데이터 가져오기
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=365)
+            yahoo_symbol = _market_data.to_yahoo_symbol(symbol)
 
-            ticker_obj = yf.Ticker(yahoo_symbol)
-            hist = ticker_obj.history(start=start_date, end=end_date)
+            data_log.debug("%s -> %s -> %s 데이터 로드 시작", original_symbol, symbol, yahoo_symbol)
 
-            if hist.empty:
-                raise ValueError(f"No data available for {yahoo_symbol}")
+            # 조회 기간(기본 1년) 데이터 가져오기 (프로세스 캐시 공유, 더 긴 기간 캐시가 있으면 잘라서 사용)
+            with _timing.stage('fetch'):
+                hist = _market_data.load_history(yahoo_symbol, days=self.params.lookback_days)
 
-            # 컬럼명 표준화
-            hist.columns = [col.replace(' ', '').title() for col in hist.columns]
-            hist.rename(columns={'Adjclose': 'AdjClose'}, inplace=True)
-
-            # timezone 정보 제거 (일관성을 위해)
-            if hist.index.tz is not None:
-                hist.index = hist.index.tz_localize(None)
-
-            print(f"[LOAD_DATA] {yahoo_symbol} 데이터 로드 성공: {len(hist)}일", file=sys.stderr)
+            data_log.debug("%s 데이터 로드 성공: %d일", yahoo_symbol, len(hist))
             return hist
 
         except Exception as e:
@@ -288,48 +567,53 @@ class handler(BaseHTTPRequestHandler):
         if not all(col in df.columns for col in ['High', 'Low', 'Close', 'Volume']):
             raise ValueError("Missing required columns for MFI calculation")
 
-        df = df.dropna()
-        if len(df) < 15:
-            raise ValueError(f"Insufficient data for MFI calculation: {len(df)} days")
+        period = self.params.mfi_period
+        if self.lean_dtype is not None:
+            # lean 모드: 필요한 배열만 꺼내 재사용 버퍼로 계산
+            arrays, dates = _indicators.clean_arrays(df, ['High', 'Low', 'Close', 'Volume'], self.lean_dtype)
+            if len(dates) <= period:
+                raise ValueError(f"Insufficient data for MFI calculation: {len(dates)} days")
+            latest_mfi = _indicators.mfi(*arrays, period=period)[-1]
+            latest_date = dates[-1]
+        else:
+            df = df.dropna()
+            if len(df) <= period:
+                raise ValueError(f"Insufficient data for MFI calculation: {len(df)} days")
 
-        # Typical Price 계산
-        df['TP'] = (df['High'] + df['Low'] + df['Close']) / 3
+            # Typical Price 계산
+            df['TP'] = (df['High'] + df['Low'] + df['Close']) / 3
 
-        # Raw Money Flow 계산
-        df['RMF'] = df['TP'] * df['Volume']
+            # Raw Money Flow 계산
+            df['RMF'] = df['TP'] * df['Volume']
 
-        # Money Flow 방향 결정
-        df['MF_Direction'] = 0
-        for i in range(1, len(df)):
-            if df['TP'].iloc[i] > df['TP'].iloc[i-1]:
-                df['MF_Direction'].iloc[i] = 1  # Positive
-            elif df['TP'].iloc[i] < df['TP'].iloc[i-1]:
-                df['MF_Direction'].iloc[i] = -1  # Negative
+            # Money Flow 방향 결정 (전일 대비 TP 상승 1, 하락 -1, 보합 0)
+            df['MF_Direction'] = np.sign(df['TP'].diff()).fillna(0)
 
-        # Positive/Negative Money Flow 분리
-        df['PMF'] = df['RMF'] * (df['MF_Direction'] == 1)
-        df['NMF'] = df['RMF'] * (df['MF_Direction'] == -1)
+            # Positive/Negative Money Flow 분리
+            df['PMF'] = df['RMF'] * (df['MF_Direction'] == 1)
+            df['NMF'] = df['RMF'] * (df['MF_Direction'] == -1)
 
-        # 14일 MFI 계산
-        period = 14
-        df['PMF_14'] = df['PMF'].rolling(window=period).sum()
-        df['NMF_14'] = df['NMF'].rolling(window=period).sum()
+            # 14일 MFI 계산
+            df['PMF_14'] = df['PMF'].rolling(window=period).sum()
+            df['NMF_14'] = df['NMF'].rolling(window=period).sum()
 
-        # MFI 계산
-        df['MFI'] = 100 - (100 / (1 + (df['PMF_14'] / df['NMF_14'])))
+            # MFI 계산
+            df['MFI'] = 100 - (100 / (1 + (df['PMF_14'] / df['NMF_14'])))
 
-        # 최신 MFI 값
-        latest_mfi = df['MFI'].iloc[-1]
+            # 최신 MFI 값
+            latest_mfi = df['MFI'].iloc[-1]
+            latest_date = df.index[-1]
 
         # 신호등 색상 결정 (기존 로직 유지)
-        if latest_mfi >= 80:
+        overbought, oversold = self.params.mfi_overbought, self.params.mfi_oversold
+        if latest_mfi >= overbought:
             color = "red"
             signal = "매도 신호"
-            summary_ko = f"MFI가 {latest_mfi:.1f}로 과매수 구간(80 이상)에 있어 매도 신호입니다."
-        elif latest_mfi <= 20:
+            summary_ko = f"MFI가 {latest_mfi:.1f}로 과매수 구간({overbought:g} 이상)에 있어 매도 신호입니다."
+        elif latest_mfi <= oversold:
             color = "green"
             signal = "매수 신호"
-            summary_ko = f"MFI가 {latest_mfi:.1f}로 과매도 구간(20 이하)에 있어 매수 신호입니다."
+            summary_ko = f"MFI가 {latest_mfi:.1f}로 과매도 구간({oversold:g} 이하)에 있어 매수 신호입니다."
         else:
             color = "yellow"
             signal = "관망 신호"
@@ -337,7 +621,7 @@ class handler(BaseHTTPRequestHandler):
 
         return {
             "symbol": symbol,
-            "date": df.index[-1].date().isoformat(),
+            "date": latest_date.date().isoformat(),
             "mfi_14": round(float(latest_mfi), 2),  # 기존 형식에 맞춤
             "traffic_light": color,
             "signal": signal,
@@ -352,38 +636,48 @@ class handler(BaseHTTPRequestHandler):
         if 'Close' not in df.columns:
             raise ValueError("Missing 'Close' column for RSI calculation")
 
-        df = df.dropna()
-        if len(df) < 15:
-            raise ValueError(f"Insufficient data for RSI calculation: {len(df)} days")
+        period = self.params.rsi_period
+        if self.lean_dtype is not None:
+            # lean 모드: 종가 배열만 사용
+            (close,), dates = _indicators.clean_arrays(df, ['Close'], self.lean_dtype)
+            if len(dates) <= period:
+                raise ValueError(f"Insufficient data for RSI calculation: {len(dates)} days")
+            latest_rsi = _indicators.rsi(close, period=period)[-1]
+            latest_date = dates[-1]
+        else:
+            df = df.dropna()
+            if len(df) <= period:
+                raise ValueError(f"Insufficient data for RSI calculation: {len(df)} days")
 
-        # 가격 변화 계산
-        df['Price_Change'] = df['Close'].diff()
+            # 가격 변화 계산
+            df['Price_Change'] = df['Close'].diff()
 
-        # 상승/하락 분리
-        df['Gain'] = df['Price_Change'].where(df['Price_Change'] > 0, 0)
-        df['Loss'] = -df['Price_Change'].where(df['Price_Change'] < 0, 0)
+            # 상승/하락 분리
+            df['Gain'] = df['Price_Change'].where(df['Price_Change'] > 0, 0)
+            df['Loss'] = -df['Price_Change'].where(df['Price_Change'] < 0, 0)
 
-        # 14일 평균 상승/하락 계산
-        period = 14
-        df['Avg_Gain'] = df['Gain'].rolling(window=period).mean()
-        df['Avg_Loss'] = df['Loss'].rolling(window=period).mean()
+            # 14일 평균 상승/하락 계산
+            df['Avg_Gain'] = df['Gain'].rolling(window=period).mean()
+            df['Avg_Loss'] = df['Loss'].rolling(window=period).mean()
 
-        # RS와 RSI 계산
-        df['RS'] = df['Avg_Gain'] / df['Avg_Loss']
-        df['RSI'] = 100 - (100 / (1 + df['RS']))
+            # RS와 RSI 계산
+            df['RS'] = df['Avg_Gain'] / df['Avg_Loss']
+            df['RSI'] = 100 - (100 / (1 + df['RS']))
 
-        # 최신 RSI 값
-        latest_rsi = df['RSI'].iloc[-1]
+            # 최신 RSI 값
+            latest_rsi = df['RSI'].iloc[-1]
+            latest_date = df.index[-1]
 
         # 신호등 색상 결정 (기존 로직 유지)
-        if latest_rsi >= 70:
+        overbought, oversold = self.params.rsi_overbought, self.params.rsi_oversold
+        if latest_rsi >= overbought:
             color = "red"
             signal = "매도 신호"
-            summary_ko = f"RSI가 {latest_rsi:.1f}로 과매수 구간(70 이상)에 있어 매도 신호입니다."
-        elif latest_rsi <= 30:
+            summary_ko = f"RSI가 {latest_rsi:.1f}로 과매수 구간({overbought:g} 이상)에 있어 매도 신호입니다."
+        elif latest_rsi <= oversold:
             color = "green"
             signal = "매수 신호"
-            summary_ko = f"RSI가 {latest_rsi:.1f}로 과매도 구간(30 이하)에 있어 매수 신호입니다."
+            summary_ko = f"RSI가 {latest_rsi:.1f}로 과매도 구간({oversold:g} 이하)에 있어 매수 신호입니다."
         else:
             color = "yellow"
             signal = "관망 신호"
@@ -391,7 +685,7 @@ class handler(BaseHTTPRequestHandler):
 
         return {
             "symbol": symbol,
-            "date": df.index[-1].date().isoformat(),
+            "date": latest_date.date().isoformat(),
             "rsi_14": round(float(latest_rsi), 2),  # 기존 형식에 맞춤
             "traffic_light": color,
             "signal": signal,
@@ -406,38 +700,54 @@ class handler(BaseHTTPRequestHandler):
         if 'Close' not in df.columns:
             raise ValueError("Missing 'Close' column for Bollinger calculation")
 
-        df = df.dropna()
-        if len(df) < 21:
-            raise ValueError(f"Insufficient data for Bollinger calculation: {len(df)} days")
+        period = self.params.bollinger_period
+        num_std = self.params.bollinger_std
+        if self.lean_dtype is not None:
+            # lean 모드: 종가 배열만 사용
+            (close,), dates = _indicators.clean_arrays(df, ['Close'], self.lean_dtype)
+            if len(dates) <= period:
+                raise ValueError(f"Insufficient data for Bollinger calculation: {len(dates)} days")
+            middle, upper, lower, percent_b = _indicators.bollinger(close, period=period, num_std=num_std)
+            latest_close = close[-1]
+            latest_upper = upper[-1]
+            latest_lower = lower[-1]
+            latest_ma = middle[-1]
+            latest_percent_b = percent_b[-1]
+            latest_date = dates[-1]
+        else:
+            df = df.dropna()
+            if len(df) <= period:
+                raise ValueError(f"Insufficient data for Bollinger calculation: {len(df)} days")
 
-        # 20일 이동평균과 표준편차 계산
-        period = 20
-        df['MA20'] = df['Close'].rolling(window=period).mean()
-        df['STD20'] = df['Close'].rolling(window=period).std()
+            # 20일 이동평균과 표준편차 계산
+            df['MA20'] = df['Close'].rolling(window=period).mean()
+            df['STD20'] = df['Close'].rolling(window=period).std()
 
-        # 볼린저 밴드 계산
-        df['Upper_Band'] = df['MA20'] + (2 * df['STD20'])
-        df['Lower_Band'] = df['MA20'] - (2 * df['STD20'])
+            # 볼린저 밴드 계산
+            df['Upper_Band'] = df['MA20'] + (num_std * df['STD20'])
+            df['Lower_Band'] = df['MA20'] - (num_std * df['STD20'])
 
-        # %B 계산 (현재 가격의 밴드 내 위치)
-        df['Percent_B'] = (df['Close'] - df['Lower_Band']) / (df['Upper_Band'] - df['Lower_Band'])
+            # %B 계산 (현재 가격의 밴드 내 위치)
+            df['Percent_B'] = (df['Close'] - df['Lower_Band']) / (df['Upper_Band'] - df['Lower_Band'])
 
-        # 최신 값들
-        latest_close = df['Close'].iloc[-1]
-        latest_upper = df['Upper_Band'].iloc[-1]
-        latest_lower = df['Lower_Band'].iloc[-1]
-        latest_ma = df['MA20'].iloc[-1]
-        latest_percent_b = df['Percent_B'].iloc[-1]
+            # 최신 값들
+            latest_close = df['Close'].iloc[-1]
+            latest_upper = df['Upper_Band'].iloc[-1]
+            latest_lower = df['Lower_Band'].iloc[-1]
+            latest_ma = df['MA20'].iloc[-1]
+            latest_percent_b = df['Percent_B'].iloc[-1]
+            latest_date = df.index[-1]
 
         # 신호등 색상 결정 (기존 로직 유지)
-        if latest_percent_b >= 0.8:
+        upper_b, lower_b = self.params.bollinger_upper, self.params.bollinger_lower
+        if latest_percent_b >= upper_b:
             color = "red"
             signal = "매도 신호"
-            summary_ko = f"볼린저 밴드 %B가 {latest_percent_b*100:.1f}%로 과매수 구간(80% 이상)에 있어 매도 신호입니다."
-        elif latest_percent_b <= 0.2:
+            summary_ko = f"볼린저 밴드 %B가 {latest_percent_b*100:.1f}%로 과매수 구간({upper_b*100:g}% 이상)에 있어 매도 신호입니다."
+        elif latest_percent_b <= lower_b:
             color = "green"
             signal = "매수 신호"
-            summary_ko = f"볼린저 밴드 %B가 {latest_percent_b*100:.1f}%로 과매도 구간(20% 이하)에 있어 매수 신호입니다."
+            summary_ko = f"볼린저 밴드 %B가 {latest_percent_b*100:.1f}%로 과매도 구간({lower_b*100:g}% 이하)에 있어 매수 신호입니다."
         else:
             color = "yellow"
             signal = "관망 신호"
@@ -445,7 +755,7 @@ class handler(BaseHTTPRequestHandler):
 
         return {
             "symbol": symbol,
-            "date": df.index[-1].date().isoformat(),
+            "date": latest_date.date().isoformat(),
             "close_price": round(float(latest_close), 2),
             "upper_band": round(float(latest_upper), 2),
             "lower_band": round(float(latest_lower), 2),
@@ -459,46 +769,35 @@ class handler(BaseHTTPRequestHandler):
 
     def calculate_capm(self, symbol):
         """CAPM 베타 계산 (자체 구현 OLS 사용)"""
-        WIN = 126  # 6개월 (영업일)
+        WIN = self.params.capm_window  # 기본 6개월 (영업일)
 
         # 개별 종목 데이터 로드
         stock_data = self.load_stock_data(symbol)
 
         # KOSPI 지수 데이터 로드
-        kospi_data = self.load_stock_data("^KS11")
+        kospi_data = self.load_stock_data(_panel.MARKET_SYMBOL)
 
         # 필요한 컬럼이 있는지 확인
         if 'Close' not in stock_data.columns or 'Close' not in kospi_data.columns:
             raise ValueError("Missing 'Close' column in data")
 
-        # 데이터 정리 및 정렬
-        stock_data = stock_data.dropna()
-        kospi_data = kospi_data.dropna()
-
-        # 인덱스 timezone 정규화
-        if stock_data.index.tz is not None:
-            stock_data.index = stock_data.index.tz_localize(None)
-        if kospi_data.index.tz is not None:
-            kospi_data.index = kospi_data.index.tz_localize(None)
+        with _timing.stage('align'):
+            # KRX 거래일 기준 패널로 정렬 (두 종목 모두 전 거래일 대비 수익률이 있는 날만 사용)
+            panel = _panel.PricePanel.build({symbol: stock_data, _panel.MARKET_SYMBOL: kospi_data},
+                                            calendar=_panel.trading_calendar(kospi_data))
+            stock_returns, kospi_returns, common_dates = panel.paired_returns(symbol, _panel.MARKET_SYMBOL)
 
-        # 수익률(%) 계산
-        stock_returns = stock_data['Close'].pct_change().dropna() * 100
-        kospi_returns = kospi_data['Close'].pct_change().dropna() * 100
-
-        # 공통 거래일 찾기
-        common_dates = stock_returns.index.intersection(kospi_returns.index)
-
-        # 최소 데이터 요구사항 확인
-        min_required = min(WIN, 60)  # 최소 60일 또는 WIN일 중 작은 값
-        if len(common_dates) < min_required:
-            raise ValueError(f"Insufficient overlapping data: {len(common_dates)} days")
+            # 최소 데이터 요구사항 확인
+            min_required = min(WIN, 60)  # 최소 60일 또는 WIN일 중 작은 값
+            if len(common_dates) < min_required:
+                raise ValueError(f"Insufficient overlapping data: {len(common_dates)} days")
 
-        # 실제 사용할 윈도우 크기 조정
-        actual_window = min(len(common_dates), WIN)
+            # 실제 사용할 윈도우 크기 조정
+            actual_window = min(len(common_dates), WIN)
 
-        # 공통 거래일 데이터 추출
-        y = stock_returns[common_dates].iloc[-actual_window:].values
-        x = kospi_returns[common_dates].iloc[-actual_window:].values
+            # 수익률(%) - 최근 윈도우
+            y = stock_returns[-actual_window:] * 100
+            x = kospi_returns[-actual_window:] * 100
 
         # 자체 구현 OLS 회귀
         ols_result = self.ols_regression(y, x)
@@ -655,7 +954,11 @@ class handler(BaseHTTPRequestHandler):
             }
 
     def load_kospi_mapping(self):
-        """kospi_enriched_final.ts에서 티커-산업 매핑 로드"""
+        """kospi_enriched_final.ts에서 티커-산업 매핑 로드 (한 번 읽은 매핑은 프로세스 안에서 재사용)"""
+        global _kospi_mapping_cache
+        if _kospi_mapping_cache is not None:
+            return _kospi_mapping_cache
+
         import re
         from pathlib import Path
 
@@ -691,11 +994,59 @@ class handler(BaseHTTPRequestHandler):
             if not mapping:
                 raise ValueError("매핑 데이터를 추출할 수 없습니다")
 
+            _kospi_mapping_cache = mapping
             return mapping
 
         except Exception as e:
             raise Exception(f"매핑 파일 로드 실패: {str(e)}")
 
+    def select_industry_peers(self, target_ticker, mapping, limit=None):
+        """
+        같은 산업에 속한 다른 기업 티커 목록 (기본 최대 industry_peers개)
+        동종 기업 인덱스가 있으면 수익률 상관계수 순, 없으면 산업 매핑 순서
+        """
+        limit = limit or self.params.industry_peers
+        peers = _peer_index.lookup(target_ticker, limit)
+        if peers:
+            return peers
+        target_industry = mapping.get(target_ticker)
+        if target_industry is None:
+            return []
+        return [ticker for ticker, industry in mapping.items()
+                if industry == target_industry and ticker != target_ticker][:limit]
+
+    def prefetch_batch_data(self, jobs):
+        """배치 작업에 필요한 모든 심볼(종목, KOSPI 지수, 산업 동종 기업)을 한 번에 다운로드"""
+        return _market_data.prefetch_history(self.batch_yahoo_symbols(jobs), days=self.params.lookback_days)
+
+    def batch_yahoo_symbols(self, jobs):
+        """배치 작업에 필요한 야후 심볼 목록 (종목, KOSPI 지수, 산업 동종 기업)"""
+        yahoo_symbols = []
+        needs_market = False
+        industry_targets = []
+
+        for symbol, analysis_types in jobs:
+            yahoo_symbols.append(self.resolve_yahoo_symbol(symbol))
+            # 산업 분석도 KOSPI 지수를 거래일 기준으로 사용
+            if any(t in ('capm', 'industry', 'speedtraffic') for t in analysis_types):
+                needs_market = True
+            if any(t in ('industry', 'speedtraffic') for t in analysis_types):
+                industry_targets.append(symbol)
+
+        if needs_market:
+            yahoo_symbols.append(_panel.MARKET_SYMBOL)
+
+        if industry_targets:
+            try:
+                mapping = self.load_kospi_mapping()
+                for symbol in industry_targets:
+                    for peer in self.select_industry_peers(symbol, mapping):
+                        yahoo_symbols.append(self.resolve_yahoo_symbol(peer))
+            except Exception as e:
+                batch_log.warning("산업 매핑 로드 실패, 동종 기업 선로딩 생략: %s", e)
+
+        return list(dict.fromkeys(yahoo_symbols))
+
     def load_industry_portfolio_data(self, target_ticker, mapping):
         """동일 산업군 기업들의 데이터를 로드하여 포트폴리오 구성"""
         if target_ticker not in mapping:
@@ -703,32 +1054,151 @@ class handler(BaseHTTPRequestHandler):
 
         target_industry = mapping[target_ticker]
 
-        # 같은 산업의 다른 기업들 찾기 (최대 10개)
-        industry_tickers = [ticker for ticker, industry in mapping.items()
-                          if industry == target_industry and ticker != target_ticker][:10]
+        # 같은 산업의 다른 기업들 찾기 (최대 industry_peers개)
+        industry_tickers = self.select_industry_peers(target_ticker, mapping)
 
         if not industry_tickers:
             raise ValueError(f"산업 {target_industry}에 다른 기업이 없습니다")
 
         # 각 티커별로 데이터 로드
         industry_data = {}
-        for ticker in industry_tickers:
-            try:
-                data = self.load_stock_data(ticker)
-                if data is not None and 'Close' in data.columns:
-                    industry_data[ticker] = data['Close']
-            except Exception:
-                continue  # 데이터 로드 실패 시 건너뛰기
+        with _timing.stage('fetch.peers'):
+            for ticker in industry_tickers:
+                try:
+                    data = self.load_stock_data(ticker)
+                    if data is not None and 'Close' in data.columns:
+                        industry_data[ticker] = data['Close']
+                except Exception:
+                    continue  # 데이터 로드 실패 시 건너뛰기
 
         if not industry_data:
             raise ValueError("산업 포트폴리오 데이터를 로드할 수 없습니다")
 
-        # DataFrame으로 결합
-        import pandas as pd
-        df = pd.DataFrame(industry_data)
-        df = df.dropna(how='all')
+        # 거래일 정렬은 계산 쪽 패널(_panel)에서 한 번에 처리
+        return industry_data, target_industry
+
+    def load_trading_calendar(self):
+        """KRX 거래일 (KOSPI 지수 일봉 기준) - 지수를 받을 수 없으면 None (종목 날짜의 합집합 사용)"""
+        try:
+            return _panel.trading_calendar(self.load_stock_data(_panel.MARKET_SYMBOL))
+        except Exception as e:
+            data_log.warning("KOSPI 거래일 로드 실패, 종목 날짜 기준으로 정렬: %s", e)
+            return None
 
-        return df, target_industry
+    def load_price_range(self, symbol, start_date, end_date):
+        """지정 기간(start_date~end_date 전일, 'YYYY-MM-DD') 일봉 데이터 로드 (과거 시계열용)"""
+        yahoo_symbol = self.resolve_yahoo_symbol(symbol)
+        with _timing.stage('fetch'):
+            return _market_data.load_history_range(yahoo_symbol, start_date, end_date)
+
+    def calculate_intraday(self, symbol):
+        """
+        장중 분봉 지표 - 공용 세션의 피드를 한 번 폴링해 새 봉을 반영한 뒤 증분 지표 스냅샷 반환
+        (버퍼는 요청 사이에 유지되므로 지표 윈도우는 세션 파라미터 고정, 신호등 임계값만 self.params 적용)
+        """
+        ticker = self.convert_company_name_to_ticker(symbol)
+        session = _intraday.get_session()
+        session.book.check_params(self.params)
+        with _timing.stage('fetch'):
+            added = session.refresh([ticker])
+
+        snapshot = session.book.snapshot(ticker, self.params)
+        if snapshot is None:
+            raise ValueError(f"No intraday data available for {symbol}")
+        snapshot['new_bars'] = added
+        snapshot['market_open'] = _intraday.is_krx_open()
+        snapshot['timestamp'] = datetime.now().isoformat()
+        return snapshot
+
+    def calculate_history(self, symbol, start=None, end=None, indicators=None):
+        """
+        과거 신호등 시계열 - start~end 구간의 일별 지표 값과 신호등
+        지표마다 전체 기간을 한 번에 계산 (기본 기간은 end 이전 lookback_days, 기본 지표는 전체)
+        지표 윈도우/임계값은 self.params를 계산기와 같은 방식으로 사용
+        """
+        end_date = pd.Timestamp(end) if end else pd.Timestamp(datetime.now().date())
+        start_date = pd.Timestamp(start) if start else end_date - pd.Timedelta(days=self.params.lookback_days)
+        if start_date > end_date:
+            raise ValueError(f"start({start_date.date()}) must not be after end({end_date.date()})")
+
+        if isinstance(indicators, str):
+            indicators = [name.strip().lower() for name in indicators.split(',') if name.strip()]
+        names = [name for name in _history.HISTORY_INDICATORS if not indicators or name in indicators]
+        unknown = sorted(set(indicators or []) - set(_history.HISTORY_INDICATORS))
+        if unknown:
+            raise ValueError(f"Unsupported history indicators: {', '.join(unknown)}")
+
+        # 지표 계산에 필요한 과거 구간까지 로드
+        fetch_start = (start_date - pd.Timedelta(days=_history.lookback_days(self.params))).strftime('%Y-%m-%d')
+        fetch_end = (end_date + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        frame = self.load_price_range(symbol, fetch_start, fetch_end)
+        dates = frame.index[(frame.index >= start_date) & (frame.index <= end_date)]
+        if len(dates) == 0:
+            raise ValueError(f"No data between {start_date.date()} and {end_date.date()}")
+
+        computed = {}
+        errors = {}
+        with _timing.stage('compute.history'):
+            technical_inputs = {
+                'mfi': _history.mfi_series,
+                'rsi': _history.rsi_series,
+                'bollinger': _history.bollinger_series,
+            }
+            for name, series_fn in technical_inputs.items():
+                if name in names or 'technical' in names:
+                    computed[name] = series_fn(frame, self.params)
+            if 'technical' in names:
+                computed['technical'] = ({}, _history.technical_lights(
+                    dates, computed['mfi'][1], computed['bollinger'][1], computed['rsi'][1]))
+
+            market_frame = None
+            if 'capm' in names or 'industry' in names:
+                try:
+                    market_frame = self.load_price_range(_panel.MARKET_SYMBOL, fetch_start, fetch_end)
+                except Exception as e:
+                    # 산업 시계열은 지수 없이 종목 날짜 기준으로 계속 계산
+                    if 'capm' in names:
+                        errors['capm'] = str(e)
+
+            if 'capm' in names and market_frame is not None:
+                try:
+                    computed['capm'] = _history.capm_series(frame, market_frame, self.params)
+                except Exception as e:
+                    errors['capm'] = str(e)
+
+            if 'industry' in names:
+                try:
+                    ticker = self.convert_company_name_to_ticker(symbol)
+                    peer_closes = {}
+                    for peer in self.select_industry_peers(ticker, self.load_kospi_mapping()):
+                        try:
+                            peer_closes[peer] = self.load_price_range(peer, fetch_start, fetch_end)['Close']
+                        except Exception:
+                            continue  # 데이터 로드 실패 시 건너뛰기
+                    if not peer_closes:
+                        raise ValueError("산업 포트폴리오 데이터를 로드할 수 없습니다")
+                    calendar = _panel.trading_calendar(market_frame) if market_frame is not None else None
+                    computed['industry'] = _history.industry_series(frame, peer_closes, calendar, self.params)
+                except Exception as e:
+                    errors['industry'] = str(e)
+
+            if 'garch' in names:
+                computed['garch'] = _history.garch_series(frame)
+
+        # 요청한 지표만 응답 (다수결 계산용으로만 만든 지표는 제외)
+        computed = {name: computed[name] for name in names if name in computed}
+
+        result = {
+            "symbol": symbol,
+            "start": dates[0].date().isoformat(),
+            "end": dates[-1].date().isoformat(),
+            "dates": [d.isoformat() for d in dates.date],
+            "series": _history.build_history(dates, computed),
+            "timestamp": datetime.now().isoformat()
+        }
+        if errors:
+            result["errors"] = errors
+        return result
 
     def calculate_industry_analysis(self, symbol):
         """산업 민감도 분석 (기존 방식 복원)"""
@@ -747,32 +1217,22 @@ class handler(BaseHTTPRequestHandler):
             if 'Close' not in stock_data.columns:
                 raise ValueError("Missing 'Close' column in stock data")
 
-            # 데이터 정리
-            stock_data = stock_data.dropna()
-            industry_portfolio = industry_portfolio.dropna(how='all')
-
-            # 인덱스 timezone 정규화
-            if stock_data.index.tz is not None:
-                stock_data.index = stock_data.index.tz_localize(None)
-            if industry_portfolio.index.tz is not None:
-                industry_portfolio.index = industry_portfolio.index.tz_localize(None)
+            with _timing.stage('align'):
+                # KRX 거래일 기준 패널 (종목 + 동종 기업 종가)
+                closes = {symbol: stock_data['Close'], **industry_portfolio}
+                panel = _panel.PricePanel.build(closes, calendar=self.load_trading_calendar())
 
-            # 수익률(%) 계산
-            stock_returns = stock_data['Close'].pct_change().dropna() * 100
+                # 산업 포트폴리오 수익률: 날짜마다 수익률이 있는 동종 기업의 동일가중 평균
+                industry_returns = panel.mean_returns(list(industry_portfolio))
+                stock_returns, industry_returns, common_dates = panel.paired_returns(symbol, industry_returns)
 
-            # 산업 포트폴리오 평균 수익률 계산 (동일가중)
-            industry_returns = industry_portfolio.pct_change().dropna().mean(axis=1) * 100
+                if len(common_dates) < 60:
+                    raise ValueError(f"Insufficient overlapping data: {len(common_dates)} days")
 
-            # 공통 거래일 찾기
-            common_dates = stock_returns.index.intersection(industry_returns.index)
-
-            if len(common_dates) < 60:
-                raise ValueError(f"Insufficient overlapping data: {len(common_dates)} days")
-
-            # 최근 126일 (6개월) 데이터 사용
-            window = min(len(common_dates), 126)
-            y = stock_returns[common_dates].iloc[-window:].values
-            x = industry_returns[common_dates].iloc[-window:].values
+                # 최근 industry_window일 (기본 6개월) 수익률(%) 사용
+                window = min(len(common_dates), self.params.industry_window)
+                y = stock_returns[-window:] * 100
+                x = industry_returns[-window:] * 100
 
             # 자체 구현 OLS 회귀
             ols_result = self.ols_regression(y, x)
@@ -825,15 +1285,13 @@ class handler(BaseHTTPRequestHandler):
             }
 
     def determine_traffic_lights(self, results):
-        """신호등 색상 결정"""
+        """신호등 색상 결정 (실패(None)하거나 inactive인 분석은 빼고 결정)"""
+        def light(name):
+            result = results.get(name)
+            return result.get('traffic_light', 'inactive') if isinstance(result, dict) else 'inactive'
+
         # 기술적 분석 신호등 (MFI + Bollinger + RSI)
-        technical_signals = []
-        if results.get('mfi'):
-            technical_signals.append(results['mfi']['traffic_light'])
-        if results.get('bollinger'):
-            technical_signals.append(results['bollinger']['traffic_light'])
-        if results.get('rsi'):
-            technical_signals.append(results['rsi']['traffic_light'])
+        technical_signals = [light(name) for name in ('mfi', 'bollinger', 'rsi') if light(name) != 'inactive']
 
         # 기술적 분석 종합 신호등
         if technical_signals:
@@ -851,55 +1309,77 @@ class handler(BaseHTTPRequestHandler):
 
         return {
             'technical': technical_color,
-            'industry': results.get('industry', {}).get('traffic_light', 'inactive'),
-            'market': results.get('capm', {}).get('traffic_light', 'inactive'),
-            'risk': results.get('garch', {}).get('traffic_light', 'inactive')
+            'industry': light('industry'),
+            'market': light('capm'),
+            'risk': light('garch')
         }
 
-    def run_integrated_analysis(self, symbol):
-        """통합 분석 실행"""
-        import sys
+    def run_calculator(self, name, symbol):
+        """통합 분석 계산기 하나 실행 (실패하면 None)"""
         try:
-            print(f"[UNIFIED_ANALYSIS] {symbol} 분석 시작", file=sys.stderr)
-
-            # 6개 분석 실행
-            results = {}
-
-            try:
-                results['mfi'] = self.calculate_mfi(symbol)
-            except Exception as e:
-                print(f"MFI 분석 실패: {e}", file=sys.stderr)
-                results['mfi'] = None
-
-            try:
-                results['bollinger'] = self.calculate_bollinger(symbol)
-            except Exception as e:
-                print(f"Bollinger 분석 실패: {e}", file=sys.stderr)
-                results['bollinger'] = None
+            with _timing.stage(f"compute.{name}"):
+                return getattr(self, ANALYSIS_METHODS[name])(symbol)
+        except Exception as e:
+            analysis_log.warning("%s 분석 실패: %s", ANALYSIS_LABELS[name], e)
+            return None
 
-            try:
-                results['rsi'] = self.calculate_rsi(symbol)
-            except Exception as e:
-                print(f"RSI 분석 실패: {e}", file=sys.stderr)
-                results['rsi'] = None
+    def run_calculators_until(self, symbol, deadline):
+        """
+        계산기를 스레드로 함께 실행하고 마감 시각까지 기다림
+        (끝난 결과 dict, 마감까지 끝나지 않은 분석 목록) - 끝나지 않은 계산기는 백그라운드에서 마저 실행 후 버려짐
+        워커에도 요청의 타이머/프로파일을 넘김 (요청이 끝난 뒤 버려진 워커의 기록은 무시됨)
+        """
+        timer = _timing.current_timer()
+        profile = _profiling.current_profile()
+
+        def run(name):
+            with _timing.activate(timer), _profiling.attach(profile):
+                return self.run_calculator(name, symbol)
+
+        pool = ThreadPoolExecutor(max_workers=len(INTEGRATED_ANALYSES))
+        futures = {name: pool.submit(run, name) for name in INTEGRATED_ANALYSES}
+        wait(futures.values(), timeout=max(deadline - time.monotonic(), 0))
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        results = {}
+        unfinished = []
+        for name, future in futures.items():
+            if future.done() and not future.cancelled():
+                results[name] = future.result()
+            else:
+                unfinished.append(name)
+                results[name] = self.deadline_result(symbol, name)
+        return results, unfinished
 
-            try:
-                results['industry'] = self.calculate_industry_analysis(symbol)
-            except Exception as e:
-                print(f"Industry 분석 실패: {e}", file=sys.stderr)
-                results['industry'] = None
+    def deadline_result(self, symbol, name):
+        """마감까지 끝나지 않은 분석 자리에 넣는 inactive 결과"""
+        return {
+            "symbol": symbol,
+            "traffic_light": "inactive",
+            "signal": "시간 초과",
+            "reason": "deadline_exceeded",
+            "summary_ko": f"{ANALYSIS_LABELS[name]} 분석이 제한 시간 안에 끝나지 않았습니다.",
+            "timestamp": datetime.now().isoformat()
+        }
 
-            try:
-                results['capm'] = self.calculate_capm(symbol)
-            except Exception as e:
-                print(f"CAPM 분석 실패: {e}", file=sys.stderr)
-                results['capm'] = None
+    def run_integrated_analysis(self, symbol, deadline=None):
+        """
+        통합 분석 실행
+        deadline(time.monotonic 기준, 없으면 self.deadline)이 있으면 계산기를 함께 실행하고
+        마감까지 끝난 분석만으로 응답 (끝나지 않은 분석은 inactive, partial/unfinished 필드로 표시)
+        """
+        deadline = deadline if deadline is not None else self.deadline
+        try:
+            analysis_log.debug("%s 분석 시작", symbol)
 
-            try:
-                results['garch'] = self.calculate_garch_analysis(symbol)
-            except Exception as e:
-                print(f"GARCH 분석 실패: {e}", file=sys.stderr)
-                results['garch'] = None
+            # 6개 분석 실행
+            if deadline is None:
+                results = {name: self.run_calculator(name, symbol) for name in INTEGRATED_ANALYSES}
+                unfinished = []
+            else:
+                results, unfinished = self.run_calculators_until(symbol, deadline)
+                if unfinished:
+                    analysis_log.warning("%s 마감 시간 초과, 미완료 분석: %s", symbol, ', '.join(unfinished))
 
             # 신호등 결정
             traffic_lights = self.determine_traffic_lights(results)
@@ -911,12 +1391,15 @@ class handler(BaseHTTPRequestHandler):
                 **results,
                 "traffic_lights": traffic_lights
             }
+            if unfinished:
+                response["partial"] = True
+                response["unfinished"] = unfinished
 
-            print(f"[UNIFIED_ANALYSIS] {symbol} 분석 완료", file=sys.stderr)
+            analysis_log.debug("%s 분석 완료", symbol)
             return response
 
         except Exception as e:
-            print(f"[UNIFIED_ANALYSIS] {symbol} 분석 오류: {e}", file=sys.stderr)
+            analysis_log.error("%s 분석 오류: %s", symbol, e)
             return {
                 "symbol": symbol,
                 "timestamp": datetime.now().isoformat(),
@@ -929,6 +1412,224 @@ class handler(BaseHTTPRequestHandler):
                 }
             }
 
+class AnalysisEngine(handler):
+    """HTTP 요청 없이 분석 메서드만 사용하기 위한 엔진"""
+
+    def __init__(self):
+        # BaseHTTPRequestHandler 초기화를 건너뛰고 필요한 메서드만 사용
+        pass
+
+
+def parse_deadline(value):
+    """
+    deadline_ms 옵션 -> 통합 분석 마감 시각 (time.monotonic 기준)
+    없으면 ANALYSIS_DEADLINE_SECONDS (설정하지 않았으면 제한 없음), 0이면 제한 없음(None), 범위를 벗어나면 ValueError
+    """
+    if value is None or value == '':
+        seconds = DEFAULT_DEADLINE_SECONDS
+    else:
+        try:
+            milliseconds = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for deadline_ms: {value!r}")
+        if not 0 <= milliseconds <= MAX_DEADLINE_MS:
+            raise ValueError(f"deadline_ms must be between 0 and {MAX_DEADLINE_MS} (got {value})")
+        seconds = milliseconds / 1000
+    return time.monotonic() + seconds if seconds > 0 else None
+
+
+def parse_signal_backtest_options(params):
+    """
+    신호등 전략 백테스트 옵션 (쿼리 문자열 또는 JSON 본문 값)
+    tickers는 필수 (최대 _signal_backtest.MAX_REQUEST_TICKERS개), horizons는 최대 MAX_REQUEST_HORIZONS개의
+    1~MAX_HORIZON_DAYS 거래일 - 값이 잘못되면 ValueError
+    """
+    def as_list(value):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return [item.strip() for item in value.split(',') if item.strip()]
+        return list(value)
+
+    def as_flag(value):
+        if isinstance(value, bool):
+            return value
+        return str(value).lower() in ('1', 'true', 'yes', 'on')
+
+    tickers = list(dict.fromkeys(t.upper() for t in as_list(params.get('tickers')) or []))
+    if not tickers:
+        raise ValueError("tickers parameter is required")
+    if len(tickers) > _signal_backtest.MAX_REQUEST_TICKERS:
+        raise ValueError(f"Up to {_signal_backtest.MAX_REQUEST_TICKERS} tickers per request (got {len(tickers)})")
+
+    options = {
+        'tickers': tickers,
+        'start': params.get('start'),
+        'end': params.get('end'),
+        'allow_short': as_flag(params.get('allow_short', False)),
+        'risk_filter': as_flag(params.get('risk_filter', True)),
+    }
+    horizons = as_list(params.get('horizons'))
+    if horizons:
+        try:
+            horizons = sorted({int(h) for h in horizons})
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for horizons: {params.get('horizons')!r}")
+        if len(horizons) > _signal_backtest.MAX_REQUEST_HORIZONS:
+            raise ValueError(f"Up to {_signal_backtest.MAX_REQUEST_HORIZONS} horizons per request (got {len(horizons)})")
+        if horizons[0] < 1 or horizons[-1] > _signal_backtest.MAX_HORIZON_DAYS:
+            raise ValueError(f"horizons must be between 1 and {_signal_backtest.MAX_HORIZON_DAYS} trading days")
+        options['horizons'] = horizons
+    return options
+
+
+def is_batch_request(input_data):
+    """배치 요청 형태인지 확인"""
+    return isinstance(input_data, dict) and isinstance(input_data.get('requests'), list)
+
+
+def parse_batch_request(input_data):
+    """
+    배치 요청 파싱
+    형식: {"requests": [{"symbol": "005930", "analysis_types": ["mfi", "rsi"]}, ...]}
+    analysis_types 생략 시 speedtraffic, 같은 심볼이 여러 번 오면 분석 타입을 합침
+    """
+    jobs = {}
+    for item in input_data.get('requests', []):
+        if isinstance(item, str):
+            item = {'symbol': item}
+        if not isinstance(item, dict):
+            raise ValueError(f"Invalid batch item: {item!r}")
+
+        symbol = str(item.get('symbol', '')).strip().upper()
+        if not symbol:
+            raise ValueError("Symbol parameter is required for every batch item")
+
+        analysis_types = item.get('analysis_types') or [item.get('analysis_type', 'speedtraffic')]
+        types = jobs.setdefault(symbol, [])
+        for analysis_type in analysis_types:
+            analysis_type = str(analysis_type).lower()
+            if analysis_type not in ANALYSIS_METHODS:
+                raise ValueError(f"Unknown analysis type: {analysis_type}")
+            if analysis_type not in types:
+                types.append(analysis_type)
+
+    if not jobs:
+        raise ValueError("At least one batch request is required")
+    if len(jobs) > MAX_BATCH_SYMBOLS:
+        raise ValueError(f"Too many symbols in batch: {len(jobs)} (max {MAX_BATCH_SYMBOLS})")
+
+    return list(jobs.items())
+
+
+def _run_batch_task(analyzer, symbol, analysis_type):
+    """배치 작업 하나 실행 (워커 스레드에서 작업별 타이머 사용)"""
+    timer = _timing.RequestTimer('batch')
+    try:
+        with _timing.activate(timer):
+            result = analyzer.run_analysis(symbol, analysis_type)
+    finally:
+        timer.finish()
+    return result, timer
+
+
+def _batch_item(analyzer, symbol, analysis_type, include_timings):
+    """배치 작업 하나의 응답 항목 (실패는 error 필드로)"""
+    item = {"symbol": symbol, "analysis_type": analysis_type}
+    try:
+        result, timer = _run_batch_task(analyzer, symbol, analysis_type)
+        item["result"] = result
+        if include_timings:
+            item["_timings"] = timer.summary_ms()
+    except Exception as e:
+        item["error"] = f"Python 분석 실패: {str(e)}"
+    return item
+
+
+def _run_batch_chunk(jobs, descriptor, days, lean, params, include_timings):
+    """
+    프로세스 풀 워커에서 종목 그룹 하나 실행
+    부모가 공유 메모리에 올린 가격 데이터를 캐시에 넣고 분석 (다시 다운로드하지 않음)
+    """
+    with _process_pool.AttachedFrames(descriptor) as shared:
+        for yahoo_symbol, frame in shared.frames().items():
+            _market_data.seed_history(yahoo_symbol, days, frame)
+
+        analyzer = AnalysisEngine()
+        analyzer.lean_dtype = _indicators.lean_dtype(lean)
+        analyzer.params = _params.from_request(params)
+        items = [_batch_item(analyzer, symbol, analysis_type, include_timings)
+                 for symbol, types in jobs for analysis_type in types]
+
+        # 공유 블록을 닫기 전에 블록을 가리키는 캐시 항목 제거
+        _market_data.clear_cache()
+    return items
+
+
+def _iter_batch_processes(analyzer, jobs, include_timings):
+    """선로딩한 가격 데이터를 공유 메모리에 올리고 종목 그룹 청크를 워커 프로세스에 분배"""
+    days = analyzer.params.lookback_days
+    frames = {}
+    for yahoo_symbol in analyzer.batch_yahoo_symbols(jobs):
+        try:
+            frames[yahoo_symbol] = _market_data.load_history(yahoo_symbol, days=days)
+        except Exception as e:
+            batch_log.debug("%s 데이터 없음, 워커에서 개별 로드: %s", yahoo_symbol, e)
+
+    lean = np.dtype(analyzer.lean_dtype).name if analyzer.lean_dtype else None
+    with _process_pool.SharedFrames.create(frames) as shared:
+        for items in _process_pool.map_chunks(_run_batch_chunk, jobs, shared.descriptor(), days, lean,
+                                              analyzer.params.changed(), include_timings):
+            yield from items
+
+
+def iter_batch_analysis(input_data):
+    """
+    배치 분석 실행 - 완료되는 순서대로 결과 dict를 yield
+    모든 심볼의 데이터는 먼저 한 번에 받아 공유 캐시에 넣고 분석은 스레드 풀에서 실행
+    (ANALYSIS_PROCESS_WORKERS가 2 이상이면 종목 그룹별로 프로세스 풀에서 실행)
+    """
+    jobs = parse_batch_request(input_data)
+    analyzer = AnalysisEngine()
+    if 'lean' in input_data:
+        analyzer.lean_dtype = _indicators.lean_dtype(input_data['lean'])
+    analyzer.params = _params.from_request(input_data)
+
+    try:
+        prefetched = analyzer.prefetch_batch_data(jobs)
+        batch_log.info("%d개 심볼, 데이터 선로딩 %d건", len(jobs), prefetched)
+    except Exception as e:
+        batch_log.warning("데이터 선로딩 실패, 개별 로드로 진행: %s", e)
+
+    include_timings = _timing.wants_timings(input_data.get('timings', False))
+    if _process_pool.enabled() and len(jobs) > 1:
+        yield from _iter_batch_processes(analyzer, jobs, include_timings)
+        return
+
+    tasks = [(symbol, analysis_type) for symbol, types in jobs for analysis_type in types]
+    with ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(tasks))) as pool:
+        futures = [pool.submit(_batch_item, analyzer, symbol, analysis_type, include_timings)
+                   for symbol, analysis_type in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def write_batch_ndjson(wfile, input_data):
+    """배치 결과를 줄 단위 JSON(NDJSON)으로 스트리밍, 마지막 줄은 완료 요약"""
+    count = 0
+    errors = 0
+    for item in iter_batch_analysis(input_data):
+        count += 1
+        if 'error' in item:
+            errors += 1
+        wfile.write(_serializer.dumps_line(item))
+        wfile.flush()
+
+    summary = {"done": True, "count": count, "errors": errors, "timestamp": datetime.now().isoformat()}
+    wfile.write(_serializer.dumps_line(summary))
+    wfile.flush()
+
+
 # Vercel 서버리스 함수를 위한 HTTP 핸들러 추가
 def handle_vercel_request(request_body):
     """
@@ -938,36 +1639,70 @@ def handle_vercel_request(request_body):
     try:
         # JSON 데이터 파싱
         input_data = json.loads(request_body) if isinstance(request_body, str) else request_body
+
+        # 배치 요청은 전체 결과를 모아서 반환 (스트리밍은 write_batch_ndjson 사용)
+        if is_batch_request(input_data):
+            return {"results": list(iter_batch_analysis(input_data)), "timestamp": datetime.now().isoformat()}
+
         symbol = input_data.get('symbol', '').upper()
         analysis_type = input_data.get('analysis_type', 'speedtraffic').lower()
 
+        # 유니버스 신호등 전략 백테스트 (심볼 불필요)
+        if analysis_type == 'signal_backtest':
+            engine = AnalysisEngine()
+            engine.params = _params.from_request(input_data)
+            result = _signal_backtest.run_signal_backtest(engine, **parse_signal_backtest_options(input_data))
+            return _downsample.downsample_result(result, _downsample.parse_points(input_data.get('points')))
+
+        # 산업 벡터 검색 (질의 임베딩 vectors 또는 산업명 industries)
+        if analysis_type == 'industry_search':
+            return _industry_vectors.search_request(AnalysisEngine(), input_data)
+
+        # 포트폴리오 VaR/CVaR (portfolios 또는 tickers + weights, 여러 포트폴리오를 한 번에 계산)
+        if analysis_type == 'portfolio_risk':
+            engine = AnalysisEngine()
+            engine.params = _params.from_request(input_data)
+            return _risk.risk_request(engine, input_data)
+
         if not symbol:
             raise ValueError("Symbol parameter is required")
 
-        # 분석 클래스를 독립적으로 사용할 수 있도록 수정
-        class AnalysisEngine(handler):
-            def __init__(self):
-                # BaseHTTPRequestHandler 초기화를 건너뛰고 필요한 메서드만 사용
-                pass
-
         # 분석 인스턴스 생성
         analyzer = AnalysisEngine()
-
-        # 분석 타입에 따라 다른 함수 호출
-        if analysis_type == 'mfi':
-            result = analyzer.calculate_mfi(symbol)
-        elif analysis_type == 'rsi':
-            result = analyzer.calculate_rsi(symbol)
-        elif analysis_type == 'bollinger':
-            result = analyzer.calculate_bollinger(symbol)
-        elif analysis_type == 'capm':
-            result = analyzer.calculate_capm(symbol)
-        elif analysis_type == 'garch':
-            result = analyzer.calculate_garch_analysis(symbol)
-        elif analysis_type == 'industry':
-            result = analyzer.calculate_industry_analysis(symbol)
-        else:  # speedtraffic (통합 분석)
-            result = analyzer.run_integrated_analysis(symbol)
+        if 'lean' in input_data:
+            analyzer.lean_dtype = _indicators.lean_dtype(input_data['lean'])
+        analyzer.params = _params.from_request(input_data)
+        analyzer.deadline = parse_deadline(input_data.get('deadline_ms'))
+        # 차트용 다운샘플링 목표 점 개수 (GET과 같이 모든 분석 타입에 적용)
+        points = _downsample.parse_points(input_data.get('points'))
+
+        # 디버그 프로파일링은 본문 profile + profile_token 옵션 또는 ANALYSIS_PROFILE 환경변수로 켬
+        profile_mode = _profiling.requested_mode({
+            'X-Debug-Profile': input_data.get('profile'),
+            'X-Debug-Profile-Token': input_data.get('profile_token'),
+        })
+        timer = _timing.RequestTimer('analysis')
+        try:
+            with _profiling.profile_request(profile_mode, f"analysis_{symbol}_{analysis_type}") as profile, \
+                    _timing.activate(timer):
+                # 분석 타입에 따라 다른 함수 호출 (단계별 소요 시간 기록)
+                if analysis_type == 'history':
+                    result = analyzer.calculate_history(symbol, input_data.get('start'), input_data.get('end'),
+                                                        input_data.get('indicators'))
+                else:
+                    result = analyzer.run_analysis(symbol, analysis_type)
+                analyzer.record_hot_symbol(symbol)
+                if points:
+                    with _timing.stage('downsample'):
+                        result = _downsample.downsample_result(result, points)
+        finally:
+            # 실패한 요청도 소요 시간 기록
+            timer.finish()
+
+        if _timing.wants_timings(input_data.get('timings', False)):
+            result['_timings'] = timer.summary_ms()
+        if profile is not None:
+            result['_profile'] = profile.summary()
 
         return result
 
@@ -991,10 +1726,16 @@ def main():
     try:
         # stdin에서 JSON 데이터 읽기
         input_data = json.loads(sys.stdin.read())
+
+        # 배치 요청은 NDJSON으로 한 줄씩 출력
+        if is_batch_request(input_data):
+            write_batch_ndjson(sys.stdout.buffer, input_data)
+            return
+
         result = handle_vercel_request(input_data)
 
         # 결과를 JSON으로 출력
-        print(json.dumps(result, ensure_ascii=False))
+        sys.stdout.buffer.write(_serializer.dumps_line(result))
 
     except Exception as e:
         # 오류 발생 시 오류 정보를 JSON으로 출력
@@ -1002,8 +1743,12 @@ def main():
             "error": f"Python 분석 실패: {str(e)}",
             "timestamp": datetime.now().isoformat()
         }
-        print(json.dumps(error_result, ensure_ascii=False))
+        sys.stdout.buffer.write(_serializer.dumps_line(error_result))
         sys.exit(1)
 
+# 워커 시작 시 캐시 워밍업 (ANALYSIS_WARMUP_ON_START, 로컬 stdin 실행과 프로세스 풀 워커는 제외)
+if __name__ != "__main__" and not _process_pool.in_worker() and _warmup.wants_warmup_on_start():
+    _warmup.start_background(AnalysisEngine, default_symbols=MAJOR_COMPANY_TICKERS.values())
+
 if __name__ == "__main__":
     main()
@@ -9,11 +9,19 @@ sys.path.append(current_dir)
 
 # unified_analysis 모듈에서 필요한 함수들 가져오기
 try:
-    from unified_analysis import handle_vercel_request
+    from unified_analysis import handle_vercel_request, is_batch_request, parse_batch_request, write_batch_ndjson
 except ImportError:
     # 로컬 개발 환경에서는 직접 import
     import unified_analysis
     handle_vercel_request = unified_analysis.handle_vercel_request
+    is_batch_request = unified_analysis.is_batch_request
+    parse_batch_request = unified_analysis.parse_batch_request
+    write_batch_ndjson = unified_analysis.write_batch_ndjson
+
+import _serializer
+import _log
+
+log = _log.get_logger('python_api')
 
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
@@ -22,14 +30,6 @@ class handler(BaseHTTPRequestHandler):
         실제 시장 데이터만 사용하며 모의 데이터 생성 금지
         """
         try:
-            # CORS 헤더 설정
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-            self.end_headers()
-
             # 요청 본문 읽기
             content_length = int(self.headers.get('Content-Length', 0))
             post_data = self.rfile.read(content_length)
@@ -41,12 +41,37 @@ class handler(BaseHTTPRequestHandler):
                 self.send_error_response(400, f"Invalid JSON: {str(e)}")
                 return
 
+            # 배치 요청: 결과를 NDJSON으로 스트리밍
+            if is_batch_request(request_data):
+                try:
+                    parse_batch_request(request_data)
+                except ValueError as e:
+                    self.send_error_response(400, str(e))
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+                self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+                self.end_headers()
+                write_batch_ndjson(self.wfile, request_data)
+                return
+
             # 분석 실행
             result = handle_vercel_request(request_data)
             
+            # CORS 헤더 설정
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            self.end_headers()
+
             # 결과 반환
-            response_json = json.dumps(result, ensure_ascii=False)
-            self.wfile.write(response_json.encode('utf-8'))
+            _serializer.write_json(self.wfile, result)
 
         except Exception as e:
             self.send_error_response(500, f"Analysis failed: {str(e)}")
@@ -72,8 +97,8 @@ class handler(BaseHTTPRequestHandler):
             "status": status_code
         }
         
-        self.wfile.write(json.dumps(error_response, ensure_ascii=False).encode('utf-8'))
+        _serializer.write_json(self.wfile, error_response)
 
     def log_message(self, format, *args):
         """로그 메시지 출력 (Vercel 환경에서 stderr로)"""
-        sys.stderr.write(f"[PYTHON_API] {format % args}\n")
+        log.info(format, *args)